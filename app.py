@@ -3,14 +3,21 @@
 
 from pathlib import Path
 import time
-import math
-import random
 from datetime import datetime
 from io import BytesIO
 import os
 import logging
+import hashlib
+import threading
+import importlib.util
 
 import streamlit as st
+import streamlit.components.v1 as components
+# Optional: browser-side rerun timer for auto-refresh
+try:
+    from streamlit_autorefresh import st_autorefresh
+except Exception:
+    st_autorefresh = None
 st.markdown("""
 <div style="background: linear-gradient(90deg, #667eea, #764ba2);
             padding: 15px; border-radius: 8px; text-align: center;">
@@ -18,10 +25,9 @@ st.markdown("""
     <p style="color: #f0f0f0;">Real‑time safety, risk fusion, and smart navigation</p>
 </div>
 """, unsafe_allow_html=True)
-import folium
 import pandas as pd
-import plotly.graph_objects as go
-from streamlit_folium import st_folium 
+import numpy as np
+# folium and plotly are imported where the map and charts are built
 
 # Local helpers (ensure src/ is a package)
 from src import (
@@ -38,6 +44,7 @@ from src import (
     risk_crowd,
     tts as tts_module,
     live_weather,
+    geo,
 )
 
 # Basic logging
@@ -51,7 +58,35 @@ if not logger.handlers:
 # ---------------- Page config ----------------
 st.set_page_config(layout="wide", page_title="CrowdShield — AI Disaster Copilot", page_icon="🛡️", initial_sidebar_state="expanded")
 center_point = (9.931233, 76.267304)
-G = routing.load_graph(online=True, center_point=center_point, dist=1500)
+
+# Road graph is held once per process; center is rounded so nearby origins share one download
+@st.cache_resource(show_spinner="Loading road graph…")
+def _load_graph_cached(online, lat, lon):
+    cp = (lat, lon) if lat is not None and lon is not None else None
+    try:
+        G = routing.load_graph(online=online, center_point=cp)
+    except TypeError:
+        G = routing.load_graph(online=online)
+    routing.build_csr(G)  # prime the CSR adjacency once per cached graph
+    return G
+
+
+# Gemini availability badge: probe once per hour per key instead of on every rerun
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _probe_gemini(key_hash):
+    try:
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    except ImportError:
+        return ("missing", None)
+    except Exception as e:
+        return ("warn", str(e)[:50])
+    for model_name in ("models/gemini-2.5-flash-lite", "gemini-2.5-flash-lite"):
+        try:
+            return ("ok", genai.GenerativeModel(model_name))
+        except Exception as e:
+            err = str(e)[:50]
+    return ("err", err)
 
 # ---------------- Responsive CSS ----------------
 st.markdown("", unsafe_allow_html=True)
@@ -115,9 +150,26 @@ I18N = {
 STATES = ["Kerala", "Tamil Nadu", "Karnataka", "Maharashtra", "Uttar Pradesh", "Delhi", "West Bengal", "Rajasthan"]
 STATE_CENTERS = {"Kerala": (10.1632, 76.6413), "Tamil Nadu": (11.1271, 78.6569), "Karnataka": (15.3173, 75.7139), "Maharashtra": (19.7515, 75.7139), "Uttar Pradesh": (26.8467, 80.9462), "Delhi": (28.6139, 77.2090), "West Bengal": (22.9868, 87.8550), "Rajasthan": (27.0238, 74.2179)}
 
+# Risk history is a fixed-size ring buffer; risk_head counts every sample ever written
+RISK_HISTORY_LEN = 100
+RISK_DTYPE = np.dtype([("ts", "datetime64[ms]"), ("d", "f4"), ("c", "f4"), ("combined", "f4"), ("sev", "u1")])
+SEVERITY_LEVELS = ("Low", "Medium", "High", "Critical")
+SEVERITY_ICONS = {"Low": "🟢", "Medium": "🟡", "High": "🟠", "Critical": "🔴"}
+SEVERITY_COLORS = {"Low": "#2ECC71", "Medium": "#F5B041", "High": "#E67E22", "Critical": "#C0392B"}
+DRIVER_ICONS = {"rainfall": "🌧️", "wind": "💨", "flood": "🌊", "crowd": "👥", "density": "📊"}
+
+def risk_history_view():
+    """Chronological view of the filled part of the risk history ring buffer."""
+    buf, head = st.session_state.risk_history, st.session_state.risk_head
+    if head <= len(buf):
+        return buf[:head]  # not wrapped yet: a zero-copy slice
+    split = head % len(buf)
+    return np.concatenate((buf[split:], buf[:split]))
+
 # ---------------- Session defaults ----------------
-if "risk_history" not in st.session_state:
-    st.session_state.risk_history = []
+if not isinstance(st.session_state.get("risk_history"), np.ndarray):
+    st.session_state.risk_history = np.zeros(RISK_HISTORY_LEN, dtype=RISK_DTYPE)
+    st.session_state.risk_head = 0
 if "last_update" not in st.session_state:
     st.session_state.last_update = datetime.now()
 if "auto_refresh_enabled" not in st.session_state:
@@ -153,7 +205,8 @@ if "auto_play_voice" not in st.session_state:
 st.sidebar.title("🛡️ " + I18N[st.session_state.lang]["title"])
 lang = st.sidebar.selectbox("Language / भाषा / ഭാഷ / மொழி", options=list(I18N.keys()), index=list(I18N.keys()).index(st.session_state.lang))
 st.session_state.lang = lang
-i18n = I18N.get(lang, I18N["en"])
+# Labels missing from a language fall back to English
+i18n = {**I18N["en"], **I18N.get(lang, {})}
 
 state = st.sidebar.selectbox(i18n["state"], options=STATES, index=STATES.index("Kerala") if "Kerala" in STATES else 0)
 role = st.sidebar.radio("User role", ["Citizen", "Authority"], index=0)
@@ -212,60 +265,57 @@ if route is not None and len(route) >= 2:
 else:
     st.sidebar.info("No route yet. Click 'Find Safe Route' or enable Voice Navigation")
 
-    
-    # Check Gemini API
-    gemini_key_set = "✅ Set" if os.getenv("GEMINI_API_KEY") else "❌ Not Set"
-    st.sidebar.write(f"**Gemini API Key:** {gemini_key_set}")
-    if not os.getenv("GEMINI_API_KEY"):
-        st.sidebar.error("⚠️ Set GEMINI_API_KEY in .env file or environment variables")
-        st.sidebar.info("🔗 Get API key: https://aistudio.google.com/app/apikey")
-    else:
-        # Test if it works
+
+# Diagnostics are opt-in: collapsed behind a checkbox so the dependency probes skip normal reruns
+if st.sidebar.checkbox("🛠 Show diagnostics", value=False, key="debug_toggle"):
+    with st.sidebar.expander("🛠 Diagnostics", expanded=True):
+        # Check Gemini API
+        gemini_key_set = "✅ Set" if os.getenv("GEMINI_API_KEY") else "❌ Not Set"
+        st.write(f"**Gemini API Key:** {gemini_key_set}")
+        if not os.getenv("GEMINI_API_KEY"):
+            st.error("⚠️ Set GEMINI_API_KEY in .env file or environment variables")
+            st.info("🔗 Get API key: https://aistudio.google.com/app/apikey")
+        else:
+            # Test if it works (cached; see _probe_gemini)
+            probe_status, probe_detail = _probe_gemini(hashlib.sha256(os.getenv("GEMINI_API_KEY").encode()).hexdigest())
+            if probe_status == "ok":
+                st.success("✅ Gemini 2.5 Flash Light available")
+            elif probe_status == "missing":
+                st.error("❌ Install: pip install google-generativeai")
+            elif probe_status == "warn":
+                st.warning(f"⚠️ API test failed: {probe_detail}")
+            else:
+                st.error(f"❌ Gemini 2.5 Flash Lite not available: {probe_detail}")
+
+        # Check map dependencies
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            # Test ONLY Gemini 2.0 Flash
-            try:
-                test_model = genai.GenerativeModel('models/gemini-2.5-flash-lite')
-                st.sidebar.success("✅ Gemini 2.5 Flash Light available")
-            except Exception:
-                try:
-                    test_model = genai.GenerativeModel('gemini-2.5-flash-lite')
-                    st.sidebar.success("✅ Gemini 2.5 Flash Light available")
-                except Exception as e:
-                    st.sidebar.error(f"❌ Gemini 2.5 Flash Lite not available: {str(e)[:50]}")
+            missing = [mod for mod in ("folium", "streamlit_folium") if importlib.util.find_spec(mod) is None]
+            if missing:
+                raise ImportError(f"No module named {', '.join(missing)}")
+            st.success("✅ Map dependencies OK")
+        except ImportError as e:
+            st.error(f"❌ Map deps missing: {e}")
+            st.info("Install: pip install streamlit-folium folium")
+
+        # Check TTS dependencies
+        try:
+            if importlib.util.find_spec("gtts") is None:
+                raise ImportError("gtts")
+            st.success("✅ TTS (gTTS) OK")
         except ImportError:
-            st.sidebar.error("❌ Install: pip install google-generativeai")
-        except Exception as e:
-            st.sidebar.warning(f"⚠️ API test failed: {str(e)[:50]}")
-    
-    # Check map dependencies
-    try:
-        import folium
-        from streamlit_folium import st_folium
-        st.sidebar.success("✅ Map dependencies OK")
-    except ImportError as e:
-        st.sidebar.error(f"❌ Map deps missing: {e}")
-        st.sidebar.info("Install: pip install streamlit-folium folium")
-    
-    # Check TTS dependencies
-    try:
-        from gtts import gTTS
-        st.sidebar.success("✅ TTS (gTTS) OK")
-    except ImportError:
-        st.sidebar.warning("⚠️ gTTS not installed: pip install gTTS")
-    
-    # Check route status
-    if route:
-        st.sidebar.success(f"✅ Route found: {len(route)} waypoints")
-    else:
-        st.sidebar.info("ℹ️ No route yet. Click 'Find Safe Route' or enable Voice Navigation")
-    
-    # Check voice nav status
-    if st.session_state.voice_nav_enabled:
-        st.sidebar.success("✅ Voice Navigation: Enabled")
-    else:
-        st.sidebar.info("ℹ️ Voice Navigation: Disabled")
+            st.warning("⚠️ gTTS not installed: pip install gTTS")
+
+        # Check route status
+        if route:
+            st.success(f"✅ Route found: {len(route)} waypoints")
+        else:
+            st.info("ℹ️ No route yet. Click 'Find Safe Route' or enable Voice Navigation")
+
+        # Check voice nav status
+        if st.session_state.voice_nav_enabled:
+            st.success("✅ Voice Navigation: Enabled")
+        else:
+            st.info("ℹ️ Voice Navigation: Disabled")
 
 st.sidebar.markdown("### 🔄 Live Updates")
 st.session_state.auto_refresh_enabled = st.sidebar.checkbox(i18n["enable_auto_refresh"], value=st.session_state.auto_refresh_enabled)
@@ -321,22 +371,44 @@ if submitted_report:
 st.sidebar.markdown("---")
 st.sidebar.caption("💡 Tip: Enable auto-refresh for live updates. Adjust sliders to simulate conditions.")
 
-# Auto-refresh
+# Auto-refresh: the browser schedules the rerun, so the server thread never sleeps or polls
 if st.session_state.auto_refresh_enabled:
-    time_since_update = (datetime.now() - st.session_state.last_update).total_seconds()
-    if time_since_update >= st.session_state.refresh_interval:
-        st.session_state.last_update = datetime.now()
-        time.sleep(0.05)
-        st.rerun()()
+    if st_autorefresh is not None:
+        refresh_tick = st_autorefresh(interval=st.session_state.refresh_interval * 1000, key="crowdshield_autorefresh")
+        if refresh_tick != st.session_state.get("autorefresh_tick"):
+            st.session_state.autorefresh_tick = refresh_tick
+            st.session_state.last_update = datetime.now()
+    else:
+        # Without the component, rerun on the next interaction once the interval has elapsed
+        time_since_update = (datetime.now() - st.session_state.last_update).total_seconds()
+        if time_since_update >= st.session_state.refresh_interval:
+            st.session_state.last_update = datetime.now()
+            st.rerun()
 
 # ---------------- Data loading ----------------
 haz_path = f"data/hazard_zones_{state.lower().replace(' ', '_')}.geojson"
 shel_path = f"data/safe_zones_{state.lower().replace(' ', '_')}.csv"
 crowd_path = f"data/crowd_sim_{state.lower().replace(' ', '_')}.csv"
 
+# Cached loaders: files only change between deployments, so serve reruns from memory
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_hazards_cached(path, state_name):
+    return data_loader.load_hazards(path) if Path(path).exists() else data_loader.load_hazards()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_shelters_cached(path, state_name):
+    return data_loader.load_shelters(path) if Path(path).exists() else data_loader.load_shelters()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_crowd_cached(path, state_name):
+    """Base crowd frame plus its (floored) mean head count, both computed once per file."""
+    df = data_loader.load_crowd(path) if Path(path).exists() else data_loader.load_crowd()
+    mean_people = max(1.0, float(df["people"].mean())) if not df.empty and "people" in df.columns else 1.0
+    return df, mean_people
+
 def safe_load_hazards(path):
     try:
-        return data_loader.load_hazards(path) if Path(path).exists() else data_loader.load_hazards()
+        return _load_hazards_cached(path, state)
     except Exception as exc:
         st.warning(f"Could not load hazards ({path}): {exc}")
         try:
@@ -347,17 +419,19 @@ def safe_load_hazards(path):
 
 def safe_load_shelters(path):
     try:
-        return data_loader.load_shelters(path) if Path(path).exists() else data_loader.load_shelters()
+        return _load_shelters_cached(path, state)
     except Exception as exc:
         st.warning(f"Could not load shelters ({path}): {exc}")
         return pd.DataFrame()
 
 def safe_load_crowd(path):
     try:
-        df = data_loader.load_crowd(path) if Path(path).exists() else data_loader.load_crowd()
+        # Density scaling stays outside the cache so one cached frame serves every slider value
+        df, mean_people = _load_crowd_cached(path, state)  # st.cache_data hands back a fresh copy
         if not df.empty and "people" in df.columns:
-            mean_people = max(1.0, df["people"].mean())
-            df["people"] = df["people"] * (crowd_density / (mean_people / 1000.0))
+            people = df["people"].to_numpy(dtype=float, copy=True)
+            np.multiply(people, crowd_density / (mean_people / 1000.0), out=people)
+            df["people"] = people
         return df
     except Exception as exc:
         st.warning(f"Could not load crowd data ({path}): {exc}")
@@ -376,6 +450,23 @@ except Exception:
     gpd = None
     wkt = None
     BaseGeometry = None
+try:
+    import shapely
+    from shapely import from_wkt as shapely_from_wkt  # Shapely 2.x vectorized API
+except Exception:
+    shapely = None
+    shapely_from_wkt = None
+
+def _parse_wkt_array(values):
+    """Parse an array of WKT strings in one GEOS call; non-string entries become None."""
+    arr = np.asarray(values, dtype=object)
+    is_str = np.fromiter((isinstance(x, str) for x in arr), dtype=bool, count=len(arr))
+    out = np.full(len(arr), None, dtype=object)
+    if shapely_from_wkt is not None:
+        out[is_str] = shapely_from_wkt(arr[is_str].astype(str))
+    else:
+        out[is_str] = [wkt.loads(x) for x in arr[is_str]]
+    return out
 
 def normalize_hazards(haz):
     import pandas as pd
@@ -391,13 +482,16 @@ def normalize_hazards(haz):
     if isinstance(haz, pd.DataFrame):
         df = haz.copy()
         if "geometry" in df.columns:
-            if df["geometry"].dtype == object and df["geometry"].apply(lambda x: isinstance(x, str)).all() and wkt is not None:
-                df["geometry"] = df["geometry"].apply(lambda s: wkt.loads(s) if isinstance(s, str) else s)
+            # WKT may arrive as object or pandas string dtype
+            if wkt is not None:
+                geoms = df["geometry"].to_numpy(dtype=object)
+                if np.fromiter((isinstance(x, str) for x in geoms), dtype=bool, count=len(geoms)).all():
+                    df["geometry"] = _parse_wkt_array(geoms)
             if gpd is not None:
                 return gpd.GeoDataFrame(df, geometry="geometry", crs="EPSG:4326")
             return df
         if "wkt" in df.columns and wkt is not None:
-            df["geometry"] = df["wkt"].apply(lambda s: wkt.loads(s) if isinstance(s, str) else None)
+            df["geometry"] = _parse_wkt_array(df["wkt"].to_numpy(dtype=object))
             if gpd is not None:
                 return gpd.GeoDataFrame(df, geometry="geometry", crs="EPSG:4326")
             return df
@@ -414,8 +508,13 @@ def normalize_hazards(haz):
 hazards = normalize_hazards(hazards)
 
 # ---------------- Live weather ----------------
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_weather_cached(state_name):
+    # At most one API call per state per minute, even under the 2s auto-refresh
+    return live_weather.fetch_weather_for_state(state_name)
+
 try:
-    live_wx = live_weather.fetch_weather_for_state(state)
+    live_wx = _fetch_weather_cached(state)
     base_rain = live_wx.get("rainfall_mm", rainfall_mm) if live_wx else rainfall_mm
     base_wind = live_wx.get("wind_kph", wind_kph) if live_wx else wind_kph
 except Exception:
@@ -425,14 +524,50 @@ except Exception:
 weather = {"state": state, "rainfall_mm": base_rain, "wind_kph": base_wind, "timestamp": datetime.now().timestamp()}
 
 # ---------------- Risk scoring & fusion ----------------
+def _frame_fingerprint(df):
+    """Order-sensitive content hash of a (Geo)DataFrame for cache keys; None when missing."""
+    if df is None:
+        return None
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest()
+    except Exception:
+        return hashlib.blake2b(df.astype(str).to_csv().encode(), digest_size=16).digest()
+
+
+# Scores only change with their inputs; the weather timestamp is left out of the key
+@st.cache_data(ttl=None, max_entries=32, show_spinner=False)
+def _score_disaster_cached(state_name, rain, wind, trigger):
+    return risk_disaster.score_disaster({"state": state_name, "rainfall_mm": rain, "wind_kph": wind, "timestamp": 0}, trigger)
+
+@st.cache_data(ttl=None, max_entries=32, show_spinner=False)
+def _score_crowd_cached(crowd_key, _crowd_df, trigger):
+    return risk_crowd.score_crowd(_crowd_df, trigger)
+
+# Advisory and translation go over the network; reruns mostly repeat the same arguments
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def _cached_advisory(sev, drv_tuple, role):
+    return llm_insights.generate_advisory(sev, list(drv_tuple), role=role)
+
+# _translate_cached raises on failure (translate() would hand back the English text), so only real
+# results are cached; call sites fall back to English themselves
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _cached_translate(text, dest):
+    return translate._translate_cached(text, dest)
+
+# translate_many raises on failure, so st.cache_data never keeps the English input as a translation
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _cached_translate_many(texts, dest):
+    return translate.translate_many(texts, dest=dest)
+
 try:
-    disaster_score, drivers = risk_disaster.score_disaster(weather, trigger_flood)
+    disaster_score, drivers = _score_disaster_cached(state, weather["rainfall_mm"], weather["wind_kph"], trigger_flood)
 except Exception as e:
     st.warning(f"Disaster scoring failed: {e}")
     disaster_score, drivers = 0.0, [f"Disaster scoring error: {e}"]
 
 try:
-    crowd_score, crowd_drivers = risk_crowd.score_crowd(crowd_sim, trigger_crowd)
+    crowd_score, crowd_drivers = _score_crowd_cached(_frame_fingerprint(crowd_sim), crowd_sim, trigger_crowd)
 except Exception as e:
     st.warning(f"Crowd scoring failed: {e}")
     crowd_score, crowd_drivers = 0.0, [f"Crowd scoring error: {e}"]
@@ -445,39 +580,63 @@ except Exception as e:
 
 # Update risk history
 current_time = datetime.now()
-st.session_state.risk_history.append({"timestamp": current_time, "disaster_score": float(disaster_score), "crowd_score": float(crowd_score), "combined": float(max(disaster_score, crowd_score * 0.9)), "severity": severity})
-if len(st.session_state.risk_history) > 100:
-    st.session_state.risk_history = st.session_state.risk_history[-100:]
+# Tier index straight from the fusion thresholds, so it is right whatever language severity is in
+combined_now, sev_code = fusion_engine.fuse_batch(disaster_score, crowd_score)
+st.session_state.risk_history[st.session_state.risk_head % RISK_HISTORY_LEN] = (
+    np.datetime64(current_time, "ms"), disaster_score, crowd_score, combined_now, sev_code)
+st.session_state.risk_head += 1
     # After you compute disaster_score, crowd_score, severity, recommendations
 combined_score = max(disaster_score, crowd_score * 0.9)
 
 st.subheader("Hazard Intensity Progress")
-progress = st.progress(0)
-for i in range(int(combined_score)):
-    time.sleep(0.01)
-    progress.progress(i + 1)
+st.progress(min(1.0, max(0.0, float(combined_score))), text=f"{combined_score*100:.0f}%")
 
 
 # ---------------- Helpers ----------------
-def haversine_km(p1, p2):
-    lat1, lon1 = p1
-    lat2, lon2 = p2
-    R = 6371.0
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
-
-def calculate_bearing(p1, p2):
-    """Calculate bearing between two points in degrees."""
-    lat1, lon1 = math.radians(p1[0]), math.radians(p1[1])
-    lat2, lon2 = math.radians(p2[0]), math.radians(p2[1])
-    dlon = lon2 - lon1
-    y = math.sin(dlon) * math.cos(lat2)
-    x = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(dlon)
-    bearing = math.degrees(math.atan2(y, x))
-    return (bearing + 360) % 360
+haversine_km = geo.haversine_km
+calculate_bearing = geo.bearing_deg
+
+# Voice-nav direction lookup: np.digitize bin edges (degrees) and the phrase for each bucket
+TURN_BINS = np.array([22.5, 67.5, 112.5, 157.5, 202.5, 247.5, 292.5, 337.5])
+TURN_TABLE = ("Continue straight ahead", "Turn slightly right", "Turn right", "Turn sharp right",
+              "Make a U-turn", "Turn sharp left", "Turn left", "Turn slightly left", "Continue straight ahead")
+CARDINAL_BINS = np.array([45.0, 135.0, 225.0, 315.0])
+CARDINAL_TABLE = ("Head north", "Head east", "Head south", "Head west", "Head north")
+
+# Below this many shelters a full vectorized haversine scan beats building/querying an R-tree
+SHELTER_TREE_MIN = 256
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _shelter_tree(shelters_key, _lats, _lons):
+    """STRtree over valid shelter points (lon, lat) plus the row index of each tree item."""
+    valid_idx = np.flatnonzero(np.isfinite(_lats) & np.isfinite(_lons))
+    return shapely.STRtree(shapely.points(_lons[valid_idx], _lats[valid_idx])), valid_idx
+
+def _shelter_candidates(shelters_key, lats, lons, origin):
+    """Row indices that can hold the great-circle nearest shelter, found via an R-tree prefilter."""
+    tree, valid_idx = _shelter_tree(shelters_key, lats, lons)
+    if len(valid_idx) == 0:
+        return valid_idx
+    # Planar nearest gives an upper bound on the true distance; only points inside that radius qualify
+    first = valid_idx[int(tree.nearest(shapely.points(origin[1], origin[0])))]
+    dlat = np.degrees(haversine_km(origin, (lats[first], lons[first])) / geo.EARTH_RADIUS_KM)
+    max_lat = abs(origin[0]) + dlat
+    if max_lat >= 89.0:
+        return valid_idx
+    dlon = dlat / np.cos(np.radians(max_lat))
+    window = shapely.box(origin[1] - dlon, origin[0] - dlat, origin[1] + dlon, origin[0] + dlat)
+    return valid_idx[tree.query(window)]
+
+def shelter_arrays(shelters, shelters_key):
+    """Shelter columns as (lat, lon, name) arrays, kept in session_state until the frame changes."""
+    soa = st.session_state.get("shelter_soa")
+    if soa is not None and soa[0] == shelters_key:
+        return soa[1], soa[2], soa[3]
+    lats = pd.to_numeric(shelters["lat"], errors="coerce").to_numpy(dtype=np.float64)
+    lons = pd.to_numeric(shelters["lon"], errors="coerce").to_numpy(dtype=np.float64)
+    names = shelters["name"].to_numpy(dtype=object) if "name" in shelters.columns else np.full(len(lats), "Shelter", dtype=object)
+    st.session_state.shelter_soa = (shelters_key, lats, lons, names)
+    return lats, lons, names
 
 def generate_voice_navigation(route, origin, target, target_name, dist_km, eta_min, lang="en"):
     """Generate GPS-like turn-by-turn voice navigation instructions from route."""
@@ -492,60 +651,28 @@ def generate_voice_navigation(route, origin, target, target_name, dist_km, eta_m
     # Generate detailed turn-by-turn instructions (GPS style)
     # Use smaller segments for more detailed navigation
     segment_size = max(1, len(route) // 15)  # More segments for better navigation
-    prev_bearing = None
-    cumulative_distance = 0
-    
-    for i in range(0, len(route) - 1, segment_size):
-        if i + segment_size >= len(route):
-            # Handle last segment
-            current = route[i]
-            next_point = route[-1]
-        else:
-            current = route[i]
-            next_point = route[min(i + segment_size, len(route) - 1)]
-        
-        distance_seg = haversine_km(current, next_point) * 1000  # in meters
-        cumulative_distance += distance_seg
-        
-        if distance_seg < 5:  # Skip very short segments
-            continue
-        
-        bearing = calculate_bearing(current, next_point)
-        
-        # Determine direction with more detail (GPS style)
-        if prev_bearing is not None:
-            turn_angle = (bearing - prev_bearing + 360) % 360
-            
-            # More precise turn instructions
-            if turn_angle > 337.5 or turn_angle < 22.5:
-                direction = "Continue straight ahead"
-            elif 22.5 <= turn_angle < 67.5:
-                direction = "Turn slightly right"
-            elif 67.5 <= turn_angle < 112.5:
-                direction = "Turn right"
-            elif 112.5 <= turn_angle < 157.5:
-                direction = "Turn sharp right"
-            elif 157.5 <= turn_angle < 202.5:
-                direction = "Make a U-turn"
-            elif 202.5 <= turn_angle < 247.5:
-                direction = "Turn sharp left"
-            elif 247.5 <= turn_angle < 292.5:
-                direction = "Turn left"
-            elif 292.5 <= turn_angle < 337.5:
-                direction = "Turn slightly left"
-            else:
-                direction = "Continue"
-        else:
-            # First segment - use cardinal direction with distance
-            if 315 <= bearing or bearing < 45:
-                direction = "Head north"
-            elif 45 <= bearing < 135:
-                direction = "Head east"
-            elif 135 <= bearing < 225:
-                direction = "Head south"
-            else:
-                direction = "Head west"
-        
+
+    # Segment endpoints sliced from one (n, 2) array; each point is converted to radians once
+    coords = np.asarray(route, dtype=np.float64)[:, :2]
+    seg_idx = np.append(np.arange(0, len(coords) - 1, segment_size), len(coords) - 1)
+    seg_km, seg_bearings = geo.segment_metrics(coords[seg_idx])
+    seg_m = seg_km * 1000  # in meters
+    cum_m = np.cumsum(seg_m)
+    keep = seg_m >= 5  # Skip very short segments
+    kept_m, kept_bearings = seg_m[keep], seg_bearings[keep]
+    # Remaining distance to destination after each kept segment
+    remaining_m = dist_km * 1000 - cum_m[keep]
+
+    # Classify all turns at once: each kept segment's bearing relative to the previous kept one,
+    # bucketed into 45° sectors; the first segment gets a cardinal direction instead
+    directions = []
+    if len(kept_bearings):
+        turn_angles = (kept_bearings[1:] - kept_bearings[:-1] + 360) % 360
+        directions.append(CARDINAL_TABLE[int(np.digitize(kept_bearings[0], CARDINAL_BINS))])
+        directions.extend(TURN_TABLE[i] for i in np.digitize(turn_angles, TURN_BINS))
+
+    # Only string formatting is left per segment
+    for distance_seg, bearing, remaining_dist, direction in zip(kept_m.tolist(), kept_bearings.tolist(), remaining_m.tolist(), directions):
         # Format distance in GPS style
         if distance_seg < 100:
             distance_text = f"{int(distance_seg)} meters"
@@ -554,8 +681,6 @@ def generate_voice_navigation(route, origin, target, target_name, dist_km, eta_m
         else:
             distance_text = f"{distance_seg/1000:.1f} kilometers"
         
-        # Remaining distance to destination
-        remaining_dist = dist_km * 1000 - cumulative_distance
         if remaining_dist > 1000:
             remaining_text = f" {remaining_dist/1000:.1f} kilometers remaining"
         elif remaining_dist > 0:
@@ -573,7 +698,6 @@ def generate_voice_navigation(route, origin, target, target_name, dist_km, eta_m
             "remaining": remaining_dist,
             "priority": "normal"
         })
-        prev_bearing = bearing
     
     # Approaching destination
     if len(instructions) > 0:
@@ -592,7 +716,31 @@ def simulate_live_location(state_name, jitter_meters=50):
         return (9.931233, 76.267304)
     lat, lon = base
     jitter_deg = (jitter_meters / 111000.0)
-    return (lat + random.uniform(-jitter_deg, jitter_deg), lon + random.uniform(-jitter_deg, jitter_deg))
+    j_lat, j_lon = geo.jitter_coords(lat, lon, jitter_deg, 1)[0]
+    return (float(j_lat), float(j_lon))
+
+# Instructions depend only on the route geometry and the summary figures; the polyline digest keys them
+@st.cache_data(ttl=None, max_entries=32, show_spinner=False)
+def _voice_nav_cached(route_key, _route, _origin, _target, target_name, dist_km, eta_min, lang):
+    return generate_voice_navigation(_route, _origin, _target, target_name, dist_km, eta_min, lang=lang)
+
+def route_digest(route):
+    """Short content hash of a route polyline (its (lat, lon) columns as float64)."""
+    coords = np.ascontiguousarray(np.asarray(route, dtype=np.float64)[:, :2])
+    return hashlib.blake2b(coords.tobytes(), digest_size=12).hexdigest()
+
+
+class _TTSTextFallback(Exception):
+    """Raised by _cached_tts when only a text fallback was produced (so it is not cached)."""
+
+
+# Audio bytes per (text, lang); the digest is the cache key so long texts aren't rehashed by Streamlit
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def _cached_tts(tts_key, _text, lang):
+    path = tts_module.generate_tts(_text, lang=lang)
+    if isinstance(path, str) and path.lower().endswith(".mp3") and Path(path).exists():
+        return Path(path).read_bytes()
+    raise _TTSTextFallback(path)
 
 # Robust TTS play wrapper with cooldown
 def play_and_stream_tts(text, lang="en", cooldown_seconds=3):
@@ -603,18 +751,19 @@ def play_and_stream_tts(text, lang="en", cooldown_seconds=3):
     st.session_state.last_tts_time = now
 
     try:
-        path = tts_module.generate_tts(text, lang=lang)
-        if isinstance(path, str) and path.lower().endswith(".mp3") and Path(path).exists():
-            try:
-                st.audio(path, format="audio/mp3")
-                logger.info(f"TTS succeeded, wrote {path}")
-                return True
-            except Exception as e:
-                logger.warning(f"Audio playback failed: {e}")
-                return False
-        else:
+        tts_key = hashlib.blake2b(f"{text}||{lang}".encode("utf-8"), digest_size=16).hexdigest()
+        try:
+            audio = _cached_tts(tts_key, text, lang)
+        except _TTSTextFallback as fallback:
             st.info("TTS fallback (text):")
-            st.write(path)
+            st.write(fallback.args[0] if fallback.args else text)
+            return False
+        try:
+            st.audio(audio, format="audio/mp3")
+            logger.info(f"TTS audio ready ({len(audio)} bytes)")
+            return True
+        except Exception as e:
+            logger.warning(f"Audio playback failed: {e}")
             return False
     except Exception as e:
         logger.error(f"TTS error: {e}")
@@ -624,12 +773,11 @@ def play_and_stream_tts(text, lang="en", cooldown_seconds=3):
 # Safe graph loader (validate return)
 def safe_load_graph(online=True, center_point=None):
     try:
+        lat, lon = (round(center_point[0], 2), round(center_point[1], 2)) if center_point else (None, None)
         try:
-            G = routing.load_graph(online=online, center_point=center_point)
-        except TypeError:
-            G = routing.load_graph(online=online)
+            G = _load_graph_cached(online, lat, lon)
         except Exception:
-            G = routing.load_graph(online=online)
+            G = _load_graph_cached(online, None, None)
         try:
             import networkx as nx
             if isinstance(G, nx.Graph) or (hasattr(G, "nodes") and hasattr(G, "edges")):
@@ -645,98 +793,104 @@ def safe_load_graph(online=True, center_point=None):
         st.warning(f"Graph load error: {e}")
         return None
 
-# ---------------- UI: header & map rendering ----------------
-col_header1, col_header2, col_header3 = st.columns([2, 1, 1])
-with col_header1:
-    st.title("🛡️ CrowdShield — AI Disaster Copilot")
-    if st.session_state.auto_refresh_enabled:
-        st.markdown('LIVE', unsafe_allow_html=True)
-with col_header2:
-    status_color = {"Low": "🟢", "Medium": "🟡", "High": "🟠", "Critical": "🔴"}.get(severity, "⚪")
-    st.metric(i18n["live_status"], f"{status_color} {severity}")
-with col_header3:
-    update_time = st.session_state.last_update.strftime("%H:%M:%S")
-    st.caption(f"Last update: {update_time}")
-    if st.session_state.auto_refresh_enabled:
-        next_update = st.session_state.refresh_interval - (datetime.now() - st.session_state.last_update).total_seconds()
-        if next_update > 0:
-            st.caption(f"🔄 Next: {int(next_update)}s")
-        else:
-            st.caption(f"🔄 Auto-refresh: {st.session_state.refresh_interval}s")
-
-st.markdown("---")
-
-left_col, right_col = st.columns([2, 1])
-
-with left_col:
-    st.subheader(i18n["map"])
-    center_point = STATE_CENTERS.get(state, (9.931233, 76.267304))
 
-    # Create base map
-    m = folium.Map(location=center_point, zoom_start=12, tiles="OpenStreetMap")
-
-    # Add origin marker
-    folium.Marker(location=center_point, tooltip="Origin").add_to(m)
-
-    # Choose route mode
-    route_mode = st.sidebar.radio("Route Mode", ["Shortest", "Fastest", "Safest"], index=0)
-
-    try:
-        if route_mode == "Shortest":
-            route = routing.compute_shortest_path(G, center_point, shelters[0])  # pick first shelter
-            if route:
-                folium.PolyLine(route, color="blue", weight=5, tooltip="Shortest Route").add_to(m)
-
-        elif route_mode == "Fastest":
-            route = routing.find_fastest_route(G, center_point, shelters)
-            if route:
-                folium.PolyLine(route, color="green", weight=5, tooltip="Fastest Route").add_to(m)
-
-        elif route_mode == "Safest":
-            route = routing.find_safest_route(G, center_point, shelters, hazards)
-            if route:
-                folium.PolyLine(route, color="red", weight=5, tooltip="Safest Route").add_to(m)
+# Leaflet marker factory for the crowd FastMarkerCluster; rows are [lat, lon, tooltip]
+_CROWD_MARKER_JS = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+        {radius: 5, color: "#1f77b4", fill: true, fillColor: "#1f77b4"});
+    marker.bindTooltip(row[2]);
+    return marker;
+}
+"""
+
+# Same for incident reports; rows are [lat, lon, tooltip, popup_html]
+_REPORT_MARKER_JS = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+        {radius: 6, color: "red", fill: true, fillColor: "red"});
+    marker.bindTooltip(row[2]);
+    marker.bindPopup(row[3], {maxWidth: 250});
+    return marker;
+}
+"""
 
-    except Exception as e:
-        st.warning(f"Route computation failed: {e}")
+# From this many reports on, they are drawn client-side from one JSON array instead of per-marker scripts
+REPORTS_CLUSTER_MIN = 200
+REPORT_COLUMNS = ("lat", "lon", "type", "severity", "note")
 
-    from streamlit_folium import st_folium
-    st_folium(m, width=700, height=500)
 
+def _reports_frame(reports):
+    """Reports as one columnar frame (lat/lon numeric, label defaults filled); rows without a position dropped."""
+    df = pd.DataFrame.from_records(list(reports), columns=list(REPORT_COLUMNS))
+    df[["lat", "lon"]] = df[["lat", "lon"]].apply(pd.to_numeric, errors="coerce")
+    df = df.dropna(subset=["lat", "lon"])
+    return df.fillna({"type": "Incident", "severity": "?", "note": ""}).astype({"type": str, "severity": str, "note": str})
 
 
+# Static layers (tiles, hazards, shelters) are built once per base_key and shared; the lock guards
+# the temporary overlay children added while one caller renders
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _base_map_cached(base_key, _center_point, _hazards, _shelters, _i18n):
+    """Return (folium map with tiles/hazards/shelters, threading.Lock, [(level, message), ...])."""
+    import folium
+    notes = []
+    center_point = _center_point
     try:
-        m = ux.create_base_map(center_point=center_point, zoom_start=12)
+        # Hazard/shelter/report groups are added below, so keep the control to toggle them
+        m = ux.create_base_map(center_point=center_point, zoom_start=12, layer_control=True)
         if m is None:
             m = folium.Map(location=center_point, zoom_start=12, tiles="OpenStreetMap")
     except Exception as e:
-        st.warning(f"ux.create_base_map failed: {e}")
+        notes.append(("warning", f"ux.create_base_map failed: {e}"))
         m = folium.Map(location=center_point, zoom_start=12, tiles="OpenStreetMap")
 
-    # Add hazards, shelters, crowd points
+    # Add hazards, shelters
     try:
-        ux.add_hazards_to_map(m, hazards, i18n=i18n)
+        ux.add_hazards_to_map(m, _hazards, i18n=_i18n)
     except Exception as e:
-        st.warning(f"Could not add hazards: {e}")
+        notes.append(("warning", f"Could not add hazards: {e}"))
 
+    # Shelter markers go into one layer that is attached to the map once
     try:
-        ux.add_shelters_to_map(m, shelters, i18n=i18n)
+        shelter_layer = folium.FeatureGroup(name="Shelters")
+        ux.add_shelters_to_map(shelter_layer, _shelters, i18n=_i18n)
+        shelter_layer.add_to(m)
     except Exception as e:
-        st.warning(f"Could not add shelters: {e}")
+        notes.append(("warning", f"Could not add shelters: {e}"))
+    return m, threading.Lock(), notes
+
 
+def _add_overlay_layers(m, crowd_sim, origin, route, route_mode_used, target_coord, target_name, reports, i18n):
+    """Add the per-render layers (crowd, origin, route, target, reports) to m; return notes."""
+    import folium
+    try:
+        from folium.plugins import FastMarkerCluster
+    except Exception:
+        FastMarkerCluster = None
+    notes = []
     try:
         if crowd_sim is not None and not crowd_sim.empty:
-            for _, c in crowd_sim.iterrows():
-                try:
-                    folium.CircleMarker(location=[float(c["lat"]), float(c["lon"])], radius=5, color="#1f77b4", fill=True, fill_color="#1f77b4", tooltip=f'Crowd {c.get("id","?")} • {int(c.get("people",0))} people').add_to(m)
-                except Exception:
-                    continue
+            # Tooltips and coordinates built column-wise; rows without a valid position are dropped
+            c_ids = crowd_sim["id"].astype(str) if "id" in crowd_sim.columns else pd.Series("?", index=crowd_sim.index)
+            c_people = (pd.to_numeric(crowd_sim["people"], errors="coerce").fillna(0).astype(int).astype(str)
+                        if "people" in crowd_sim.columns else "0")
+            c_tooltips = ("Crowd " + c_ids + " • " + c_people + " people").to_numpy()
+            c_latlon = crowd_sim[["lat", "lon"]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+            valid = np.isfinite(c_latlon).all(axis=1)
+            c_latlon, c_tooltips = c_latlon[valid].tolist(), c_tooltips[valid].tolist()
+            if FastMarkerCluster is not None:
+                # One JS-side layer: markers are created in the browser from plain [lat, lon, tooltip] rows
+                crowd_rows = [[lat, lon, tip] for (lat, lon), tip in zip(c_latlon, c_tooltips)]
+                FastMarkerCluster(crowd_rows, callback=_CROWD_MARKER_JS, name="Crowd",
+                                  options={"disableClusteringAtZoom": 15}).add_to(m)
+            else:
+                for (c_lat, c_lon), c_tip in zip(c_latlon, c_tooltips):
+                    folium.CircleMarker(location=[c_lat, c_lon], radius=5, color="#1f77b4", fill=True, fill_color="#1f77b4", tooltip=c_tip).add_to(m)
     except Exception as e:
-        st.warning(f"Could not add crowd points: {e}")
+        notes.append(("warning", f"Could not add crowd points: {e}"))
 
     # Origin
-    simulate_live = st.checkbox("Simulate live location (mock device)", value=True)
-    origin = simulate_live_location(state) if simulate_live else (gps_mock.get_mock_location_for_state(state) or (9.931233, 76.267304))
     try:
         ux.add_origin_to_map(m, origin, i18n=i18n)
     except Exception:
@@ -745,19 +899,192 @@ with left_col:
         except Exception:
             pass
 
+    # Add route and highlight - ALWAYS show route if available
+    if route and len(route) >= 2:
+        try:
+            # Primary method: use ux helper
+            ux.add_route_to_map(m, route, i18n=i18n)
+            notes.append(("success", f"✅ Route displayed: {len(route)} waypoints | Mode: {route_mode_used}"))
+        except Exception as route_error:
+            notes.append(("warning", f"Route display error: {route_error}"))
+            try:
+                # Fallback: direct folium PolyLine with better styling
+                route_pts = np.asarray(route, dtype=float)[:, :2].tolist()
+                folium.PolyLine(
+                    locations=route_pts, 
+                    color="#00FF00",  # Bright green
+                    weight=6, 
+                    opacity=0.9,
+                    tooltip="Safe Escape Route",
+                    popup=f"Route to {target_name}"
+                ).add_to(m)
+                # Add prominent start marker
+                folium.Marker(
+                    location=route_pts[0], 
+                    icon=folium.Icon(color="green", icon="play", prefix="fa"), 
+                    popup=f"Start: Your Location",
+                    tooltip="You are here"
+                ).add_to(m)
+                # Add prominent end marker
+                folium.Marker(
+                    location=route_pts[-1], 
+                    icon=folium.Icon(color="red", icon="flag", prefix="fa"), 
+                    popup=f"Destination: {target_name}",
+                    tooltip=f"Safe Zone: {target_name}"
+                ).add_to(m)
+                notes.append(("info", "✅ Route displayed on map (using fallback method)"))
+            except Exception as fallback_error:
+                notes.append(("error", f"❌ Failed to display route: {fallback_error}"))
+
+    try:
+        folium.CircleMarker(location=target_coord, radius=8, color="purple", fill=True, fillColor="purple", tooltip=f"Target: {target_name}").add_to(m)
+    except Exception:
+        pass
+
+    report_layer = folium.FeatureGroup(name="Reports")
+    try:
+        if FastMarkerCluster is not None and len(reports) >= REPORTS_CLUSTER_MIN:
+            # Labels built column-wise, then one pass of plain tuples into the JSON rows
+            rdf = _reports_frame(reports)
+            tips = rdf["type"] + " (" + rdf["severity"] + ")"
+            popups = "<b>" + rdf["type"] + "</b><br>Severity: " + rdf["severity"] + "<br>" + rdf["note"]
+            report_rows = [list(row) for row in zip(rdf["lat"].tolist(), rdf["lon"].tolist(), tips.tolist(), popups.tolist())]
+            FastMarkerCluster(report_rows, callback=_REPORT_MARKER_JS).add_to(report_layer)
+        else:
+            ux.add_reports_to_map(report_layer, reports, i18n=i18n)
+    except Exception:
+        try:
+            rows = _reports_frame(reports)[["lat", "lon", "type", "severity"]].itertuples(index=False, name=None)
+        except Exception:
+            rows = ()
+        for lat, lon, typ, sev in rows:
+            try:
+                folium.Marker(location=(lat, lon), tooltip=f"{typ} ({sev})").add_to(report_layer)
+            except Exception:
+                continue
+    if reports:
+        report_layer.add_to(m)
+
+    return notes
+
+
+# Underscore args are skipped by st.cache_data hashing; map_key carries their fingerprints
+@st.cache_data(ttl=600, show_spinner=False, max_entries=32)
+def _build_map_html(map_key, base_key, _center_point, _hazards, _shelters, _crowd_sim, _origin, _route,
+                    _route_mode_used, _target_coord, _target_name, _reports, _i18n):
+    """Build the folium map once per distinct input set; return (html, [(level, message), ...])."""
+    m, lock, base_notes = _base_map_cached(base_key, _center_point, _hazards, _shelters, _i18n)
+    notes = list(base_notes)
+    with lock:
+        base_children = set(m._children)
+        try:
+            notes += _add_overlay_layers(m, _crowd_sim, _origin, _route, _route_mode_used, _target_coord,
+                                         _target_name, _reports, _i18n)
+            # The bare HTML document, rendered in a fresh Figure: no scripts of earlier renders and no
+            # escaped srcdoc iframe nested inside the component's iframe
+            return ux.prerender(m), notes
+        finally:
+            # Leave the shared base map as it was
+            for name in [k for k in m._children if k not in base_children]:
+                m._children.pop(name, None)
+            m._parent = None
+
+
+def render_map_panel(center_point, hazards, shelters, crowd_sim, origin, route, route_mode_used,
+                     target_coord, target_name, should_find_route):
+    """Render the map from cached HTML; it is only rebuilt when one of its inputs changes."""
+    reports = st.session_state.get("reports", [])
+    # Origin is rounded (~100 m) in the key so live-location jitter alone doesn't force a rebuild
+    base_key = (tuple(center_point), _frame_fingerprint(hazards), _frame_fingerprint(shelters), lang)
+    map_key = (
+        base_key,
+        _frame_fingerprint(crowd_sim),
+        (round(origin[0], 3), round(origin[1], 3)),
+        tuple((float(pt[0]), float(pt[1])) for pt in route) if route else None,
+        route_mode_used,
+        tuple(target_coord),
+        target_name,
+        repr(reports),
+    )
+    try:
+        # Unchanged inputs between reruns (e.g. auto-refresh ticks) reuse the last HTML directly
+        last_map = st.session_state.get("last_map")
+        if last_map is not None and last_map[0] == map_key:
+            html, notes = last_map[1], last_map[2]
+        else:
+            html, notes = _build_map_html(map_key, base_key, center_point, hazards, shelters, crowd_sim, origin, route,
+                                          route_mode_used, target_coord, target_name, reports, i18n)
+            st.session_state.last_map = (map_key, html, notes)
+    except Exception as e:
+        st.error(f"Map rendering error: {e}")
+        st.exception(e)
+        return
+
+    for level, message in notes:
+        getattr(st, level)(message)
+    if not route or len(route) < 2:
+        if should_find_route:
+            # Route calculation was attempted but failed
+            st.error(f"⚠️ Could not calculate route. Mode: {route_mode_used}")
+            st.info("💡 Try: Enable 'Auto-calculate route' or click 'Find Safe Route'")
+            if st.session_state.get("debug_toggle", False):
+                st.info(f"📍 Origin: {origin} | Target: {target_coord}")
+        elif not auto_route:
+            st.warning("💡 Enable 'Auto-calculate route' to show escape route on map")
+
+    # Render map
+    components.html(html, height=600)
+
+
+# ---------------- UI: header & map rendering ----------------
+col_header1, col_header2, col_header3 = st.columns([2, 1, 1])
+with col_header1:
+    st.title("🛡️ CrowdShield — AI Disaster Copilot")
+    if st.session_state.auto_refresh_enabled:
+        st.markdown('LIVE', unsafe_allow_html=True)
+with col_header2:
+    status_color = SEVERITY_ICONS.get(severity, "⚪")
+    st.metric(i18n["live_status"], f"{status_color} {severity}")
+with col_header3:
+    update_time = st.session_state.last_update.strftime("%H:%M:%S")
+    st.caption(f"Last update: {update_time}")
+    if st.session_state.auto_refresh_enabled:
+        next_update = st.session_state.refresh_interval - (datetime.now() - st.session_state.last_update).total_seconds()
+        if next_update > 0:
+            st.caption(f"🔄 Next: {int(next_update)}s")
+        else:
+            st.caption(f"🔄 Auto-refresh: {st.session_state.refresh_interval}s")
+
+st.markdown("---")
+
+left_col, right_col = st.columns([2, 1])
+
+with left_col:
+    st.subheader(i18n["map"])
+    center_point = STATE_CENTERS.get(state, (9.931233, 76.267304))
+
+    # Origin
+    simulate_live = st.checkbox("Simulate live location (mock device)", value=True)
+    origin = simulate_live_location(state) if simulate_live else (gps_mock.get_mock_location_for_state(state) or (9.931233, 76.267304))
+
     # Nearest shelter
     try:
-        shelter_rows = []
+        shelter_rank = None
         if shelters is not None and not shelters.empty:
-            for _, r in shelters.iterrows():
-                try:
-                    shelter_rows.append((float(r.lat), float(r.lon), r.get("name", "Shelter")))
-                except Exception:
-                    continue
-        if shelter_rows:
-            target = min(shelter_rows, key=lambda s: haversine_km(origin, (s[0], s[1])))
-            target_coord = (target[0], target[1])
-            target_name = target[2]
+            shelters_fp = _frame_fingerprint(shelters)
+            shelter_lats, shelter_lons, shelter_names = shelter_arrays(shelters, shelters_fp)
+            cand = np.arange(len(shelter_lats))
+            if shapely is not None and len(cand) >= SHELTER_TREE_MIN:
+                # Large shelter sets: R-tree prefilter, exact haversine only on the survivors
+                cand = _shelter_candidates(shelters_fp, shelter_lats, shelter_lons, origin)
+            # Rank by the haversine inner term; the full distance is computed for the winner only
+            shelter_rank = np.full(len(shelter_lats), np.inf)
+            shelter_rank[cand] = geo.haversine_rank_vec(origin[0], origin[1], shelter_lats[cand], shelter_lons[cand])
+            shelter_rank[np.isnan(shelter_rank)] = np.inf
+        if shelter_rank is not None and np.isfinite(shelter_rank).any():
+            idx = int(shelter_rank.argmin())
+            target_coord = (float(shelter_lats[idx]), float(shelter_lons[idx]))
+            target_name = shelter_names[idx]
             dist_km = haversine_km(origin, target_coord)
             eta_min = int((dist_km / 4.5) * 60)
         else:
@@ -779,134 +1106,88 @@ with left_col:
     effective_route_mode = "Safest" if st.session_state.voice_nav_enabled else route_mode
     # Find route if: button clicked, voice nav enabled, or auto-route enabled
     should_find_route = find_route or st.session_state.voice_nav_enabled or auto_route
-    if should_find_route:
+    # Everything the routing result depends on; a match reuses the last route without touching the graph
+    route_fp = (
+        round(origin[0], 5), round(origin[1], 5), round(target_coord[0], 5), round(target_coord[1], 5),
+        effective_route_mode, st.session_state.voice_nav_enabled, offline_mode, tuple(center_point),
+        _frame_fingerprint(hazards),
+    )
+    route_reusable = False  # set for reused routes and ones computed on a graph without errors
+    if should_find_route and st.session_state.get("last_route") and st.session_state.get("last_route_fp") == route_fp:
+        route = st.session_state.last_route
+        route_mode_used = st.session_state.get("last_route_mode", route_mode_used)
+        route_reusable = True
+    elif should_find_route:
         G = safe_load_graph(online=not offline_mode, center_point=center_point)
         if G is None:
             try:
                 route = routing.grid_route_fallback(origin, target_coord)
                 route_mode_used = "Grid fallback (no graph)"
             except Exception:
-                steps = 20
-                lat1, lon1 = origin
-                lat2, lon2 = target_coord
-                route = [(lat1 + (lat2 - lat1) * i / steps, lon1 + (lon2 - lon1) * i / steps) for i in range(steps + 1)]
+                route = geo.linear_route(origin, target_coord, 20).tolist()
                 route_mode_used = "Straight-line fallback (no graph)"
         else:
             try:
-                G_blocked = routing.block_edges_by_hazards(G, hazards) if hazards is not None else G
-                if effective_route_mode == "Shortest" and hasattr(routing, "compute_shortest_path"):
-                    route = routing.compute_shortest_path(G_blocked, origin, target_coord)
-                elif effective_route_mode == "Fastest" and hasattr(routing, "compute_fastest_path"):
-                    route = routing.compute_fastest_path(G_blocked, origin, target_coord)
-                elif effective_route_mode == "Safest" and hasattr(routing, "compute_safest_path"):
-                    route = routing.compute_safest_path(G_blocked, origin, target_coord, hazards)
+                computed = True  # False when no compute_* function was available
+                if effective_route_mode == "Safest" and hasattr(routing, "compute_safest_path_astar"):
+                    # A* on the shared graph; hazard edges are skipped as the search reaches them
+                    hazard_tree = data_loader.get_hazard_index(hazards)
+                    route = routing.compute_safest_path_astar(G, origin, target_coord, hazard_tree)
                     route_mode_used = "Safest (Voice Navigation)" if st.session_state.voice_nav_enabled else "Safest"
                 else:
-                    route = routing.grid_route_fallback(origin, target_coord)
-                    route_mode_used = "Grid fallback (compute_* missing)"
+                    G_blocked = (routing.block_edges_by_hazards(G, hazards, data_loader.get_hazard_index(hazards))[0]
+                                 if hazards is not None else G)
+                    if effective_route_mode == "Shortest" and hasattr(routing, "compute_shortest_path"):
+                        route = routing.compute_shortest_path(G_blocked, origin, target_coord)
+                    elif effective_route_mode == "Fastest" and hasattr(routing, "compute_fastest_path"):
+                        route = routing.compute_fastest_path(G_blocked, origin, target_coord)
+                    elif effective_route_mode == "Safest" and hasattr(routing, "compute_safest_path"):
+                        route = routing.compute_safest_path(G_blocked, origin, target_coord, hazards)
+                        route_mode_used = "Safest (Voice Navigation)" if st.session_state.voice_nav_enabled else "Safest"
+                    else:
+                        route = routing.grid_route_fallback(origin, target_coord)
+                        route_mode_used = "Grid fallback (compute_* missing)"
+                        computed = False
                 if not route or len(route) < 2:
                     route = routing.grid_route_fallback(origin, target_coord)
                     route_mode_used = "Grid fallback (invalid route)"
+                else:
+                    route_reusable = computed
             except Exception as e:
                 st.warning(f"Routing failed: {e}")
                 try:
                     route = routing.grid_route_fallback(origin, target_coord)
                     route_mode_used = "Grid fallback (exception)"
                 except Exception:
-                    steps = 20
-                    lat1, lon1 = origin
-                    lat2, lon2 = target_coord
-                    route = [(lat1 + (lat2 - lat1) * i / steps, lon1 + (lon2 - lon1) * i / steps) for i in range(steps + 1)]
+                    route = geo.linear_route(origin, target_coord, 20).tolist()
                     route_mode_used = "Straight-line fallback (exception)"
 
     # Store route in session state for persistence
     if route and len(route) >= 2:
         st.session_state.last_route = route
+        # Fallback routes are stored too, but never matched by fingerprint
+        st.session_state.last_route_fp = route_fp if route_reusable else None
+        st.session_state.last_route_mode = route_mode_used
     
     # Use stored route if current calculation failed
     if not route and st.session_state.get("last_route"):
         route = st.session_state.last_route
         route_mode_used = "Previous route (cached)"
-    
-    # Add route and highlight - ALWAYS show route if available
-    if route and len(route) >= 2:
-        try:
-            # Primary method: use ux helper
-            ux.add_route_to_map(m, route, i18n=i18n)
-            st.success(f"✅ Route displayed: {len(route)} waypoints | Mode: {route_mode_used}")
-        except Exception as route_error:
-            st.warning(f"Route display error: {route_error}")
-            try:
-                # Fallback: direct folium PolyLine with better styling
-                folium.PolyLine(
-                    locations=[(float(pt[0]), float(pt[1])) for pt in route], 
-                    color="#00FF00",  # Bright green
-                    weight=6, 
-                    opacity=0.9,
-                    tooltip="Safe Escape Route",
-                    popup=f"Route to {target_name}"
-                ).add_to(m)
-                # Add prominent start marker
-                folium.Marker(
-                    location=(float(route[0][0]), float(route[0][1])), 
-                    icon=folium.Icon(color="green", icon="play", prefix="fa"), 
-                    popup=f"Start: Your Location",
-                    tooltip="You are here"
-                ).add_to(m)
-                # Add prominent end marker
-                folium.Marker(
-                    location=(float(route[-1][0]), float(route[-1][1])), 
-                    icon=folium.Icon(color="red", icon="flag", prefix="fa"), 
-                    popup=f"Destination: {target_name}",
-                    tooltip=f"Safe Zone: {target_name}"
-                ).add_to(m)
-                st.info("✅ Route displayed on map (using fallback method)")
-            except Exception as fallback_error:
-                st.error(f"❌ Failed to display route: {fallback_error}")
-                st.exception(fallback_error)
-    elif should_find_route:
-        # Route calculation was attempted but failed
-        st.error(f"⚠️ Could not calculate route. Mode: {route_mode_used}")
-        st.info("💡 Try: Enable 'Auto-calculate route' or click 'Find Safe Route'")
-        if st.session_state.get("debug_toggle", False):
-            st.info(f"📍 Origin: {origin} | Target: {target_coord}")
-    else:
-        if not auto_route:
-            st.warning("💡 Enable 'Auto-calculate route' to show escape route on map")
-
-    try:
-        folium.CircleMarker(location=target_coord, radius=8, color="purple", fill=True, fillColor="purple", tooltip=f"Target: {target_name}").add_to(m)
-    except Exception:
-        pass
 
-    try:
-        ux.add_reports_to_map(m, st.session_state.get("reports", []), i18n=i18n)
-    except Exception:
-        for r in st.session_state.get("reports", []):
-            try:
-                folium.Marker(location=(r["lat"], r["lon"]), tooltip=f"{r['type']} ({r['severity']})").add_to(m)
-            except Exception:
-                continue
-
-    # Render map
-    try:
-        ux.render_map(m, height=600)
-    except Exception as e:
-        st.error(f"Map rendering error: {e}")
-        st.exception(e)
+    # Map panel: renders cached HTML, rebuilt only when its inputs change
+    render_map_panel(center_point, hazards, shelters, crowd_sim, origin, route, route_mode_used,
+                     target_coord, target_name, should_find_route)
 
 with right_col:
-    severity_colors = {"Low": "#2ECC71", "Medium": "#F5B041", "High": "#E67E22", "Critical": "#C0392B"}
     st.subheader(i18n["severity"])
-    color = severity_colors.get(severity, "#bdc3c7")
+    color = SEVERITY_COLORS.get(severity, "#bdc3c7")
     st.markdown(f"{severity}", unsafe_allow_html=True)
 
     st.markdown("---")
     st.markdown("**" + i18n["drivers"] + ":**")
-    driver_icons = {"rainfall": "🌧️", "wind": "💨", "flood": "🌊", "crowd": "👥", "density": "📊"}
     for d in drivers + crowd_drivers:
         icon = "⚠️"
-        for key, emoji in driver_icons.items():
+        for key, emoji in DRIVER_ICONS.items():
             if key.lower() in str(d).lower():
                 icon = emoji
                 break
@@ -914,14 +1195,45 @@ with right_col:
 
     st.markdown("---")
     try:
-        advisory_en = llm_insights.generate_advisory(severity, drivers + crowd_drivers, role=role)
+        advisory_en = _cached_advisory(severity, tuple(drivers + crowd_drivers), role)
     except Exception:
         advisory_en = "Unable to produce advisory at this time."
 
+    # Spoken/displayed messages, built up front so the ones needed this run are translated together
+    nav_msg_en = f"Current risk level is {severity}. Nearest shelter {target_name} is {dist_km:.1f} kilometers away, approximately {eta_min} minutes on foot."
+    if route:
+        nav_msg_en += f" Using {route_mode_used} route. Follow the marked path and avoid hazards."
+    full_msg_en = f"{nav_msg_en} Advisory: {advisory_en}"
+    voice_instructions = []
+    if route:
+        voice_instructions = _voice_nav_cached(route_digest(route), route, origin, target_coord, target_name,
+                                               float(dist_km), eta_min, lang)
+    route_summary_en = f"Complete route to {target_name}. " + " ".join([instr["text"] for instr in voice_instructions])
+    spoken_steps = [
+        instr["text"] for i, instr in enumerate(voice_instructions)
+        if instr.get("priority") == "high" or i == 0 or i == len(voice_instructions) - 1
+    ]
+
+    # One translation request for every string this run needs in `lang`
+    translated = {}
+    if lang != "en" and hasattr(translate, "translate_many"):
+        wanted = [advisory_en]
+        if play_alert:
+            wanted.append(full_msg_en)
+        if voice_instructions and st.session_state.voice_nav_enabled:
+            if st.session_state.get("auto_play_voice", False):
+                wanted.extend(spoken_steps)
+            wanted.append(route_summary_en)
+        wanted = list(dict.fromkeys(wanted))
+        try:
+            translated = dict(zip(wanted, _cached_translate_many(tuple(wanted), lang)))
+        except Exception:
+            translated = {}
+
     advisory_out = advisory_en
     if lang != "en":
         try:
-            advisory_out = translate.translate(advisory_en, dest=lang) if hasattr(translate, "translate") else advisory_en
+            advisory_out = translated.get(advisory_en) or (_cached_translate(advisory_en, lang) if hasattr(translate, "translate") else advisory_en)
         except Exception:
             advisory_out = advisory_en
 
@@ -931,14 +1243,10 @@ with right_col:
     # Play TTS alert if requested
     if play_alert:
         try:
-            nav_msg_en = f"Current risk level is {severity}. Nearest shelter {target_name} is {dist_km:.1f} kilometers away, approximately {eta_min} minutes on foot."
-            if route:
-                nav_msg_en += f" Using {route_mode_used} route. Follow the marked path and avoid hazards."
-            full_msg_en = f"{nav_msg_en} Advisory: {advisory_en}"
             tts_text = full_msg_en
             if lang != "en":
                 try:
-                    tts_text = translate.translate(full_msg_en, dest=lang)
+                    tts_text = translated.get(full_msg_en) or _cached_translate(full_msg_en, lang)
                 except Exception:
                     tts_text = full_msg_en
             tts_lang = lang if lang in ("en", "hi", "ml", "ta") else "en"
@@ -968,8 +1276,7 @@ with right_col:
         st.markdown("---")
         st.subheader(i18n["instructions"])
         
-        # Generate voice navigation instructions
-        voice_instructions = generate_voice_navigation(route, origin, target_coord, target_name, dist_km, eta_min, lang=lang)
+        # Voice navigation instructions (generated above, cached per route)
         st.session_state.route_instructions_voice = voice_instructions
         
         # Voice navigation controls - GPS-style
@@ -982,33 +1289,29 @@ with right_col:
                 # Play each instruction separately for GPS-like experience
                 if st.session_state.get("auto_play_voice", False):
                     st.info("🔊 Playing GPS-style navigation instructions...")
-                    for i, instr in enumerate(voice_instructions):
-                        if instr.get("priority") == "high" or i == 0 or i == len(voice_instructions) - 1:
-                            # Play high-priority instructions (start, approach, arrival)
-                            nav_text = instr["text"]
-                            
-                            # Translate if needed
-                            if lang != "en":
-                                try:
-                                    nav_text = translate.translate(nav_text, dest=lang) if hasattr(translate, "translate") else nav_text
-                                except Exception:
-                                    pass
-                            
-                            tts_lang = lang if lang in ("en", "hi", "ml", "ta") else "en"
-                            
+                    # Play high-priority instructions (start, approach, arrival)
+                    for i, nav_text in enumerate(spoken_steps):
+                        # Translate if needed
+                        if lang != "en":
                             try:
-                                play_and_stream_tts(nav_text, lang=tts_lang, cooldown_seconds=1)
-                            except Exception as e:
-                                st.warning(f"TTS error for instruction {i+1}: {e}")
+                                nav_text = translated.get(nav_text) or (_cached_translate(nav_text, lang) if hasattr(translate, "translate") else nav_text)
+                            except Exception:
+                                pass
+                        
+                        tts_lang = lang if lang in ("en", "hi", "ml", "ta") else "en"
+                        
+                        try:
+                            play_and_stream_tts(nav_text, lang=tts_lang, cooldown_seconds=1)
+                        except Exception as e:
+                            st.warning(f"TTS error for instruction {i+1}: {e}")
                 
                 # Also play full route summary
-                full_nav_text = " ".join([instr["text"] for instr in voice_instructions])
-                nav_msg = f"Complete route to {target_name}. {full_nav_text}"
+                nav_msg = route_summary_en
                 
                 # Translate if needed
                 if lang != "en":
                     try:
-                        nav_msg = translate.translate(nav_msg, dest=lang) if hasattr(translate, "translate") else nav_msg
+                        nav_msg = translated.get(nav_msg) or (_cached_translate(nav_msg, lang) if hasattr(translate, "translate") else nav_msg)
                     except Exception as e:
                         st.warning(f"Translation failed: {e}, using English")
                 
@@ -1068,15 +1371,16 @@ with right_col:
                 st.caption(f"... and {len(route) - 20} more waypoints")
 
 # ---------------- Charts & Footer ----------------
-if show_charts and st.session_state.risk_history:
+if show_charts and st.session_state.risk_head:
     st.markdown("---")
     st.subheader(i18n["history"])
-    df_history = pd.DataFrame(st.session_state.risk_history)
-    if not df_history.empty:
+    history = risk_history_view()
+    if len(history):
+        import plotly.graph_objects as go
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=df_history["timestamp"], y=df_history["disaster_score"], mode='lines+markers', name='Disaster Risk', line=dict(color='#E67E22', width=2)))
-        fig.add_trace(go.Scatter(x=df_history["timestamp"], y=df_history["crowd_score"], mode='lines+markers', name='Crowd Risk', line=dict(color='#3498DB', width=2)))
-        fig.add_trace(go.Scatter(x=df_history["timestamp"], y=df_history["combined"], mode='lines+markers', name='Combined Risk', line=dict(color='#E74C3C', width=3)))
+        fig.add_trace(go.Scatter(x=history["ts"], y=history["d"], mode='lines+markers', name='Disaster Risk', line=dict(color='#E67E22', width=2)))
+        fig.add_trace(go.Scatter(x=history["ts"], y=history["c"], mode='lines+markers', name='Crowd Risk', line=dict(color='#3498DB', width=2)))
+        fig.add_trace(go.Scatter(x=history["ts"], y=history["combined"], mode='lines+markers', name='Combined Risk', line=dict(color='#E74C3C', width=3)))
         fig.update_layout(title="Risk Scores Over Time", xaxis_title="Time", yaxis_title="Risk Score (0-1)", hovermode='x unified', height=300)
         st.plotly_chart(fig)
 
@@ -1087,8 +1391,8 @@ if show_charts and st.session_state.risk_history:
     with risk_col2:
         st.metric("Crowd Risk", f"{crowd_score*100:.1f}%")
     with risk_col3:
-        combined_risk = max(disaster_score, crowd_score * 0.9)
-        st.metric("Combined Risk", f"{combined_risk*100:.1f}%")
+        # Same value that was just written into the history row
+        st.metric("Combined Risk", f"{float(combined_now)*100:.1f}%")
 
 st.markdown("---")
 st.subheader(i18n.get("safety_methods", "Safety methods"))
@@ -3,6 +3,7 @@ Twilio SMS sender with multilingual fallback.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,6 +12,24 @@ TWILIO_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_FROM = os.getenv("TWILIO_FROM_NUMBER")
 
+ALERTS_DIR = Path("data/alerts")
+ALERTS_DIR.mkdir(parents=True, exist_ok=True)
+# Single worker: mock alert writes stay off the caller's thread and land in submission order
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crowdshield-alerts")
+
+
+def _write_mock_alert(fname: Path, message: str) -> None:
+    """Write via a temp file + os.replace so readers never see a half-written alert."""
+    tmp = fname.with_suffix(".tmp")
+    try:
+        tmp.write_text(message, encoding="utf-8")
+    except FileNotFoundError:
+        # alerts folder removed while running
+        fname.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(message, encoding="utf-8")
+    os.replace(tmp, fname)
+
+
 def send_sms(message, to_number, lang="en"):
     """
     Send SMS in selected language. Falls back to file mock if Twilio not configured.
@@ -24,12 +43,9 @@ def send_sms(message, to_number, lang="en"):
         except Exception as e:
             return {"status":"error","note":str(e)}
     else:
-        # Fallback: save to alerts folder
-        alerts_dir = Path("data/alerts")
-        alerts_dir.mkdir(parents=True, exist_ok=True)
-        fname = alerts_dir / f"mock_alert_{lang}.txt"
-        with open(fname,"w",encoding="utf-8") as f:
-            f.write(message)
+        # Fallback: save to alerts folder (written in the background)
+        fname = ALERTS_DIR / f"mock_alert_{lang}.txt"
+        _WRITER.submit(_write_mock_alert, fname, message)
         return {"status":"mock","path":str(fname)}
 
 def send_twilio_sms(message, to_number=None):
@@ -2,10 +2,10 @@
 Authority micro-playbook with dispatch simulation and ETA overlay.
 Supports both role-based and severity-based playbooks.
 """
-import math
-import networkx as nx
 from datetime import timedelta
 
+from . import geo, routing
+
 PLAYBOOKS_ROLE = {
     "Local Authority": ["Issue public advisory", "Activate shelters", "Coordinate transport"],
     "First Responder": ["Dispatch ground team", "Prepare medical aid", "Coordinate with command"],
@@ -20,16 +20,8 @@ PLAYBOOKS_SEVERITY = {
 }
 
 def haversine_m(origin, target):
-    """Compute haversine distance in meters."""
-    lat1, lon1 = origin
-    lat2, lon2 = target
-    R = 6371000
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return R * c
+    """Compute haversine distance in meters (JIT-compiled kernel in src.geo when Numba is present)."""
+    return geo.haversine_km(origin, target) * 1000.0
 
 def dispatch(identifier, G, origin, target, speed_kmph=30):
     """
@@ -42,8 +34,8 @@ def dispatch(identifier, G, origin, target, speed_kmph=30):
     
     # Try graph-based routing
     try:
-        path = nx.shortest_path(G, origin, target, weight="length")
-        length = sum(G.edges[u, v]["length"] for u, v in zip(path[:-1], path[1:]))
+        # Length comes back with the path (Dijkstra's distance on the CSR graph) instead of a re-sum
+        path, length = routing.shortest_path_with_length(G, origin, target, weight="length")
         eta_minutes = (length / 1000) / (speed_kmph / 60)
         return {
             "identifier": identifier,
@@ -4,10 +4,15 @@ Resilient data loader for hazards, shelters, crowd telemetry and weather.
 
 - Tolerant to missing geopandas; returns pandas DataFrame if geopandas not available.
 - Normalizes GeoJSON coordinate order (lon,lat -> lat,lon) for downstream use.
+- Caches one STRtree spatial index per distinct hazard geometry set.
+- CSV tables are cached in memory per (path, mtime) and mirrored to a sibling .parquet when pyarrow is present.
 """
 
+from functools import lru_cache
 from pathlib import Path
+import hashlib
 import json
+import numpy as np
 import pandas as pd
 
 try:
@@ -23,11 +28,25 @@ except Exception:
     wkt = None
     Point = None
 
+try:
+    import shapely
+    from shapely import STRtree  # Shapely 2.x
+except Exception:
+    shapely = None
+    STRtree = None
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+except Exception:
+    pyarrow = None
+
 import os
 import requests
 
 CACHE = {}
 DATA_DIR = Path("data")
+_HAZARD_INDEX = {}
+_HAZARD_INDEX_MAX = 16
 
 
 def get_weather(state="Kerala", use_cache=True):
@@ -76,16 +95,53 @@ def load_hazards(path: str = "data/hazard_zones.geojson"):
         return pd.DataFrame()
 
 
+@lru_cache(maxsize=8)
+def _read_tabular(path: str, mtime: float, numeric_cols: tuple):
+    """
+    Read a CSV table, preferring an up-to-date sibling .parquet (typed, Arrow C++ reader).
+
+    mtime is the CSV's modification time; it is only part of the cache key, so editing the
+    file invalidates the cached frame. After a CSV read, numeric_cols are coerced and the
+    typed frame is written to the .parquet for the next process.
+    """
+    p = Path(path)
+    pq = p.with_suffix(".parquet")
+    if pyarrow is not None:
+        try:
+            if pq.exists() and pq.stat().st_mtime >= mtime:
+                return pd.read_parquet(pq, engine="pyarrow")
+        except Exception:
+            pass
+    df = pd.read_csv(p)
+    for c in numeric_cols:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    if pyarrow is not None:
+        try:
+            df.to_parquet(pq, engine="pyarrow", index=False)
+        except Exception:
+            pass
+    return df
+
+
+def _load_tabular(path, numeric_cols=()):
+    """Cached table read for path; returns a copy so callers may modify it freely."""
+    p = Path(path)
+    df = _read_tabular(str(p), p.stat().st_mtime, tuple(numeric_cols))
+    df = df.copy()
+    # Parquet mirrors already carry numeric dtypes; only coerce what is still text
+    for c in numeric_cols:
+        if c in df.columns and not pd.api.types.is_numeric_dtype(df[c]):
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
 def load_shelters(path: str = "data/safe_zones.csv"):
     p = Path(path)
     if p.exists():
         try:
-            df = pd.read_csv(p)
             # Ensure lat/lon columns exist and are numeric
-            for c in ("lat", "lon"):
-                if c in df.columns:
-                    df[c] = pd.to_numeric(df[c], errors="coerce")
-            return df
+            return _load_tabular(p, ("lat", "lon"))
         except Exception:
             pass
     # fallback sample
@@ -96,11 +152,7 @@ def load_crowd(path: str = "data/crowd_sim.csv"):
     p = Path(path)
     if p.exists():
         try:
-            df = pd.read_csv(p)
-            for c in ("lat", "lon", "people"):
-                if c in df.columns:
-                    df[c] = pd.to_numeric(df[c], errors="coerce")
-            return df
+            return _load_tabular(p, ("lat", "lon", "people"))
         except Exception:
             pass
     return pd.DataFrame(columns=["id", "lat", "lon", "people"])
@@ -120,17 +172,55 @@ def safe_load_shelters(path: str | None):
         return pd.DataFrame()
 
 
+@lru_cache(maxsize=16)
+def _scaled_crowd(path: str, mtime: float, crowd_density: float):
+    """Crowd frame with people rescaled to crowd_density; mtime only keys the cache."""
+    df = load_crowd(path)
+    if not df.empty and "people" in df.columns:
+        people = df["people"].to_numpy(dtype=float, copy=True)
+        factor = crowd_density / (max(1.0, people.mean()) / 1000.0)
+        np.multiply(people, factor, out=people)
+        df["people"] = people
+    return df
+
+
 def safe_load_crowd(path: str | None, crowd_density: float = 1.0):
     try:
-        df = load_crowd(path or "data/crowd_sim.csv")
-        if not df.empty and "people" in df.columns:
-            mean_people = max(1.0, df["people"].mean())
-            df["people"] = df["people"] * (crowd_density / (mean_people / 1000.0))
-        return df
+        p = Path(path or "data/crowd_sim.csv")
+        mtime = p.stat().st_mtime if p.exists() else -1.0
+        # Cached per (file version, density); hand out a copy so the cached frame stays intact
+        return _scaled_crowd(str(p), mtime, round(float(crowd_density), 3)).copy()
     except Exception:
         return pd.DataFrame()
 
 
+def get_hazard_index(hazards):
+    """
+    Return an STRtree over the hazard geometries, built once per distinct geometry set.
+
+    hazards: (Geo)DataFrame with a 'geometry' column, or an iterable of shapely geometries.
+    The cache key is a blake2b digest of the geometries' WKB, so reruns that reload the same
+    layer reuse the tree. tree.geometries holds the indexed geometries. None when empty or
+    Shapely 2 is unavailable.
+    """
+    if STRtree is None or hazards is None:
+        return None
+    try:
+        geoms = hazards["geometry"] if isinstance(hazards, pd.DataFrame) else hazards
+        geoms = [g for g in geoms if isinstance(g, shapely.Geometry) and not g.is_empty]
+        if not geoms:
+            return None
+        key = hashlib.blake2b(b"".join(shapely.to_wkb(geoms)), digest_size=16).digest()
+        tree = _HAZARD_INDEX.get(key)
+        if tree is None:
+            if len(_HAZARD_INDEX) >= _HAZARD_INDEX_MAX:
+                _HAZARD_INDEX.pop(next(iter(_HAZARD_INDEX)))
+            tree = _HAZARD_INDEX[key] = STRtree(geoms)
+        return tree
+    except Exception:
+        return None
+
+
 def normalize_hazards(hazards):
     """
     Ensure hazards are returned as a GeoDataFrame if geopandas available,
@@ -3,41 +3,64 @@ Fusion engine: combine disaster + crowd scores into severity tier
 and multilingual recommendations with safe fallbacks.
 """
 
+from bisect import bisect_right
+
+import numpy as np
+
+# Tier boundaries: combined < 0.2 is Low, < 0.5 Medium, < 0.8 High, otherwise Critical
+TIER_EDGES = (0.2, 0.5, 0.8)
+_TIER_EDGES_ARR = np.asarray(TIER_EDGES)
+
+# (i18n key, English default, recommendations as (key, default)) per tier, Low..Critical
+_TIERS = (
+    ("low", "Low", (
+        ("rec_monitor", "Monitor conditions"),
+        ("rec_updates", "Send updates to residents"),
+    )),
+    ("medium", "Medium", (
+        ("rec_prepare", "Prepare shelters"),
+        ("rec_limit", "Advise limited movement"),
+    )),
+    ("high", "High", (
+        ("rec_evac", "Activate evacuation protocol"),
+        ("rec_vulnerable", "Prioritize vulnerable groups"),
+    )),
+    ("critical", "Critical", (
+        ("rec_immediate", "Immediate evacuation"),
+        ("rec_services", "Deploy emergency services"),
+        ("rec_broadcast", "Activate emergency broadcast"),
+    )),
+)
+
+
+def _english(key, default):
+    return default
+
+
 def fuse(disaster_score, crowd_score, i18n=None):
     # Weighted combination of disaster and crowd scores
     combined = max(disaster_score, crowd_score * 0.9)
 
-    # Helper to safely fetch translations or fall back to English
-    def _(key, default):
-        if i18n and isinstance(i18n, dict):
-            return i18n.get(key, default)
-        return default
+    # Translation lookup bound once: i18n.get, or English defaults when no dict is given
+    _ = i18n.get if isinstance(i18n, dict) else _english
 
     # Decide severity tier and recommendations
-    if combined < 0.2:
-        tier = _("low", "Low")
-        recommendations = [
-            _("rec_monitor", "Monitor conditions"),
-            _("rec_updates", "Send updates to residents")
-        ]
-    elif combined < 0.5:
-        tier = _("medium", "Medium")
-        recommendations = [
-            _("rec_prepare", "Prepare shelters"),
-            _("rec_limit", "Advise limited movement")
-        ]
-    elif combined < 0.8:
-        tier = _("high", "High")
-        recommendations = [
-            _("rec_evac", "Activate evacuation protocol"),
-            _("rec_vulnerable", "Prioritize vulnerable groups")
-        ]
-    else:
-        tier = _("critical", "Critical")
-        recommendations = [
-            _("rec_immediate", "Immediate evacuation"),
-            _("rec_services", "Deploy emergency services"),
-            _("rec_broadcast", "Activate emergency broadcast")
-        ]
+    key, default, recs = _TIERS[bisect_right(TIER_EDGES, combined)]
+    tier = _(key, default)
+    recommendations = [_(k, d) for k, d in recs]
 
     return tier, recommendations
+
+
+def fuse_batch(disaster_scores, crowd_scores):
+    """
+    Vectorized fuse() over arrays of scores (e.g. a whole risk history).
+
+    Returns (combined, tier_idx): combined risk per sample and its tier index
+    (0=Low .. 3=Critical, same boundaries as fuse()).
+    """
+    d = np.asarray(disaster_scores, dtype=float)
+    c = np.asarray(crowd_scores, dtype=float)
+    combined = np.maximum(d, c * 0.9)
+    tier_idx = np.searchsorted(_TIER_EDGES_ARR, combined, side="right")
+    return combined, tier_idx
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Great-circle helpers shared by CrowdShield modules.
+
+- Scalar and array haversine/bearing kernels over (lat, lon) degrees.
+- Element-wise haversine over paired arrays (e.g. all edges of a graph), one loop without temporaries.
+- Batched random jitter around a point for mock live-location updates.
+- Straight-line (lat, lon) interpolation used as the last-resort route.
+- (lat, lon) / (lon, lat) order normalisation for raw route point arrays.
+- JIT-compiled with Numba when available; otherwise the same NumPy code runs as-is.
+"""
+
+from typing import Sequence, Tuple
+import math
+
+import numpy as np
+
+# Optional dependency
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _jit(fn=None, fastmath=True):
+    """
+    Compile fn with Numba when installed; keep the Python function otherwise.
+    Use @_jit(fastmath=False) for kernels whose result depends on NaN comparisons, which
+    fastmath assumes away.
+    """
+    if fn is None:
+        return lambda f: _jit(f, fastmath=fastmath)
+    if njit is None:
+        return fn
+    try:
+        return njit(cache=True, fastmath=fastmath)(fn)
+    except Exception:
+        return fn
+
+
+@_jit
+def _haversine(lat1, lon1, lat2, lon2):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlam = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+@_jit
+def _bearing(lat1, lon1, lat2, lon2):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dlam = math.radians(lon2 - lon1)
+    y = math.sin(dlam) * math.cos(phi2)
+    x = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlam)
+    return (math.degrees(math.atan2(y, x)) + 360.0) % 360.0
+
+
+@_jit
+def _haversine_to(lat, lon, lats, lons):
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlam = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+@_jit
+def _haversine_rank_to(lat, lon, lats, lons):
+    # Inner haversine term only; 2R*atan2(sqrt(a), sqrt(1-a)) is monotonic in a
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlam = np.radians(lons - lon)
+    return np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+
+
+@_jit
+def _haversine_pairs(lat1, lon1, lat2, lon2):
+    n = lat1.shape[0]
+    out = np.empty(n)
+    for i in range(n):
+        phi1 = math.radians(lat1[i])
+        phi2 = math.radians(lat2[i])
+        dphi = math.radians(lat2[i] - lat1[i])
+        dlam = math.radians(lon2[i] - lon1[i])
+        a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+        out[i] = 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return out
+
+
+@_jit
+def _segment_metrics(coords):
+    phi = np.radians(coords[:, 0])
+    lam = np.radians(coords[:, 1])
+    phi1 = phi[:-1]
+    phi2 = phi[1:]
+    dphi = phi2 - phi1
+    dlam = lam[1:] - lam[:-1]
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    dist = 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    y = np.sin(dlam) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlam)
+    bearing = (np.degrees(np.arctan2(y, x)) + 360.0) % 360.0
+    return dist, bearing
+
+
+@_jit
+def _linear_route(lat1, lon1, lat2, lon2, steps):
+    out = np.empty((steps + 1, 2))
+    for i in range(steps + 1):
+        out[i, 0] = lat1 + (lat2 - lat1) * i / steps
+        out[i, 1] = lon1 + (lon2 - lon1) * i / steps
+    return out
+
+
+@_jit(fastmath=False)
+def _latlon_order(pts):
+    n = pts.shape[0]
+    out = np.empty((n, 2))
+    for i in range(n):
+        a = pts[i, 0]
+        b = pts[i, 1]
+        # In latitude/longitude range as given: keep; otherwise assume (lon, lat) and swap
+        if -90.0 <= a <= 90.0 and -180.0 <= b <= 180.0:
+            out[i, 0] = a
+            out[i, 1] = b
+        else:
+            out[i, 0] = b
+            out[i, 1] = a
+    return out
+
+
+@_jit
+def _jitter(lat, lon, jitter_deg, n):
+    out = np.random.uniform(-jitter_deg, jitter_deg, (n, 2))
+    out[:, 0] += lat
+    out[:, 1] += lon
+    return out
+
+
+def haversine_km(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
+    """Return great-circle distance between two (lat, lon) points in kilometers."""
+    return float(_haversine(float(p1[0]), float(p1[1]), float(p2[0]), float(p2[1])))
+
+
+def bearing_deg(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
+    """Return initial bearing from p1 to p2 in degrees [0, 360)."""
+    return float(_bearing(float(p1[0]), float(p1[1]), float(p2[0]), float(p2[1])))
+
+
+def haversine_km_vec(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Distances (km) from one (lat, lon) point to every point in the lats/lons arrays."""
+    lats = np.ascontiguousarray(lats, dtype=np.float64)
+    lons = np.ascontiguousarray(lons, dtype=np.float64)
+    return _haversine_to(float(lat), float(lon), lats, lons)
+
+
+def haversine_rank_vec(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Distance ranking key from (lat, lon) to each point: same order as haversine_km_vec, but
+    without the sqrt/atan2. Use it for argmin/argsort, then compute real distances for the winners.
+    """
+    lats = np.ascontiguousarray(lats, dtype=np.float64)
+    lons = np.ascontiguousarray(lons, dtype=np.float64)
+    return _haversine_rank_to(float(lat), float(lon), lats, lons)
+
+
+def haversine_km_pairs(lat1: np.ndarray, lon1: np.ndarray,
+                       lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Distances (km) between (lat1[i], lon1[i]) and (lat2[i], lon2[i]) for every i.
+
+    Inputs broadcast against each other (a scalar point works too); the result has their shape.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (lat1, lon1, lat2, lon2)))
+    shape = lat1.shape
+    flat = [np.ascontiguousarray(a).ravel() for a in (lat1, lon1, lat2, lon2)]
+    return _haversine_pairs(*flat).reshape(shape)
+
+
+def segment_metrics(coords: Sequence[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-segment distance (km) and bearing (degrees) along a polyline.
+
+    coords: (n, 2) array-like of (lat, lon). Returns two arrays of length n-1.
+    """
+    arr = np.ascontiguousarray(coords, dtype=np.float64)
+    if arr.ndim != 2 or arr.shape[0] < 2:
+        return np.empty(0), np.empty(0)
+    return _segment_metrics(arr)
+
+
+def linear_route(p1: Tuple[float, float], p2: Tuple[float, float], steps: int = 20) -> np.ndarray:
+    """(steps + 1, 2) array of evenly spaced (lat, lon) points from p1 to p2 inclusive."""
+    return _linear_route(float(p1[0]), float(p1[1]), float(p2[0]), float(p2[1]), max(1, int(steps)))
+
+
+def latlon_order(pts: np.ndarray) -> np.ndarray:
+    """
+    (n, 2) copy of the first two columns of pts in (lat, lon) order.
+
+    A row is kept when its first value is a valid latitude and its second a valid longitude,
+    otherwise it is taken to be (lon, lat) and swapped (NaN rows are swapped too).
+    """
+    arr = np.ascontiguousarray(np.asarray(pts, dtype=np.float64)[:, :2])
+    return _latlon_order(arr)
+
+
+def jitter_coords(lat: float, lon: float, jitter_deg: float, n: int = 1) -> np.ndarray:
+    """(n, 2) array of (lat, lon) points drawn uniformly within +/- jitter_deg of (lat, lon)."""
+    return _jitter(float(lat), float(lon), float(jitter_deg), int(n))
+
+
+# Compile once at import so the first user request doesn't pay the JIT cost
+if njit is not None:
+    try:
+        _haversine(0.0, 0.0, 0.0, 0.0)
+        _bearing(0.0, 0.0, 0.0, 0.0)
+        _haversine_to(0.0, 0.0, np.zeros(1), np.zeros(1))
+        _haversine_rank_to(0.0, 0.0, np.zeros(1), np.zeros(1))
+        _haversine_pairs(np.zeros(1), np.zeros(1), np.zeros(1), np.zeros(1))
+        _segment_metrics(np.zeros((2, 2)))
+        _latlon_order(np.zeros((1, 2)))
+        _jitter(0.0, 0.0, 0.0, 1)
+        _linear_route(0.0, 0.0, 0.0, 0.0, 1)
+    except Exception:
+        _haversine = getattr(_haversine, "py_func", _haversine)
+        _bearing = getattr(_bearing, "py_func", _bearing)
+        _haversine_to = getattr(_haversine_to, "py_func", _haversine_to)
+        _haversine_rank_to = getattr(_haversine_rank_to, "py_func", _haversine_rank_to)
+        _haversine_pairs = getattr(_haversine_pairs, "py_func", _haversine_pairs)
+        _segment_metrics = getattr(_segment_metrics, "py_func", _segment_metrics)
+        _latlon_order = getattr(_latlon_order, "py_func", _latlon_order)
+        _jitter = getattr(_jitter, "py_func", _jitter)
+        _linear_route = getattr(_linear_route, "py_func", _linear_route)
+    # NaN rows must be swapped exactly as the Python version does; keep that one if they differ
+    _probe = np.array([[np.nan, 1.0], [1.0, np.nan], [100.0, 5.0], [10.0, 20.0]])
+    _py_latlon_order = getattr(_latlon_order, "py_func", _latlon_order)
+    try:
+        if not np.array_equal(_latlon_order(_probe), _py_latlon_order(_probe), equal_nan=True):
+            _latlon_order = _py_latlon_order
+    except Exception:
+        _latlon_order = _py_latlon_order
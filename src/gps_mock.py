@@ -5,14 +5,20 @@ Previously this only returned coordinates around Kochi, Kerala.
 To make the demo feel more realistic across India, we support
 state-based mock locations while keeping the old API for backward
 compatibility.
+
+The waypoint tables are read-only (tuple / MappingProxyType) so they
+can be shared safely across threads.
 """
 
+from types import MappingProxyType
+
 # Default waypoints around Kochi (legacy behaviour)
-WAYPOINTS = [
+WAYPOINTS = (
     (9.931233, 76.267304),
     (9.932000, 76.268000),
     (9.930500, 76.265500),
-]
+)
+_N_WAYPOINTS = len(WAYPOINTS)
 
 
 def get_mock_location(index: int = 0):
@@ -22,11 +28,11 @@ def get_mock_location(index: int = 0):
     Kept for backward compatibility – other modules may still import
     this directly.
     """
-    return WAYPOINTS[index % len(WAYPOINTS)]
+    return WAYPOINTS[index % _N_WAYPOINTS]
 
 
 # Approximate central points for supported states
-STATE_WAYPOINTS = {
+STATE_WAYPOINTS = MappingProxyType({
     "Kerala": (10.1632, 76.6413),
     "Tamil Nadu": (11.1271, 78.6569),
     "Karnataka": (15.3173, 75.7139),
@@ -35,7 +41,7 @@ STATE_WAYPOINTS = {
     "Delhi": (28.6139, 77.2090),
     "West Bengal": (22.9868, 87.8550),
     "Rajasthan": (27.0238, 74.2179),
-}
+})
 
 
 def get_mock_location_for_state(state: str):
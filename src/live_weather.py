@@ -4,15 +4,45 @@ Live weather integration for CrowdShield.
 Uses OpenWeatherMap as an example data source. This is optional:
 if no API key is configured or the call fails, callers should fall
 back to the existing slider-based simulation.
+
+Results are cached in-process per state: successful lookups for
+WEATHER_TTL_S seconds (default 900), failed ones for
+WEATHER_NEG_TTL_S seconds (default 60).
+
+fetch_weather_for_states() looks up several states concurrently
+(aiohttp when installed, otherwise a thread pool over the shared pool).
+
+Single lookups go through a module-level urllib3 PoolManager (keep-alive,
+retries on 429/5xx) and parse with orjson when it is installed.
 """
 
+import asyncio
+import json
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote
 
-import requests
+import urllib3
 
+# Optional dependencies
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None
 
-STATE_FALLBACK_CITY = {
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+# Read-only: shared by the async/threaded multi-state lookups
+STATE_FALLBACK_CITY = MappingProxyType({
     "Kerala": "Kochi,IN",
     "Tamil Nadu": "Chennai,IN",
     "Karnataka": "Bengaluru,IN",
@@ -21,7 +51,49 @@ STATE_FALLBACK_CITY = {
     "Delhi": "Delhi,IN",
     "West Bengal": "Kolkata,IN",
     "Rajasthan": "Jaipur,IN",
-}
+})
+
+_WEATHER_TTL_S = int(os.getenv("WEATHER_TTL_S", "900"))
+_WEATHER_NEG_TTL_S = int(os.getenv("WEATHER_NEG_TTL_S", "60"))
+# Circuit breaker across states: after BREAKER_FAILS consecutive failed requests,
+# skip the network for BREAKER_COOLDOWN_S instead of paying the timeout per state
+BREAKER_FAILS = 3
+BREAKER_COOLDOWN_S = 60.0
+_BREAKER = {"fails": 0, "open_until": 0.0}
+# state -> (monotonic fetch time, result or None)
+_WEATHER_CACHE: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+_WEATHER_LOCK = threading.Lock()
+# OPENWEATHER_API_KEY, read on first use (after callers have loaded .env); see reload_env()
+_API_KEY: Optional[str] = None
+_API_KEY_LOADED = False
+OWM_WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+_WEATHER_URL_TEMPLATE = OWM_WEATHER_URL + "?q={q}&appid={k}&units=metric"
+
+# Shared keep-alive pool: repeat calls reuse the TCP/TLS connection without requests' wrapping
+_HTTP = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=20,
+    retries=urllib3.Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+)
+_TIMEOUT = urllib3.Timeout(connect=2, read=5)
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _api_key() -> Optional[str]:
+    global _API_KEY, _API_KEY_LOADED
+    if not _API_KEY_LOADED:
+        _API_KEY = os.getenv("OPENWEATHER_API_KEY")
+        _API_KEY_LOADED = True
+    return _API_KEY
+
+
+def reload_env() -> None:
+    """Re-read OPENWEATHER_API_KEY (e.g. after rotating it) and drop cached results."""
+    global _API_KEY, _API_KEY_LOADED
+    _API_KEY = os.getenv("OPENWEATHER_API_KEY")
+    _API_KEY_LOADED = True
+    with _WEATHER_LOCK:
+        _WEATHER_CACHE.clear()
 
 
 def fetch_weather_for_state(state: str) -> Optional[Dict[str, Any]]:
@@ -33,38 +105,159 @@ def fetch_weather_for_state(state: str) -> Optional[Dict[str, Any]]:
       - wind_kph
       - raw (full API JSON)
 
-    Returns None on any error.
+    Returns None on any error. Repeat calls within the cache TTL return the
+    stored result without a request.
     """
-    api_key = os.getenv("OPENWEATHER_API_KEY")
+    api_key = _api_key()
     if not api_key:
         return None
 
+    hit, result = _cache_lookup(state)
+    if hit:
+        return result
+    if _breaker_open():
+        return None
+
+    result = _fetch_weather(state, api_key)
+    _cache_store(state, result)
+    return result
+
+
+def _cache_lookup(state: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """(True, cached result) while the state's entry is within its TTL, else (False, None)."""
+    with _WEATHER_LOCK:
+        ent = _WEATHER_CACHE.get(state)
+    if ent is not None:
+        ttl = _WEATHER_TTL_S if ent[1] is not None else _WEATHER_NEG_TTL_S
+        if time.monotonic() - ent[0] < ttl:
+            return True, ent[1]
+    return False, None
+
+
+def _cache_store(state: str, result: Optional[Dict[str, Any]]) -> None:
+    with _WEATHER_LOCK:
+        _WEATHER_CACHE[state] = (time.monotonic(), result)
+
+
+def _breaker_open() -> bool:
+    with _WEATHER_LOCK:
+        return time.monotonic() < _BREAKER["open_until"]
+
+
+def _breaker_record(ok: bool) -> None:
+    with _WEATHER_LOCK:
+        if ok:
+            _BREAKER["fails"] = 0
+            return
+        _BREAKER["fails"] += 1
+        if _BREAKER["fails"] >= BREAKER_FAILS:
+            _BREAKER["open_until"] = time.monotonic() + BREAKER_COOLDOWN_S
+
+
+@lru_cache(maxsize=64)
+def _weather_url(state: str, api_key: str) -> str:
+    """Fully encoded request URL for the state's city; built once per (state, key)."""
     city = STATE_FALLBACK_CITY.get(state, "Delhi,IN")
+    return _WEATHER_URL_TEMPLATE.format(q=quote(city, safe=""), k=quote(api_key, safe=""))
+
+
+def _parse_weather(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract rainfall (mm) and wind (km/h) from an OpenWeather current-weather payload."""
+    # OpenWeather: rainfall from rain.1h or rain.3h, wind speed in m/s.
+    rain = 0.0
+    rain_info = data.get("rain") or {}
+    if "1h" in rain_info:
+        rain = float(rain_info["1h"])
+    elif "3h" in rain_info:
+        rain = float(rain_info["3h"]) / 3.0
+
+    wind_ms = float(data.get("wind", {}).get("speed", 0.0))
+    wind_kph = wind_ms * 3.6
+
+    return {
+        "rainfall_mm": rain,
+        "wind_kph": wind_kph,
+        "raw": data,
+    }
+
+
+def _fetch_weather(state: str, api_key: str) -> Optional[Dict[str, Any]]:
+    """One OpenWeatherMap request for the state's representative city; None on any error."""
     try:
-        url = "https://api.openweathermap.org/data/2.5/weather"
-        params = {"q": city, "appid": api_key, "units": "metric"}
-        resp = requests.get(url, params=params, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-
-        # OpenWeather: rainfall from rain.1h or rain.3h, wind speed in m/s.
-        rain = 0.0
-        rain_info = data.get("rain") or {}
-        if "1h" in rain_info:
-            rain = float(rain_info["1h"])
-        elif "3h" in rain_info:
-            rain = float(rain_info["3h"]) / 3.0
-
-        wind_ms = float(data.get("wind", {}).get("speed", 0.0))
-        wind_kph = wind_ms * 3.6
-
-        return {
-            "rainfall_mm": rain,
-            "wind_kph": wind_kph,
-            "raw": data,
-        }
+        resp = _HTTP.urlopen("GET", _weather_url(state, api_key), timeout=_TIMEOUT)
+        if resp.status >= 400:
+            raise ValueError(f"HTTP {resp.status} from OpenWeatherMap")
+        result = _parse_weather(_json_loads(resp.data))
     except Exception as e:
         print(f"Live weather fetch error for state={state}: {e}")
+        _breaker_record(False)
         return None
+    _breaker_record(True)
+    return result
+
+
+async def fetch_weather_for_states(states: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Fetch several states concurrently; returns {state: result or None}.
+
+    States still fresh in the TTL cache are answered without a request. Uses one aiohttp
+    session for all requests; without aiohttp the requests run on a thread pool instead.
+    """
+    api_key = _api_key()
+    out: Dict[str, Optional[Dict[str, Any]]] = {}
+    if not api_key:
+        return {s: None for s in states}
+
+    missing = []
+    for s in dict.fromkeys(states):
+        hit, result = _cache_lookup(s)
+        if hit:
+            out[s] = result
+        else:
+            missing.append(s)
+    if not missing:
+        return out
+    if _breaker_open():
+        out.update({s: None for s in missing})
+        return out
+
+    if aiohttp is None:
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as pool:
+            results = await asyncio.gather(*[loop.run_in_executor(pool, _fetch_weather, s, api_key) for s in missing])
+    else:
+        connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=5)) as session:
+            async def _one(state):
+                try:
+                    async with session.get(_weather_url(state, api_key)) as r:
+                        r.raise_for_status()
+                        result = _parse_weather(await r.json())
+                except Exception:
+                    _breaker_record(False)
+                    raise
+                _breaker_record(True)
+                return result
+
+            results = await asyncio.gather(*[_one(s) for s in missing], return_exceptions=True)
+
+    for s, result in zip(missing, results):
+        if isinstance(result, BaseException):
+            print(f"Live weather fetch error for state={s}: {result}")
+            result = None
+        _cache_store(s, result)
+        out[s] = result
+    return out
+
+
+def fetch_weather_for_states_sync(states: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Blocking wrapper around fetch_weather_for_states for Streamlit callers."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_weather_for_states(states))
+    # An event loop is already running in this thread: run the batch on a worker thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(fetch_weather_for_states(states))).result()
 
 
@@ -1,5 +1,8 @@
 import os
 import json
+import hashlib
+import time
+from collections import namedtuple
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -12,93 +15,223 @@ except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
 
+# Optional dependency: faster cache (de)serialisation
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 GEMINI_KEY = os.getenv("GEMINI_API_KEY")
+# Print safety-retry progress; read once at import
+GEMINI_VERBOSE = os.getenv("GEMINI_VERBOSE", "false").lower() == "true"
 CACHE_PATH = Path("data/cached_advisories.json")
+# Last model name that worked, tried first on the next start
+MODEL_NAME_PATH = Path("data/.gemini_model")
+# Entries: {advisory key: {"text", "ts", "severity"}}; older files map severity -> text directly
 LOCAL_CACHE = {}
 GEMINI_DISABLED = False
+# Circuit breaker: after BREAKER_FAILS consecutive API errors, skip Gemini for BREAKER_COOLDOWN_S
+BREAKER_FAILS = 3
+BREAKER_COOLDOWN_S = 60.0
+_BREAKER = {"fails": 0, "open_until": 0.0}
+
+
+def _cache_loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data.decode("utf-8"))
+
+
+def _cache_dumps(obj):
+    """UTF-8 JSON bytes, 2-space indent, non-ASCII kept as-is (same file layout either way)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
 
 if CACHE_PATH.exists():
     try:
-        with open(CACHE_PATH, encoding="utf-8") as f:
-            LOCAL_CACHE = json.load(f)
+        LOCAL_CACHE = _cache_loads(CACHE_PATH.read_bytes())
     except Exception:
         LOCAL_CACHE = {}
 
+# Most recent advisory per severity, used when Gemini can't answer for the exact inputs
+_LATEST_BY_SEVERITY = {}
+for _k, _v in LOCAL_CACHE.items():
+    if isinstance(_v, str):
+        _LATEST_BY_SEVERITY.setdefault(_k, (0.0, _v))
+    elif isinstance(_v, dict) and _v.get("text"):
+        _prev = _LATEST_BY_SEVERITY.get(_v.get("severity"))
+        if _prev is None or _v.get("ts", 0.0) >= _prev[0]:
+            _LATEST_BY_SEVERITY[_v.get("severity")] = (_v.get("ts", 0.0), _v["text"])
+
+
+# Safety settings, less restrictive for public safety content; built once at import
+try:
+    # Use proper enum values if available
+    from google.generativeai.types import HarmCategory, HarmBlockThreshold
+    SAFETY_SETTINGS = {
+        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,  # Most permissive for safety info
+    }
+except (ImportError, AttributeError):
+    # Fallback to string format
+    SAFETY_SETTINGS = [
+        {
+            "category": "HARM_CATEGORY_HARASSMENT",
+            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+        },
+        {
+            "category": "HARM_CATEGORY_HATE_SPEECH",
+            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+        },
+        {
+            "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+        },
+        {
+            "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+            "threshold": "BLOCK_ONLY_HIGH"  # Most permissive for safety content
+        }
+    ]
+
+# Model names to try, with and without the models/ prefix
+GEMINI_MODELS = ('models/gemini-2.5-flash-lite', 'gemini-2.5-flash-lite')
+# Model built by the first successful _get_model() call, reused after that
+_MODEL = None
+_MODEL_NAME = None
+
+
+def _get_model():
+    """Configure Gemini and pick a model once per process; raises ValueError if none is available."""
+    global _MODEL, _MODEL_NAME
+    if _MODEL is not None:
+        return _MODEL, _MODEL_NAME
+
+    try:
+        saved = MODEL_NAME_PATH.read_text(encoding="utf-8").strip()
+    except Exception:
+        saved = ""
+    candidates = ((saved,) if saved else ()) + tuple(m for m in GEMINI_MODELS if m != saved)
+
+    genai.configure(api_key=GEMINI_KEY)
+    for model_candidate in candidates:
+        try:
+            model = genai.GenerativeModel(model_candidate)
+        except Exception:
+            continue
+        print(f"✓ Using Gemini 2.5 Flash Lite: {model_candidate}")
+        _MODEL, _MODEL_NAME = model, model_candidate
+        if model_candidate != saved:
+            try:
+                MODEL_NAME_PATH.parent.mkdir(parents=True, exist_ok=True)
+                MODEL_NAME_PATH.write_text(model_candidate, encoding="utf-8")
+            except Exception:
+                pass
+        return _MODEL, _MODEL_NAME
+
+    raise ValueError("Gemini 2.5 Flash Lite model not available. Please ensure you have access to gemini-2.5-flash-lite model.")
+
+
+def _advisory_key(severity, drivers, role):
+    """Content hash of the advisory inputs; driver order doesn't matter."""
+    raw = f"{severity}|{role}|{'|'.join(sorted(map(str, drivers)))}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cache_get(key):
+    ent = LOCAL_CACHE.get(key)
+    return ent.get("text") if isinstance(ent, dict) else None
+
+
+def _cache_fallback(severity, default):
+    """Latest cached advisory for this severity (any drivers/role), else default."""
+    ent = _LATEST_BY_SEVERITY.get(severity)
+    return ent[1] if ent else default
+
+
+def _cache_put(key, severity, text, flush=True):
+    """
+    Store an advisory; returns True if the cache changed.
+
+    Re-storing the same text for a key is a no-op, so the file isn't rewritten for it.
+    With flush=False the caller persists once via _flush_cache() after a batch of puts.
+    """
+    ent = LOCAL_CACHE.get(key)
+    if isinstance(ent, dict) and ent.get("text") == text and ent.get("severity") == severity:
+        return False
+    now = time.time()
+    LOCAL_CACHE[key] = {"text": text, "ts": now, "severity": severity}
+    _LATEST_BY_SEVERITY[severity] = (now, text)
+    if flush:
+        _flush_cache()
+    return True
+
+
+def _flush_cache():
+    """Persist the whole cache via temp file + os.replace (never half-written)."""
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_PATH.with_suffix(".tmp")
+        tmp.write_bytes(_cache_dumps(LOCAL_CACHE))
+        os.replace(tmp, CACHE_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not persist advisory cache: {e}")
+
+def _breaker_open():
+    return time.monotonic() < _BREAKER["open_until"]
+
+
+def _breaker_record(ok):
+    if ok:
+        _BREAKER["fails"] = 0
+        return
+    _BREAKER["fails"] += 1
+    if _BREAKER["fails"] >= BREAKER_FAILS:
+        _BREAKER["open_until"] = time.monotonic() + BREAKER_COOLDOWN_S
+        print(f"⚠️ Gemini failing repeatedly; skipping calls for {BREAKER_COOLDOWN_S:.0f}s")
+
+
+# Driver strings used by the prompts and fallback messages, built once per advisory
+DriversView = namedtuple("DriversView", ["joined", "first2", "head"])
+
+
+def _prep_drivers(drivers):
+    first2 = ', '.join(drivers[:2])
+    head = first2 if len(drivers) >= 2 else drivers[0] if drivers else 'weather conditions'
+    return DriversView(', '.join(drivers), first2, head)
+
+
 def generate_advisory(severity, drivers, role="Authority"):
     global GEMINI_DISABLED
-    prompt = f"Provide a concise advisory for severity={severity}. Drivers: {', '.join(drivers)}. Role: {role}."
-    if GEMINI_DISABLED:
-        return LOCAL_CACHE.get(severity, f"[Cached Advisory] {severity}: follow local instructions.")
+    dv = _prep_drivers(drivers)
+    cache_key = _advisory_key(severity, drivers, role)
+    cached = _cache_get(cache_key)
+    if cached:
+        return cached
+    if GEMINI_DISABLED or _breaker_open():
+        return _cache_fallback(severity, f"[Cached Advisory] {severity}: follow local instructions.")
 
     try:
         if not GEMINI_AVAILABLE:
             print("Warning: google-generativeai package not installed. Install with: pip install google-generativeai")
-            return LOCAL_CACHE.get(severity, f"[Mock Advisory] Severity: {severity}. Drivers: {', '.join(drivers)}")
+            return _cache_fallback(severity, f"[Mock Advisory] Severity: {severity}. Drivers: {dv.joined}")
         
         if not GEMINI_KEY:
             print("Warning: GEMINI_API_KEY not set. Set it in .env file or environment variable.")
-            return LOCAL_CACHE.get(severity, f"[Mock Advisory] Severity: {severity}. Drivers: {', '.join(drivers)}")
+            return _cache_fallback(severity, f"[Mock Advisory] Severity: {severity}. Drivers: {dv.joined}")
+
+        model, model_name = _get_model()
 
-        # Configure Gemini API
-        genai.configure(api_key=GEMINI_KEY)
-        
-        # Use ONLY Gemini 2.0 Flash
-        model_name = None
-        # Try both formats: with and without models/ prefix
-        gemini_2_flash_models = ['models/gemini-2.5-flash-lite', 'gemini-2.5-flash-lite']
-        
-        for model_candidate in gemini_2_flash_models:
-            try:
-                model = genai.GenerativeModel(model_candidate)
-                model_name = model_candidate
-                print(f"✓ Using Gemini 2.5 Flash Lite: {model_name}")
-                break
-            except Exception as e:
-                continue
-        
-        if model_name is None:
-            raise ValueError("Gemini 2.5 Flash Lite model not available. Please ensure you have access to gemini-2.5-flash-lite model.")
-        
         # Create a more neutral, clinical prompt that's less likely to trigger safety filters
         # Focus on public safety information rather than disaster scenarios
         neutral_prompt = f"""Generate a brief public safety advisory message.
 Risk level: {severity}
-Factors: {', '.join(drivers)}
+Factors: {dv.joined}
 Audience: {role}
 
 Provide 2-3 sentences of clear, factual safety guidance. Use neutral, professional language focused on preparedness and response protocols."""
         
-        # Configure safety settings to be less restrictive for public safety content
-        try:
-            # Use proper enum values if available
-            from google.generativeai.types import HarmCategory, HarmBlockThreshold
-            safety_settings = {
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,  # Most permissive for safety info
-            }
-        except (ImportError, AttributeError):
-            # Fallback to string format
-            safety_settings = [
-                {
-                    "category": "HARM_CATEGORY_HARASSMENT",
-                    "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                },
-                {
-                    "category": "HARM_CATEGORY_HATE_SPEECH",
-                    "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                },
-                {
-                    "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                    "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                },
-                {
-                    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                    "threshold": "BLOCK_ONLY_HIGH"  # Most permissive for safety content
-                }
-            ]
-        
         # Try with neutral prompt and adjusted safety settings
         try:
             response = model.generate_content(
@@ -107,22 +240,22 @@ Provide 2-3 sentences of clear, factual safety guidance. Use neutral, profession
                     "max_output_tokens": 150,
                     "temperature": 0.7,
                 },
-                safety_settings=safety_settings
+                safety_settings=SAFETY_SETTINGS
             )
         except Exception as e1:
             # Fallback 1: Try with safety settings only
             try:
                 response = model.generate_content(
                     neutral_prompt,
-                    safety_settings=safety_settings
+                    safety_settings=SAFETY_SETTINGS
                 )
             except Exception as e2:
                 # Fallback 2: Try with even more neutral prompt
                 try:
-                    simple_prompt = f"Public safety advisory: {severity} risk level due to {', '.join(drivers[:2])}. Provide brief safety guidance."
+                    simple_prompt = f"Public safety advisory: {severity} risk level due to {dv.first2}. Provide brief safety guidance."
                     response = model.generate_content(
                         simple_prompt,
-                        safety_settings=safety_settings
+                        safety_settings=SAFETY_SETTINGS
                     )
                 except Exception as e3:
                     # Final fallback: Simple generation without safety settings
@@ -134,6 +267,7 @@ Provide 2-3 sentences of clear, factual safety guidance. Use neutral, profession
         
         if not response:
             raise ValueError("Empty response from Gemini API")
+        _breaker_record(True)
         
         # Check for blocked content (finish_reason 2 = SAFETY)
         if hasattr(response, 'candidates') and response.candidates:
@@ -145,11 +279,10 @@ Provide 2-3 sentences of clear, factual safety guidance. Use neutral, profession
                 if finish_reason == 2 or (isinstance(finish_reason, int) and finish_reason == 2):
                     # Try one more time with an even simpler prompt
                     try:
-                        # Only show retry message in verbose mode (can be controlled via env var)
-                        verbose = os.getenv("GEMINI_VERBOSE", "false").lower() == "true"
-                        if verbose:
+                        # Only show retry message in verbose mode (GEMINI_VERBOSE=true)
+                        if GEMINI_VERBOSE:
                             print("⚠️ Content blocked, retrying with simpler prompt...")
-                        simple_retry = f"Brief safety message: {severity} risk. Factors: {', '.join(drivers[:2]) if len(drivers) >= 2 else drivers[0] if drivers else 'weather conditions'}. Provide guidance."
+                        simple_retry = f"Brief safety message: {severity} risk. Factors: {dv.head}. Provide guidance."
                         retry_response = model.generate_content(simple_retry)
                         
                         if hasattr(retry_response, 'candidates') and retry_response.candidates:
@@ -159,23 +292,20 @@ Provide 2-3 sentences of clear, factual safety guidance. Use neutral, profession
                                 if hasattr(retry_response, 'text'):
                                     text = retry_response.text.strip()
                                     if text:
-                                        if verbose:
+                                        if GEMINI_VERBOSE:
                                             print("✓ Retry successful!")
-                                        LOCAL_CACHE[severity] = text
-                                        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-                                        with open(CACHE_PATH, "w", encoding="utf-8") as f:
-                                            json.dump(LOCAL_CACHE, f, indent=2, ensure_ascii=False)
+                                        _cache_put(cache_key, severity, text)
                                         return text
                     except Exception:
                         pass
                     
                     # If retry failed, use fallback
                     print("⚠️ Content blocked by safety filters. Using fallback advisory.")
-                    fallback_msg = f"{severity} risk level detected. Factors: {', '.join(drivers)}. Follow local emergency protocols and official instructions."
-                    return LOCAL_CACHE.get(severity, fallback_msg)
+                    fallback_msg = f"{severity} risk level detected. Factors: {dv.joined}. Follow local emergency protocols and official instructions."
+                    return _cache_fallback(severity, fallback_msg)
                 elif finish_reason == 3:  # RECITATION (repetitive content)
                     print("⚠️ Content flagged as recitation. Using fallback advisory.")
-                    return LOCAL_CACHE.get(severity, f"[Advisory] {severity} risk level. Drivers: {', '.join(drivers)}. Follow local emergency instructions.")
+                    return _cache_fallback(severity, f"[Advisory] {severity} risk level. Drivers: {dv.joined}. Follow local emergency instructions.")
         
         # Try to get text from response
         try:
@@ -196,15 +326,12 @@ Provide 2-3 sentences of clear, factual safety guidance. Use neutral, profession
                 raise ValueError("Cannot extract text from response")
         except Exception as extract_error:
             print(f"⚠️ Could not extract text: {extract_error}")
-            return LOCAL_CACHE.get(severity, f"[Advisory] {severity} risk level. Drivers: {', '.join(drivers)}. Follow local emergency instructions.")
+            return _cache_fallback(severity, f"[Advisory] {severity} risk level. Drivers: {dv.joined}. Follow local emergency instructions.")
         
         if not text:
             raise ValueError("Empty text in response")
 
-        LOCAL_CACHE[severity] = text
-        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(CACHE_PATH, "w", encoding="utf-8") as f:
-            json.dump(LOCAL_CACHE, f, indent=2, ensure_ascii=False)
+        _cache_put(cache_key, severity, text)
 
         print(f"✓ Gemini API success using {model_name}")
         return text
@@ -222,14 +349,102 @@ Provide 2-3 sentences of clear, factual safety guidance. Use neutral, profession
             print(f"⚠️ Content blocked by safety filters: {error_msg}")
             print("   → This is normal - disaster content may trigger safety filters")
             print("   → Using fallback advisory instead")
-            # Don't disable - this is expected behavior
+            # Don't disable - this is expected behavior (and not an outage, so no breaker count)
         elif "quota" in msg or "insufficient_quota" in msg or "429" in error_msg:
             GEMINI_DISABLED = True
             print(f"⚠️ Gemini API Quota Exceeded: {error_msg}")
         else:
             print(f"❌ Gemini API Error: {error_msg}")
             print(f"   Error type: {type(e).__name__}")
+        if not ("finish_reason" in msg or "safety" in msg or "blocked" in msg):
+            _breaker_record(False)
         
-        return LOCAL_CACHE.get(severity, f"[Mock Advisory] Severity: {severity}. Drivers: {', '.join(drivers)}")
+        return _cache_fallback(severity, f"[Mock Advisory] Severity: {severity}. Drivers: {dv.joined}")
+
+
+# Separator between advisories in a batched Gemini response
+ADVISORY_SEP = "---"
+
+
+def _split_blocks(text):
+    """Split a batched response on lines that are just ADVISORY_SEP."""
+    blocks, cur = [], []
+    for line in text.splitlines():
+        if line.strip() == ADVISORY_SEP:
+            blocks.append("\n".join(cur).strip())
+            cur = []
+        else:
+            cur.append(line)
+    blocks.append("\n".join(cur).strip())
+    return [b for b in blocks if b]
+
+
+def generate_advisories(specs, on_block=None):
+    """
+    Advisories for several (severity, drivers, role) specs with one Gemini request.
 
+    - Cached specs are answered locally; only the misses go into the batched prompt.
+    - The response is streamed; each block is cached (and passed to on_block(index, text),
+      if given) as soon as its separator arrives, so a UI can show advisories progressively.
+    - Missing or unparseable blocks, and any API error, fall back to generate_advisory() per spec.
+    """
+    specs = [(sev, list(drv), role) for sev, drv, role in specs]
+    keys = [_advisory_key(sev, drv, role) for sev, drv, role in specs]
+    results = [_cache_get(k) for k in keys]
+    pending = [i for i, r in enumerate(results) if not r]
+
+    usable = GEMINI_AVAILABLE and GEMINI_KEY and not GEMINI_DISABLED and not _breaker_open()
+    if len(pending) > 1 and usable:
+        blocks = "\n".join(
+            f"Block {n + 1}: Risk level: {specs[i][0]}. Factors: {', '.join(specs[i][1])}. Audience: {specs[i][2]}."
+            for n, i in enumerate(pending)
+        )
+        prompt = f"""Generate {len(pending)} brief public safety advisory messages, one per block below, in the same order.
+Separate consecutive advisories with a line containing only {ADVISORY_SEP}. Do not number or label them.
+Each advisory is 2-3 sentences of clear, factual safety guidance in neutral, professional language.
+
+{blocks}"""
+
+        changed = [False]
+
+        def _emit(n, text):
+            i = pending[n]
+            results[i] = text
+            changed[0] |= _cache_put(keys[i], specs[i][0], text, flush=False)
+            if on_block is not None:
+                on_block(i, text)
+
+        try:
+            model, model_name = _get_model()
+            response = model.generate_content(
+                prompt,
+                generation_config={"max_output_tokens": 150 * len(pending), "temperature": 0.7},
+                safety_settings=SAFETY_SETTINGS,
+                stream=True,
+            )
+            buf, done = "", 0
+            for chunk in response:
+                buf += getattr(chunk, "text", "") or ""
+                parts = _split_blocks(buf + "\n")
+                # Every block but the last is complete once text follows its separator
+                while done < min(len(parts) - 1, len(pending)):
+                    _emit(done, parts[done])
+                    done += 1
+            parts = _split_blocks(buf)
+            while done < min(len(parts), len(pending)):
+                _emit(done, parts[done])
+                done += 1
+            _breaker_record(True)
+            print(f"✓ Gemini batch success using {model_name}: {done}/{len(pending)} advisories")
+        except Exception as e:
+            _breaker_record(False)
+            print(f"⚠️ Batched advisory request failed, falling back per advisory: {e}")
+        if changed[0]:
+            _flush_cache()
 
+    for i, (sev, drv, role) in enumerate(specs):
+        if not results[i]:
+            results[i] = generate_advisory(sev, drv, role=role)
+            if on_block is not None:
+                on_block(i, results[i])
+    return results
@@ -2,18 +2,38 @@
 Crowd risk estimation using density heuristics with multilingual support.
 """
 
+import numpy as np
 import pandas as pd
-import yaml
 from pathlib import Path
 
+from .thresholds import freeze, load_thresholds
+
 CONFIG = Path("configs/thresholds.yaml")
+DEFAULT_THRESHOLDS = freeze({
+    "crowd_density_per_m2": {"low": 0.5, "medium": 2, "high": 4},
+})
+
+# English defaults for every label score_crowd can emit, keyed by i18n key
+_EN_LABELS = {
+    "no_data": "No crowd data",
+    "missing_people": "Missing 'people' column",
+    "density": "Density",
+    "high": "High density",
+    "medium": "Moderate density",
+    "low": "Low density",
+}
+
+def _labels(i18n):
+    # Resolve all labels in one pass; the shared English table when no i18n dict is given
+    if not i18n:
+        return _EN_LABELS
+    return {k: i18n.get(k, d) for k, d in _EN_LABELS.items()}
 
 def _load_thresholds():
     try:
-        with open(CONFIG, encoding="utf-8") as f:
-            return yaml.safe_load(f)
+        return load_thresholds(CONFIG, DEFAULT_THRESHOLDS)
     except Exception:
-        return {"crowd_density_per_m2": {"low": 0.5, "medium": 2, "high": 4}}
+        return DEFAULT_THRESHOLDS
 
 def score_crowd(crowd_df, trigger_surge=False, area_m2=1000.0, i18n=None):
     """
@@ -21,30 +41,38 @@ def score_crowd(crowd_df, trigger_surge=False, area_m2=1000.0, i18n=None):
     i18n: dictionary for multilingual labels (optional).
     """
     t = _load_thresholds()
+    lbl = _labels(i18n)
 
     # Handle missing or empty data
     if crowd_df is None or crowd_df.empty:
-        return 0.0, [i18n.get("no_data", "No crowd data") if i18n else "No crowd data"]
+        return 0.0, [lbl["no_data"]]
 
     if "people" not in crowd_df.columns:
-        return 0.0, [i18n.get("missing_people", "Missing 'people' column") if i18n else "Missing 'people' column"]
+        return 0.0, [lbl["missing_people"]]
 
-    total_people = int(crowd_df["people"].sum())
+    people = crowd_df["people"]
+    if len(people) == 1:
+        first = people.iat[0]
+        total_people = 0 if pd.isna(first) else int(first)
+    else:
+        # Sum on the raw ndarray, skipping NaN like Series.sum(); scaled crowds are float, so
+        # truncate the total, not each row
+        total_people = int(np.nansum(people.to_numpy(dtype=float, copy=False)))
     density = total_people / area_m2
 
     drivers = [
-        f"{i18n.get('density','Density') if i18n else 'Density'}: {density:.2f} ppl/m2",
+        f"{lbl['density']}: {density:.2f} ppl/m2",
         f"Total people: {total_people}"
     ]
 
     score = 0.0
     if trigger_surge or density >= t["crowd_density_per_m2"]["high"]:
         score = 0.7
-        drivers.append(i18n.get("high", "High density") if i18n else "High density")
+        drivers.append(lbl["high"])
     elif density >= t["crowd_density_per_m2"]["medium"]:
         score = 0.35
-        drivers.append(i18n.get("medium", "Moderate density") if i18n else "Moderate density")
+        drivers.append(lbl["medium"])
     else:
-        drivers.append(i18n.get("low", "Low density") if i18n else "Low density")
+        drivers.append(lbl["low"])
 
     return min(1.0, score), drivers
@@ -2,19 +2,31 @@
 Disaster risk scoring using thresholds with multilingual support.
 """
 
-import yaml
+from bisect import bisect_right
 from pathlib import Path
 
+import numpy as np
+
+from .thresholds import freeze, load_thresholds
+
 CONFIG = Path("configs/thresholds.yaml")
+DEFAULT_THRESHOLDS = freeze({
+    "rainfall_mm": {"low": 10, "medium": 25, "high": 50},
+    "wind_kph": {"low": 20, "medium": 40, "high": 80},
+})
+
+# Score added per bucket (below medium, medium, high and above) for each driver
+RAIN_SCORES = (0.0, 0.3, 0.6)
+WIND_SCORES = (0.0, 0.15, 0.4)
+_RAIN_SCORES_ARR = np.asarray(RAIN_SCORES)
+_WIND_SCORES_ARR = np.asarray(WIND_SCORES)
+
+def _edges(t, key):
+    # bisect_right/searchsorted(side="right") over (medium, high) matches the >= comparisons
+    return (t[key]["medium"], t[key]["high"])
 
 def _load_thresholds():
-    if CONFIG.exists():
-        with open(CONFIG, encoding="utf-8") as f:
-            return yaml.safe_load(f)
-    return {
-        "rainfall_mm": {"low": 10, "medium": 25, "high": 50},
-        "wind_kph": {"low": 20, "medium": 40, "high": 80}
-    }
+    return load_thresholds(CONFIG, DEFAULT_THRESHOLDS)
 
 def score_disaster(weather, trigger_flood=False, i18n=None):
     """
@@ -25,27 +37,50 @@ def score_disaster(weather, trigger_flood=False, i18n=None):
     rainfall = weather.get("rainfall_mm", 0)
     wind = weather.get("wind_kph", 0)
 
-    score = 0.0
+    # NaN compares false against both edges but bisects past them; bucket it as 0 like the batch path
+    rain_idx = 2 if trigger_flood else bisect_right(_edges(t, "rainfall_mm"), 0 if rainfall != rainfall else rainfall)
+    wind_idx = bisect_right(_edges(t, "wind_kph"), 0 if wind != wind else wind)
+    score = RAIN_SCORES[rain_idx] + WIND_SCORES[wind_idx]
     drivers = []
 
     # Rainfall scoring
-    if rainfall >= t["rainfall_mm"]["high"] or trigger_flood:
-        score += 0.6
-        drivers.append(f"{i18n.get('risk_disaster','Disaster risk') if i18n else 'Disaster risk'}: Severe rainfall ({rainfall} mm)")
-    elif rainfall >= t["rainfall_mm"]["medium"]:
-        score += 0.3
+    if rain_idx == 2:
+        label = i18n.get("risk_disaster", "Disaster risk") if i18n else "Disaster risk"
+        drivers.append(f"{label}: Severe rainfall ({rainfall} mm)")
+    elif rain_idx == 1:
         drivers.append(f"Moderate rainfall ({rainfall} mm)")
     else:
         drivers.append(f"Low rainfall ({rainfall} mm)")
 
     # Wind scoring
-    if wind >= t["wind_kph"]["high"]:
-        score += 0.4
+    if wind_idx == 2:
         drivers.append(f"High winds ({wind:.1f} kph)")
-    elif wind >= t["wind_kph"]["medium"]:
-        score += 0.15
+    elif wind_idx == 1:
         drivers.append(f"Moderate winds ({wind:.1f} kph)")
     else:
         drivers.append(f"Low winds ({wind:.1f} kph)")
 
     return min(1.0, score), drivers
+
+def score_disaster_batch(weather_df, trigger_flood=False):
+    """
+    Vectorized score_disaster() over a DataFrame of weather samples (e.g. a time series).
+    Missing rainfall_mm/wind_kph columns or values count as 0, as in score_disaster().
+
+    Returns (scores, rain_idx, wind_idx): score per row plus its rainfall and wind buckets
+    (0=low, 1=moderate, 2=high/severe) for building driver labels.
+    """
+    t = _load_thresholds()
+    n = len(weather_df)
+
+    def _column(name):
+        if name not in weather_df.columns:
+            return np.zeros(n)
+        return np.nan_to_num(weather_df[name].to_numpy(dtype=float), nan=0.0)
+
+    rain_idx = np.searchsorted(np.asarray(_edges(t, "rainfall_mm"), dtype=float), _column("rainfall_mm"), side="right")
+    if trigger_flood:
+        rain_idx[:] = 2
+    wind_idx = np.searchsorted(np.asarray(_edges(t, "wind_kph"), dtype=float), _column("wind_kph"), side="right")
+    scores = np.minimum(1.0, _RAIN_SCORES_ARR[rain_idx] + _WIND_SCORES_ARR[wind_idx])
+    return scores, rain_idx, wind_idx
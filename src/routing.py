@@ -5,12 +5,24 @@ Defensive routing helpers for CrowdShield.
 - Works with OSMnx/networkx when available.
 - Provides safe fallbacks (grid graph, dict graph) when libraries or data are missing.
 - Robust edge-blocking that tolerates different hazard input types.
+- Shortest paths run on a cached SciPy CSR adjacency (C Dijkstra) when SciPy is installed,
+  else on a cached rustworkx mirror of the graph when rustworkx is installed.
+- Node positions are cached per graph as parallel lat/lon arrays (node_arrays) for all distance math
+  and path-to-coordinate conversion; edge-pruned copies inherit them instead of re-reading nodes.
+- Nearest-node lookups query a cached KD-tree over the graph's nodes when SciPy is installed.
+- Hazard polygons are collected and shapely-prepared once per call; many hazards over many edges
+  are tested on a thread pool (GEOS releases the GIL).
+- Safest paths use A* with hazard-aware edge weights instead of copying and pruning the graph.
+- One origin to many targets (compute_shortest_paths_from) shares a single single-source search.
 """
 
 from typing import List, Tuple, Optional, Any, Union
+import hashlib
+import json
 import math
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Optional dependencies
 try:
@@ -23,6 +35,28 @@ try:
 except Exception:
     ox = None
 
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+except Exception:
+    csr_matrix = None
+    csgraph_dijkstra = None
+
+try:
+    from scipy.spatial import cKDTree
+except Exception:
+    cKDTree = None
+
+try:
+    import rustworkx
+except Exception:
+    rustworkx = None
+
 try:
     from shapely.geometry import Point, shape
     from shapely.geometry.base import BaseGeometry
@@ -31,6 +65,35 @@ except Exception:
     shape = None
     BaseGeometry = None
 
+try:
+    from shapely import STRtree  # Shapely 2.x: query() returns integer indices
+except Exception:
+    STRtree = None
+
+try:
+    from shapely import contains_xy, points as shapely_points, prepare as shapely_prepare  # Shapely 2.x vectorized
+    from shapely import linearrings as shapely_linearrings, polygons as shapely_polygons
+    from shapely import multipolygons as shapely_multipolygons
+    from shapely import from_geojson as shapely_from_geojson
+except Exception:
+    contains_xy = None
+    shapely_points = None
+    shapely_prepare = None
+    shapely_linearrings = None
+    shapely_polygons = None
+    shapely_multipolygons = None
+    shapely_from_geojson = None
+
+try:
+    from . import geo  # Numba-compiled haversine kernels (plain NumPy/math without Numba)
+except Exception:
+    geo = None
+
+try:
+    from . import data_loader  # shared STRtree cache, one tree per distinct hazard geometry set
+except Exception:
+    data_loader = None
+
 logger = logging.getLogger("crowdshield.routing")
 if not logger.handlers:
     h = logging.StreamHandler()
@@ -38,9 +101,27 @@ if not logger.handlers:
     logger.addHandler(h)
 logger.setLevel(logging.INFO)
 
+# From this many hazards on, block_edges_by_hazards queries all edge midpoints against the hazard
+# set's STRtree (build_hazard_tree, cached per hazard set); below it, one contains_xy scan per
+# hazard is cheaper
+HAZARD_TREE_MIN_HAZARDS = 32
+
+# Below the tree threshold, more than this many hazards over at least PARALLEL_MIN_MIDPOINTS edges
+# run their contains_xy scans on a thread pool (multi-core machines only)
+PARALLEL_MIN_HAZARDS = 8
+PARALLEL_MIN_MIDPOINTS = 5000
+
+# Pruned graphs block_edges_by_hazards keeps per source graph, one per distinct hazard set
+BLOCKED_CACHE_MAX = 8
+
+# A lone hole-free hazard with fewer exterior vertices than this skips all indexing setup
+SMALL_POLYGON_MAX_COORDS = 64
+
 
 def _haversine_km(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
     """Return great-circle distance between two (lat, lon) points in kilometers."""
+    if geo is not None:
+        return geo.haversine_km(p1, p2)
     lat1, lon1 = p1
     lat2, lon2 = p2
     R = 6371.0
@@ -51,6 +132,26 @@ def _haversine_km(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
     return R * c
 
 
+def _haversine_km_vec(lat1, lon1, lat2, lon2):
+    """Element-wise _haversine_km over broadcastable arrays of degrees (NumPy required)."""
+    if geo is not None:
+        return geo.haversine_km_pairs(lat1, lon1, lat2, lon2)
+    lat1 = np.asarray(lat1, dtype=np.float64)
+    lat2 = np.asarray(lat2, dtype=np.float64)
+    dlat = np.radians(lat2 - lat1)
+    dlon = np.radians(np.asarray(lon2, dtype=np.float64) - np.asarray(lon1, dtype=np.float64))
+    a = np.sin(dlat / 2) ** 2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(dlon / 2) ** 2
+    return 6371.0 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _edge_lengths_km(G: Any, edges: List[Tuple[Any, Any]]):
+    """Haversine length (km) of every (u, v) in edges, computed in one NumPy pass over node_arrays(G)."""
+    soa = node_arrays(G)
+    ui, vi = _edge_index_arrays(soa, edges)
+    lat, lon = soa["lat"], soa["lon"]
+    return _haversine_km_vec(lat[ui], lon[ui], lat[vi], lon[vi])
+
+
 def load_graph(online: bool = True, center_point: Optional[Tuple[float, float]] = None, dist: int = 1500):
     """
     Load an OSMnx graph if available; otherwise return a simple grid graph or dict fallback.
@@ -70,7 +171,7 @@ def load_graph(online: bool = True, center_point: Optional[Tuple[float, float]]
                 # Use walking network by default for safety/evacuation scenarios
                 G = ox.graph_from_point(center, dist=dist, network_type="walk")
                 logger.info("Loaded OSMnx graph from point %s", center)
-                return G
+                return _simplify_osm_graph(G)
             except Exception as e:
                 logger.warning("OSMnx graph_from_point failed: %s", e)
         # If OSMnx not available or online False, return a small grid graph (networkx) if possible
@@ -80,6 +181,24 @@ def load_graph(online: bool = True, center_point: Optional[Tuple[float, float]]
         return build_grid_graph(size=10, center_point=center_point)
 
 
+def _simplify_osm_graph(G: Any) -> Any:
+    """
+    Contract degree-2 chains (midblock nodes) unless OSMnx already did; lengths are summed and the
+    merged edge keeps the chain as its geometry. Returns G unchanged if simplification fails.
+    """
+    if G.graph.get("simplified") is True:
+        return G
+    try:
+        simplify = getattr(ox, "simplify_graph", None) or ox.simplification.simplify_graph
+        n_nodes, n_edges = G.number_of_nodes(), G.number_of_edges()
+        G = simplify(G)
+        logger.info("Simplified OSMnx graph: %d -> %d nodes, %d -> %d edges",
+                    n_nodes, G.number_of_nodes(), n_edges, G.number_of_edges())
+    except Exception as e:
+        logger.warning("OSMnx simplify_graph failed: %s", e)
+    return G
+
+
 def build_grid_graph(size: int = 10, center_point: Optional[Tuple[float, float]] = None):
     """
     Create a simple grid graph (networkx) for offline demo.
@@ -117,16 +236,77 @@ def build_grid_graph(size: int = 10, center_point: Optional[Tuple[float, float]]
                 G.nodes[n]["x"] = float(n[1])
                 G.nodes[n]["coord"] = (float(n[0]), float(n[1]))
         # Add simple length attribute on edges
-        for u, v in list(G.edges()):
-            a = G.nodes[u]["coord"]
-            b = G.nodes[v]["coord"]
-            G.edges[u, v]["length"] = _haversine_km(a, b)
+        if np is not None:
+            edges = list(G.edges())
+            nx.set_edge_attributes(G, dict(zip(edges, _edge_lengths_km(G, edges).tolist())), "length")
+        else:
+            for u, v in list(G.edges()):
+                a = G.nodes[u]["coord"]
+                b = G.nodes[v]["coord"]
+                G.edges[u, v]["length"] = _haversine_km(a, b)
         return G
     except Exception as e:
         logger.warning("build_grid_graph error: %s", e)
         return {"nodes": [], "edges": []}
 
 
+def _geojson_geoms_bulk(items: List[dict]) -> List[Any]:
+    """
+    Shapely geometries for GeoJSON-like dicts, aligned with items (None where conversion failed).
+
+    Polygon/MultiPolygon rings are flattened into one coordinate array and built with a single
+    shapely.linearrings/polygons/multipolygons call each. Other types are decoded together by
+    shapely.from_geojson (re-serializing polygons for it costs more than it saves). Anything left,
+    e.g. a polygon batch with a malformed ring, goes through shape() per item.
+    """
+    out: List[Any] = [None] * len(items)
+    bulk = [i for i, it in enumerate(items) if it.get("type") in ("Polygon", "MultiPolygon")]
+    if bulk and shapely_polygons is not None and np is not None:
+        try:
+            coords, coord_ring, ring_part, part_item = [], [], [], []
+            for k, i in enumerate(bulk):
+                it = items[i]
+                parts = [it["coordinates"]] if it["type"] == "Polygon" else it["coordinates"]
+                for rings in parts:
+                    # First ring of each part is its shell, the rest are holes
+                    for ring in rings:
+                        arr = np.asarray(ring, dtype=np.float64)[:, :2]
+                        coords.append(arr)
+                        coord_ring.append(np.full(len(arr), len(ring_part)))
+                        ring_part.append(len(part_item))
+                    part_item.append(k)
+            rings = shapely_linearrings(np.concatenate(coords), indices=np.concatenate(coord_ring))
+            polys = shapely_polygons(rings, indices=np.asarray(ring_part))
+            part_item = np.asarray(part_item)
+            multi = np.array([items[i]["type"] == "MultiPolygon" for i in bulk])
+            in_multi = multi[part_item]
+            geoms = np.empty(len(bulk), dtype=object)
+            geoms[~multi] = polys[~in_multi]
+            if multi.any():
+                # Renumber the multipolygon owners 0..m-1 for the grouping call
+                owner = np.cumsum(multi)[part_item[in_multi]] - 1
+                geoms[multi] = shapely_multipolygons(polys[in_multi], indices=owner)
+            for k, i in enumerate(bulk):
+                out[i] = geoms[k]
+        except Exception:
+            pass
+    rest = [i for i, it in enumerate(items) if out[i] is None and it.get("type") not in ("Polygon", "MultiPolygon")]
+    if rest and shapely_from_geojson is not None and np is not None:
+        try:
+            strs = np.array([json.dumps(items[i]) for i in rest], dtype=object)
+            for i, g in zip(rest, shapely_from_geojson(strs, on_invalid="ignore")):
+                out[i] = g
+        except Exception:
+            pass
+    for i, it in enumerate(items):
+        if out[i] is None and shape is not None:
+            try:
+                out[i] = shape(it)
+            except Exception:
+                continue
+    return out
+
+
 def _iter_hazard_geoms(hazard_polygons: Any):
     """
     Yield shapely geometry-like objects from various hazard inputs:
@@ -144,19 +324,19 @@ def _iter_hazard_geoms(hazard_polygons: Any):
             return
         # list-like
         if isinstance(hazard_polygons, (list, tuple, set)):
-            for item in hazard_polygons:
+            items = list(hazard_polygons)
+            # geojson-like dicts are converted together up front, then yielded in input order
+            dicts = [item for item in items if isinstance(item, dict) and "type" in item and "coordinates" in item]
+            converted = iter(_geojson_geoms_bulk(dicts)) if dicts else iter(())
+            for item in items:
                 # shapely geometry
                 if BaseGeometry is not None and isinstance(item, BaseGeometry):
                     yield item
                 # geojson-like dict
                 elif isinstance(item, dict) and "type" in item and "coordinates" in item:
-                    if shape is not None:
-                        try:
-                            yield shape(item)
-                        except Exception:
-                            continue
-                    else:
-                        continue
+                    g = next(converted)
+                    if g is not None:
+                        yield g
                 else:
                     # unknown, skip
                     continue
@@ -165,11 +345,163 @@ def _iter_hazard_geoms(hazard_polygons: Any):
         return
 
 
-def block_edges_by_hazards(G: Any, hazard_polygons: Any) -> Tuple[Any, int]:
+def _is_small_polygon(g: Any) -> bool:
+    """True for a hole-free Polygon with fewer than SMALL_POLYGON_MAX_COORDS exterior vertices."""
+    try:
+        return (g.geom_type == "Polygon" and g.num_interior_rings == 0
+                and len(g.exterior.coords) < SMALL_POLYGON_MAX_COORDS)
+    except Exception:
+        return False
+
+
+def _collect_hazard_geoms(hazard_polygons: Any) -> List[Any]:
+    """
+    List of the hazard geometries _iter_hazard_geoms yields that support contains(); shapely
+    geometries are prepared in one bulk call so every later contains test reuses the edge index
+    (skipped for a single small polygon, where there is nothing to amortize).
+    """
+    geoms = [g for g in _iter_hazard_geoms(hazard_polygons) if hasattr(g, "contains")]
+    if len(geoms) == 1 and _is_small_polygon(geoms[0]):
+        return geoms
+    if geoms and shapely_prepare is not None and np is not None and BaseGeometry is not None:
+        try:
+            arr = np.array([g for g in geoms if isinstance(g, BaseGeometry)], dtype=object)
+            if arr.size:
+                shapely_prepare(arr)
+        except Exception:
+            pass
+    return geoms
+
+
+def _edge_midpoint_xy(G: Any, u: Any, v: Any, data: dict) -> Optional[Tuple[float, float]]:
+    """(x, y) = (lon, lat) midpoint of an edge: its geometry's centroid, else the mean of its end nodes."""
+    # If edge has geometry attribute (shapely), use centroid
+    if data and "geometry" in data and hasattr(data["geometry"], "centroid"):
+        try:
+            c = data["geometry"].centroid
+            return float(c.x), float(c.y)
+        except Exception:
+            pass
+    try:
+        # nodes may store x,y or lon,lat or coord
+        ux = G.nodes[u].get("x", G.nodes[u].get("lon", None))
+        uy = G.nodes[u].get("y", G.nodes[u].get("lat", None))
+        vx = G.nodes[v].get("x", G.nodes[v].get("lon", None))
+        vy = G.nodes[v].get("y", G.nodes[v].get("lat", None))
+        if None in (ux, uy, vx, vy):
+            # fallback: if nodes are tuple coords (i,j) or (lat,lon)
+            if isinstance(u, tuple) and len(u) >= 2 and isinstance(u[0], (int, float)):
+                u_lat = float(u[0]); u_lon = float(u[1])
+            else:
+                u_lat = float(G.nodes[u].get("y", 0.0)); u_lon = float(G.nodes[u].get("x", 0.0))
+            if isinstance(v, tuple) and len(v) >= 2 and isinstance(v[0], (int, float)):
+                v_lat = float(v[0]); v_lon = float(v[1])
+            else:
+                v_lat = float(G.nodes[v].get("y", 0.0)); v_lon = float(G.nodes[v].get("x", 0.0))
+            return (u_lon + v_lon) / 2.0, (u_lat + v_lat) / 2.0
+        # ux,uy,vx,vy likely lon/lat or x/y
+        return (ux + vx) / 2.0, (uy + vy) / 2.0
+    except Exception:
+        return None
+
+
+def _hazard_fingerprint(geoms: List[Any]) -> Optional[bytes]:
+    """BLAKE2b digest of the hazards' WKB (order-sensitive); None if any of them isn't a shapely geometry."""
+    if BaseGeometry is None or not all(isinstance(g, BaseGeometry) for g in geoms):
+        return None
+    try:
+        h = hashlib.blake2b(digest_size=16)
+        for g in geoms:
+            h.update(g.wkb)
+            h.update(b"|")
+        return h.digest()
+    except Exception:
+        return None
+
+
+def _block_edges_nx(G: Any, geoms: List[Any], hazard_tree: Any = None) -> Tuple[Any, int]:
+    """
+    Pruned copy of networkx graph G without the edges whose midpoint lies in one of geoms, and the count.
+    hazard_tree: STRtree over the same hazards (build_hazard_tree), used for large hazard sets.
+    """
+    # Multigraphs: remove the exact parallel edge (u, v, key) whose midpoint is in a hazard
+    edges = list(G.edges(keys=True, data=True)) if G.is_multigraph() else list(G.edges(data=True))
+    if contains_xy is not None and np is not None:
+        # Midpoints from the node arrays; edges with a geometry use its centroid instead
+        soa = node_arrays(G)
+        ui, vi = _edge_index_arrays(soa, edges)
+        mid_x = (soa["lon"][ui] + soa["lon"][vi]) / 2.0
+        mid_y = (soa["lat"][ui] + soa["lat"][vi]) / 2.0
+        for k, e in enumerate(edges):
+            geom = e[-1].get("geometry")
+            if geom is not None and hasattr(geom, "centroid"):
+                try:
+                    c = geom.centroid
+                    mid_x[k], mid_y[k] = c.x, c.y
+                except Exception:
+                    pass
+        hit = np.zeros(len(edges), dtype=bool)
+        if len(geoms) == 1 and _is_small_polygon(geoms[0]):
+            # Common single-hazard case: one direct scan, no tree, prepare or pool
+            hit = np.asarray(contains_xy(geoms[0], mid_x, mid_y), dtype=bool)
+        elif len(geoms) >= HAZARD_TREE_MIN_HAZARDS and (
+                hazard_tree is not None or (hazard_tree := build_hazard_tree(geoms)) is not None):
+            # Only midpoints inside a hazard's bbox reach the exact test
+            valid = np.flatnonzero(np.isfinite(mid_x) & np.isfinite(mid_y))
+            idx, _ = hazard_tree.query(shapely_points(mid_x[valid], mid_y[valid]), predicate="within")
+            hit[valid[idx]] = True
+        else:
+            def _mask(poly):
+                try:
+                    return contains_xy(poly, mid_x, mid_y)
+                except Exception:
+                    return None
+
+            workers = min(len(geoms), os.cpu_count() or 1)
+            if workers > 1 and len(geoms) > PARALLEL_MIN_HAZARDS and len(edges) >= PARALLEL_MIN_MIDPOINTS:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    masks = list(pool.map(_mask, geoms))
+            else:
+                masks = map(_mask, geoms)
+            for m in masks:
+                if m is not None:
+                    hit |= m
+        hits = [e[:-1] for e, h in zip(edges, hit.tolist()) if h]
+    else:
+        hits = []
+        for e in edges:
+            m = _edge_midpoint_xy(G, e[0], e[1], e[-1])
+            if m is None or Point is None:
+                continue
+            pt = Point(m[0], m[1])
+            for poly in geoms:
+                try:
+                    if poly.contains(pt):
+                        hits.append(e[:-1])
+                        break
+                except Exception:
+                    continue
+    G2 = G.copy()
+    G2.remove_edges_from(hits)
+    G2.graph.pop("_blocked", None)  # G's pruned graphs are no use to G2; don't keep them alive
+    _carry_node_caches(G, G2)
+    return G2, len(hits)
+
+
+def block_edges_by_hazards(G: Any, hazard_polygons: Any, hazard_tree: Any = None) -> Tuple[Any, int]:
     """
     Remove edges whose midpoint lies inside hazard polygons.
     Returns a tuple (G_modified, blocked_count).
 
+    Midpoints are tested in bulk: one shapely.contains_xy call per prepared hazard polygon over
+    arrays of all edge midpoints (on a thread pool for many hazards and edges), or, with
+    HAZARD_TREE_MIN_HAZARDS or more hazards, a single query of the midpoints against the hazards'
+    STRtree (per-edge Point/contains loop without Shapely 2 / NumPy). hazard_tree: that tree for
+    the same hazards, e.g. from data_loader.get_hazard_index; built via build_hazard_tree (and
+    its per-hazard-set cache) when omitted.
+    The pruned graph is cached on G per hazard fingerprint (WKB digest of the hazard geometries),
+    so repeated requests for an unchanged hazard set skip the test and the copy. Treat the
+    returned graph as read-only.
     Works with networkx graphs and dict fallback. If networkx is not available or G is not a graph,
     returns (G, 0).
     """
@@ -177,71 +509,23 @@ def block_edges_by_hazards(G: Any, hazard_polygons: Any) -> Tuple[Any, int]:
         return G, 0
     blocked = 0
     try:
-        geoms = list(_iter_hazard_geoms(hazard_polygons))
+        geoms = _collect_hazard_geoms(hazard_polygons)
         if not geoms:
             return G, 0
         # networkx graph path
         if nx is not None and isinstance(G, nx.Graph):
-            G2 = G.copy()
-            for u, v, data in list(G.edges(data=True)):
-                try:
-                    # compute midpoint robustly
-                    midpoint = None
-                    # If edge has geometry attribute (shapely), use centroid
-                    if data and "geometry" in data and hasattr(data["geometry"], "centroid"):
-                        try:
-                            midpoint = data["geometry"].centroid
-                        except Exception:
-                            midpoint = None
-                    if midpoint is None:
-                        # nodes may store x,y or lon,lat or coord
-                        ux = G.nodes[u].get("x", G.nodes[u].get("lon", None))
-                        uy = G.nodes[u].get("y", G.nodes[u].get("lat", None))
-                        vx = G.nodes[v].get("x", G.nodes[v].get("lon", None))
-                        vy = G.nodes[v].get("y", G.nodes[v].get("lat", None))
-                        if None in (ux, uy, vx, vy):
-                            # fallback: if nodes are tuple coords (i,j) or (lat,lon)
-                            try:
-                                if isinstance(u, tuple) and len(u) >= 2 and isinstance(u[0], (int, float)):
-                                    u_lat = float(u[0]); u_lon = float(u[1])
-                                else:
-                                    u_lat = float(G.nodes[u].get("y", 0.0)); u_lon = float(G.nodes[u].get("x", 0.0))
-                                if isinstance(v, tuple) and len(v) >= 2 and isinstance(v[0], (int, float)):
-                                    v_lat = float(v[0]); v_lon = float(v[1])
-                                else:
-                                    v_lat = float(G.nodes[v].get("y", 0.0)); v_lon = float(G.nodes[v].get("x", 0.0))
-                                mid_lat = (u_lat + v_lat) / 2.0
-                                mid_lon = (u_lon + v_lon) / 2.0
-                                midpoint = Point(mid_lon, mid_lat) if Point is not None else None
-                            except Exception:
-                                midpoint = None
-                        else:
-                            # ux,uy,vx,vy likely lon/lat or x/y; create Point(lon, lat)
-                            try:
-                                mid_lon = (ux + vx) / 2.0
-                                mid_lat = (uy + vy) / 2.0
-                                midpoint = Point(mid_lon, mid_lat) if Point is not None else None
-                            except Exception:
-                                midpoint = None
-                    if midpoint is None:
-                        continue
-                    for poly in geoms:
-                        try:
-                            if hasattr(poly, "contains"):
-                                if poly.contains(midpoint):
-                                    try:
-                                        G2.remove_edge(u, v)
-                                        blocked += 1
-                                    except Exception:
-                                        pass
-                                    break
-                            else:
-                                # if poly not shapely, skip
-                                continue
-                        except Exception:
-                            continue
-                except Exception:
-                    continue
+            key = _hazard_fingerprint(geoms)
+            tag = (id(G), G.number_of_nodes(), G.number_of_edges())
+            cache = G.graph.get("_blocked", {})
+            hit = cache.get(key) if key is not None else None
+            if hit is not None and hit[0] == tag:
+                return hit[1], hit[2]
+            G2, blocked = _block_edges_nx(G, geoms, hazard_tree)
+            if key is not None and BLOCKED_CACHE_MAX > 0:
+                # Fresh dict (copies share G.graph values); oldest fingerprints drop out first
+                entries = [(k, v) for k, v in cache.items() if k != key and v[0] == tag]
+                entries = entries[len(entries) - BLOCKED_CACHE_MAX + 1:] if len(entries) >= BLOCKED_CACHE_MAX else entries
+                G.graph["_blocked"] = {**dict(entries), key: (tag, G2, blocked)}
             return G2, blocked
         # dict fallback: no edge geometry checks possible
         return G, 0
@@ -250,21 +534,290 @@ def block_edges_by_hazards(G: Any, hazard_polygons: Any) -> Tuple[Any, int]:
         return G, blocked
 
 
+def _node_latlon(G: Any, n: Any) -> Tuple[float, float]:
+    """(lat, lon) of a graph node: y/x attributes first, then a (lat, lon)-like tuple node id."""
+    data = G.nodes[n]
+    if "y" in data and "x" in data:
+        return float(data["y"]), float(data["x"])
+    if isinstance(n, tuple) and len(n) == 2 and isinstance(n[0], (int, float)):
+        return float(n[0]), float(n[1])
+    return float(data.get("lat", 0.0)), float(data.get("lon", 0.0))
+
+
+def node_arrays(G: Any) -> Optional[dict]:
+    """
+    Node positions as parallel arrays, built once per graph and cached in G.graph.
+
+    {"nodes": [node ids], "index": {node id: row}, "lat": float64[N], "lon": float64[N]}, with
+    _node_latlon's rules per node and NaN for unreadable nodes. Distance and midpoint math index
+    these arrays instead of reading node attribute dicts. Tagged like build_csr (a changed node
+    count or a copy re-reads them). None without NumPy or for non-graphs.
+    """
+    if np is None or nx is None or not isinstance(G, nx.Graph):
+        return None
+    tag = (id(G), G.number_of_nodes())
+    cached = G.graph.get("_soa")
+    if cached is not None and cached["tag"] == tag:
+        return cached
+    nodes = list(G.nodes)
+    lat = np.empty(len(nodes))
+    lon = np.empty(len(nodes))
+    for k, n in enumerate(nodes):
+        try:
+            lat[k], lon[k] = _node_latlon(G, n)
+        except Exception:
+            lat[k] = lon[k] = np.nan
+    bundle = {"tag": tag, "nodes": nodes, "index": {n: k for k, n in enumerate(nodes)}, "lat": lat, "lon": lon}
+    G.graph["_soa"] = bundle
+    return bundle
+
+
+def _path_coords(G: Any, path: List[Any]) -> List[Tuple[float, float]]:
+    """(lat, lon) per node of a path, read from node_arrays() instead of each node's attribute dict."""
+    soa = node_arrays(G)
+    if soa is None or not path:
+        return [_node_latlon(G, node) for node in path]
+    index = soa["index"]
+    rows = np.fromiter((index[n] for n in path), dtype=np.int64, count=len(path))
+    return list(zip(soa["lat"][rows].tolist(), soa["lon"][rows].tolist()))
+
+
+def _carry_node_caches(G: Any, G2: Any) -> None:
+    """
+    Retag G's node-only caches (node_arrays, build_node_index) for G2, a copy with the same nodes,
+    so an edge-pruned copy doesn't rebuild them. Edge-derived caches are left to rebuild.
+    """
+    n = G2.number_of_nodes()
+    if n != G.number_of_nodes():
+        return
+    soa = G.graph.get("_soa")
+    if soa is not None and soa["tag"] == (id(G), n):
+        G2.graph["_soa"] = {**soa, "tag": (id(G2), n)}
+    index = G.graph.get("_node_index")
+    if index is not None and index["tag"] == (id(G), n):
+        G2.graph["_node_index"] = {**index, "tag": (id(G2), n)}
+
+
+def _edge_index_arrays(soa: dict, edges: List[Tuple[Any, ...]]):
+    """Row indices into node_arrays() for the two ends of every edge."""
+    index = soa["index"]
+    ui = np.fromiter((index[e[0]] for e in edges), dtype=np.int64, count=len(edges))
+    vi = np.fromiter((index[e[1]] for e in edges), dtype=np.int64, count=len(edges))
+    return ui, vi
+
+
+def build_csr(G: Any, weight: str = "length") -> Optional[dict]:
+    """
+    Build (once per graph and weight) a CSR adjacency for SciPy's Dijkstra and cache it in G.graph.
+
+    Parallel edges keep their minimum weight; missing weights count as 1 (networkx semantics).
+    The cache is tagged with the edge count so a graph mutated in place gets rebuilt; copies
+    made with G.copy() carry a different id() and are rebuilt as well.
+    Returns None when SciPy/networkx are unavailable or G is not a graph.
+    """
+    if csr_matrix is None or nx is None or not isinstance(G, nx.Graph):
+        return None
+    tag = (id(G), G.number_of_edges(), weight)
+    cached = G.graph.get("_csr", {}).get(weight)
+    if cached is not None and cached["tag"] == tag:
+        return cached
+    nodes = list(G.nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+    n_edges = G.number_of_edges()
+    rows = np.empty(n_edges, dtype=np.int64)
+    cols = np.empty(n_edges, dtype=np.int64)
+    vals = np.empty(n_edges, dtype=np.float64)
+    for k, (u, v, w) in enumerate(G.edges(data=weight, default=1.0)):
+        rows[k], cols[k], vals[k] = index[u], index[v], w
+    # Sort by (row, col, weight) and keep the first of each (row, col): the lightest parallel edge
+    order = np.lexsort((vals, cols, rows))
+    rows, cols, vals = rows[order], cols[order], vals[order]
+    keep = np.ones(n_edges, dtype=bool)
+    keep[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    # csgraph drops explicit zeros, so zero-length edges get a tiny positive weight
+    vals = np.maximum(vals[keep], 1e-9)
+    csr = csr_matrix((vals, (rows[keep], cols[keep])), shape=(len(nodes), len(nodes)))
+    bundle = {"tag": tag, "csr": csr, "nodes": nodes, "index": index, "directed": G.is_directed()}
+    # Fresh dict: G.copy() shares G.graph values, so never mutate an inherited cache in place
+    G.graph["_csr"] = {**G.graph.get("_csr", {}), weight: bundle}
+    return bundle
+
+
+def _csr_dijkstra(G: Any, src: Any, dst: Any, weight: str = "length") -> Optional[Tuple[List[Any], float]]:
+    """(node path, total weight) src -> dst via SciPy Dijkstra on the cached CSR; None if CSR is unavailable."""
+    bundle = build_csr(G, weight)
+    if bundle is None:
+        return None
+    i, j = bundle["index"][src], bundle["index"][dst]
+    dist, pred = csgraph_dijkstra(bundle["csr"], directed=bundle["directed"], indices=i, return_predecessors=True)
+    if not np.isfinite(dist[j]):
+        raise nx.NetworkXNoPath(f"No path between {src} and {dst}.")
+    return _pred_walk(bundle["nodes"], pred, i, j), float(dist[j])
+
+
+def _pred_walk(nodes: List[Any], pred, i: int, j: int) -> List[Any]:
+    """Node path i -> j read back from a csgraph predecessor array."""
+    path_idx = [j]
+    while path_idx[-1] != i:
+        path_idx.append(int(pred[path_idx[-1]]))
+    return [nodes[k] for k in reversed(path_idx)]
+
+
+def _node_paths_from(G: Any, src: Any, dsts: List[Any], weight: str = "length") -> dict:
+    """
+    {dst: node path src -> dst} for every reachable dst, from ONE single-source search.
+
+    CSR Dijkstra (one predecessor array), else rustworkx without a target, else networkx
+    single_source_dijkstra. Unreachable targets are left out. Raises KeyError for unknown nodes.
+    """
+    bundle = build_csr(G, weight)
+    if bundle is not None:
+        i = bundle["index"][src]
+        cols = {d: bundle["index"][d] for d in dsts}
+        dist, pred = csgraph_dijkstra(bundle["csr"], directed=bundle["directed"], indices=i, return_predecessors=True)
+        return {d: _pred_walk(bundle["nodes"], pred, i, j) for d, j in cols.items() if np.isfinite(dist[j])}
+    bundle = build_rx(G, weight)
+    if bundle is not None:
+        i = bundle["index"][src]
+        cols = {d: bundle["index"][d] for d in dsts}
+        paths = rustworkx.dijkstra_shortest_paths(bundle["rx"], i, weight_fn=float)
+        nodes = bundle["nodes"]
+        return {d: ([src] if j == i else [nodes[k] for k in paths[j]]) for d, j in cols.items() if j == i or j in paths}
+    if src not in G:
+        raise KeyError(src)
+    _, paths = nx.single_source_dijkstra(G, src, weight=weight)
+    return {d: paths[d] for d in dsts if d in paths}
+
+
+def build_rx(G: Any, weight: str = "length") -> Optional[dict]:
+    """
+    Build (once per graph and weight) a rustworkx mirror of G and cache it in G.graph.
+
+    Edge payloads are the weights (missing = 1, networkx semantics); parallel edges are kept and
+    Dijkstra takes the lightest. Tagged and copy-safe like build_csr. None without rustworkx.
+    """
+    if rustworkx is None or nx is None or not isinstance(G, nx.Graph):
+        return None
+    tag = (id(G), G.number_of_edges(), weight)
+    cached = G.graph.get("_rx", {}).get(weight)
+    if cached is not None and cached["tag"] == tag:
+        return cached
+    rx = rustworkx.PyDiGraph(multigraph=True) if G.is_directed() else rustworkx.PyGraph(multigraph=True)
+    nodes = list(G.nodes)
+    index = dict(zip(nodes, rx.add_nodes_from(nodes)))
+    rx.add_edges_from([(index[u], index[v], float(w)) for u, v, w in G.edges(data=weight, default=1.0)])
+    bundle = {"tag": tag, "rx": rx, "nodes": nodes, "index": index}
+    G.graph["_rx"] = {**G.graph.get("_rx", {}), weight: bundle}
+    return bundle
+
+
+def _rx_shortest_path(G: Any, src: Any, dst: Any, weight: str = "length") -> Optional[List[Any]]:
+    """Node path src -> dst via rustworkx Dijkstra on the cached mirror; None if rustworkx is unavailable."""
+    bundle = build_rx(G, weight)
+    if bundle is None:
+        return None
+    i, j = bundle["index"][src], bundle["index"][dst]
+    if i == j:
+        return [src]
+    paths = rustworkx.dijkstra_shortest_paths(bundle["rx"], i, target=j, weight_fn=float)
+    if j not in paths:
+        raise nx.NetworkXNoPath(f"No path between {src} and {dst}.")
+    nodes = bundle["nodes"]
+    return [nodes[k] for k in paths[j]]
+
+
+def _path_length(G: Any, path: List[Any], weight: str = "length") -> float:
+    """Total weight along a node path (lightest parallel edge on multigraphs)."""
+    adj = G.adj
+    if G.is_multigraph():
+        return float(sum(min(d.get(weight, 1.0) for d in adj[u][v].values()) for u, v in zip(path[:-1], path[1:])))
+    return float(sum(adj[u][v].get(weight, 1.0) for u, v in zip(path[:-1], path[1:])))
+
+
+def _csr_shortest_path(G: Any, src: Any, dst: Any, weight: str = "length") -> Optional[List[Any]]:
+    """Node path src -> dst via SciPy Dijkstra on the cached CSR, else rustworkx; None if neither is available."""
+    found = _csr_dijkstra(G, src, dst, weight)
+    if found is not None:
+        return found[0]
+    return _rx_shortest_path(G, src, dst, weight)
+
+
+def shortest_path_with_length(G: Any, src: Any, dst: Any, weight: str = "length") -> Tuple[List[Any], float]:
+    """
+    Node path src -> dst and its total weight.
+
+    Uses the CSR Dijkstra when available, whose distance array already holds the path length;
+    otherwise rustworkx or networkx plus one sum over the path's edges.
+    Raises NetworkXNoPath / NodeNotFound.
+    """
+    try:
+        found = _csr_dijkstra(G, src, dst, weight)
+        path = _rx_shortest_path(G, src, dst, weight) if found is None else None
+    except KeyError:
+        raise nx.NodeNotFound(f"Node {src} or {dst} not in graph.")
+    if found is not None:
+        return found
+    if path is None:
+        path = nx.shortest_path(G, src, dst, weight=weight)
+    return path, _path_length(G, path, weight)
+
+
+def _unit_xyz(lat, lon):
+    """(..., 3) unit-sphere vectors for (lat, lon) degrees; chord length orders points like haversine."""
+    phi = np.radians(lat)
+    lam = np.radians(lon)
+    cos_phi = np.cos(phi)
+    return np.stack([cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)], axis=-1)
+
+
+def build_node_index(G: Any) -> Optional[dict]:
+    """
+    Build (once per graph) a KD-tree over node positions and cache it in G.graph.
+
+    Nodes sit on the unit sphere, where the nearest chord is the nearest great-circle neighbour,
+    so queries match the haversine scan. Tagged like build_csr: a graph whose node count changes,
+    or a copy with a new id(), is re-indexed. Returns None without SciPy or for non-graphs.
+    """
+    if cKDTree is None or nx is None or not isinstance(G, nx.Graph):
+        return None
+    tag = (id(G), G.number_of_nodes())
+    cached = G.graph.get("_node_index")
+    if cached is not None and cached["tag"] == tag:
+        return cached
+    soa = node_arrays(G)
+    keep = np.flatnonzero(np.isfinite(soa["lat"]) & np.isfinite(soa["lon"]))  # unreadable nodes: never nearest
+    nodes = [soa["nodes"][k] for k in keep]
+    tree = cKDTree(_unit_xyz(soa["lat"][keep], soa["lon"][keep])) if nodes else None
+    bundle = {"tag": tag, "tree": tree, "nodes": nodes}
+    G.graph["_node_index"] = bundle
+    return bundle
+
+
 def _nearest_node_in_graph(G: Any, coord: Tuple[float, float]):
     """
     Return a node id nearest to coord for networkx graphs; for dict fallback return coord.
     """
     try:
+        index = build_node_index(G)
+        if index is not None:
+            if index["tree"] is None:
+                return coord
+            _, k = index["tree"].query(_unit_xyz(float(coord[0]), float(coord[1])), k=1)
+            return index["nodes"][int(k)]
+        soa = node_arrays(G)
+        if soa is not None:
+            if not soa["nodes"]:
+                return coord
+            d = _haversine_km_vec(coord[0], coord[1], soa["lat"], soa["lon"])
+            if np.isnan(d).all():
+                return coord
+            return soa["nodes"][int(np.nanargmin(d))]
         if nx is not None and isinstance(G, nx.Graph):
             best = None
             best_d = float("inf")
             for n in G.nodes:
                 try:
-                    if isinstance(n, tuple) and len(n) == 2 and isinstance(n[0], (int, float)):
-                        node_coord = (float(n[0]), float(n[1]))
-                    else:
-                        node_coord = (float(G.nodes[n].get("y", 0.0)), float(G.nodes[n].get("x", 0.0)))
-                    d = _haversine_km(coord, node_coord)
+                    d = _haversine_km(coord, _node_latlon(G, n))
                     if d < best_d:
                         best_d = d
                         best = n
@@ -276,6 +829,16 @@ def _nearest_node_in_graph(G: Any, coord: Tuple[float, float]):
     return coord
 
 
+def _isolated_end(G: Any, src: Any, dst: Any) -> bool:
+    """True when src has no way out or dst no way in (in/out degree on directed graphs)."""
+    try:
+        if G.is_directed():
+            return G.out_degree(src) == 0 or G.in_degree(dst) == 0
+        return G.degree(src) == 0 or G.degree(dst) == 0
+    except Exception:
+        return False
+
+
 def compute_shortest_path(G: Any, origin: Tuple[float, float], target: Tuple[float, float], weight: str = "length") -> List[Tuple[float, float]]:
     """
     Compute shortest path. Returns list of (lat, lon) tuples.
@@ -288,18 +851,19 @@ def compute_shortest_path(G: Any, origin: Tuple[float, float], target: Tuple[flo
         if nx is not None and isinstance(G, nx.Graph):
             src = _nearest_node_in_graph(G, origin)
             dst = _nearest_node_in_graph(G, target)
+            if src == dst and src in G:
+                return [_node_latlon(G, src)]
+            if _isolated_end(G, src, dst):
+                # e.g. every edge at the target blocked by hazards: no search can succeed
+                return grid_route_fallback(origin, target)
             try:
-                path = nx.shortest_path(G, source=src, target=dst, weight=weight)
+                path = _csr_shortest_path(G, src, dst, weight=weight)
+                if path is None:
+                    # Pure-Python search: A* with the scaled haversine bound expands far fewer nodes than Dijkstra
+                    path = nx.astar_path(G, src, dst, heuristic=_astar_heuristic(G, dst, weight), weight=weight)
             except Exception:
                 path = nx.shortest_path(G, source=src, target=dst)
-            coords: List[Tuple[float, float]] = []
-            for node in path:
-                if isinstance(node, tuple) and len(node) == 2:
-                    coords.append((float(node[0]), float(node[1])))
-                else:
-                    lat = float(G.nodes[node].get("y", origin[0]))
-                    lon = float(G.nodes[node].get("x", origin[1]))
-                    coords.append((lat, lon))
+            coords: List[Tuple[float, float]] = _path_coords(G, path)
             return coords if coords else grid_route_fallback(origin, target)
         # dict fallback
         return grid_route_fallback(origin, target)
@@ -308,6 +872,31 @@ def compute_shortest_path(G: Any, origin: Tuple[float, float], target: Tuple[flo
         return grid_route_fallback(origin, target)
 
 
+def compute_shortest_paths_from(G: Any, origin: Tuple[float, float], targets: List[Tuple[float, float]],
+                                weight: str = "length") -> dict:
+    """
+    Shortest paths from one origin to many targets (e.g. an incident to every shelter).
+
+    Returns {target: list of (lat, lon)}. All targets share a single single-source search instead
+    of one search each; an unreachable target, or any failure, gets the straight-line fallback.
+    """
+    targets = [tuple(t) for t in targets]
+    try:
+        if G is None or nx is None or not isinstance(G, nx.Graph) or len(targets) < 2:
+            return {t: compute_shortest_path(G, origin, t, weight=weight) for t in targets}
+        src = _nearest_node_in_graph(G, origin)
+        dst_of = {t: _nearest_node_in_graph(G, t) for t in targets}
+        paths = _node_paths_from(G, src, list(set(dst_of.values())), weight=weight)
+        out = {}
+        for t, d in dst_of.items():
+            coords = _path_coords(G, paths.get(d, []))
+            out[t] = coords if coords else grid_route_fallback(origin, t)
+        return out
+    except Exception as e:
+        logger.warning("compute_shortest_paths_from error: %s", e)
+        return {t: grid_route_fallback(origin, t) for t in targets}
+
+
 def compute_fastest_path(G: Any, origin: Tuple[float, float], target: Tuple[float, float]) -> List[Tuple[float, float]]:
     """
     For demo, same as shortest path. Could be extended to use travel time weights.
@@ -332,6 +921,114 @@ def compute_safest_path(G: Any, origin: Tuple[float, float], target: Tuple[float
         return grid_route_fallback(origin, target)
 
 
+def build_hazard_tree(hazards: Any) -> Optional[Any]:
+    """
+    STRtree over hazard geometries (any input _iter_hazard_geoms accepts); None if empty/unavailable.
+    Goes through data_loader.get_hazard_index, so each distinct geometry set is indexed once.
+    """
+    if STRtree is None:
+        return None
+    geoms = [g for g in _iter_hazard_geoms(hazards) if BaseGeometry is not None and isinstance(g, BaseGeometry) and not g.is_empty]
+    if not geoms:
+        return None
+    tree = data_loader.get_hazard_index(geoms) if data_loader is not None else None
+    return tree if tree is not None else STRtree(geoms)
+
+
+def _heuristic_scale(G: Any, weight: str = "length") -> float:
+    """
+    Largest r with weight(u, v) >= r * haversine_km(u, v) on every edge (cached per graph).
+
+    r * haversine_km(n, target) is then an admissible, consistent A* heuristic whatever unit the
+    weights use (OSMnx stores meters, build_grid_graph stores kilometers).
+    """
+    tag = (id(G), G.number_of_edges(), weight)
+    cached = G.graph.get("_h_scale", {}).get(weight)
+    if cached is not None and cached[0] == tag:
+        return cached[1]
+    scale = float("inf")
+    if np is not None:
+        triples = list(G.edges(data=weight, default=1.0))
+        if triples:
+            d = _edge_lengths_km(G, [(u, v) for u, v, _ in triples])
+            w = np.array([t[2] for t in triples], dtype=np.float64)
+            pos = d > 0
+            if pos.any():
+                scale = float(np.min(w[pos] / d[pos]))
+    else:
+        for u, v, w in G.edges(data=weight, default=1.0):
+            d = _haversine_km(_node_latlon(G, u), _node_latlon(G, v))
+            if d > 0:
+                scale = min(scale, float(w) / d)
+    scale = 0.0 if not math.isfinite(scale) else max(scale, 0.0)
+    G.graph["_h_scale"] = {**G.graph.get("_h_scale", {}), weight: (tag, scale)}
+    return scale
+
+
+def _astar_heuristic(G: Any, dst: Any, weight: str = "length"):
+    """
+    Admissible A* heuristic towards dst: _heuristic_scale(G) * haversine_km(n, dst).
+
+    With NumPy the bound for every node is computed in one pass over node_arrays(G), so each
+    call is a dict lookup plus an array read; otherwise it is evaluated per node.
+    """
+    scale = _heuristic_scale(G, weight)
+    dst_lat, dst_lon = _node_latlon(G, dst)
+    soa = node_arrays(G)
+    if soa is not None:
+        h = np.nan_to_num(scale * _haversine_km_vec(dst_lat, dst_lon, soa["lat"], soa["lon"]), nan=0.0).tolist()
+        index = soa["index"]
+        return lambda n, _dst: h[index[n]]
+    dst_coord = (dst_lat, dst_lon)
+    return lambda n, _dst: scale * _haversine_km(_node_latlon(G, n), dst_coord)
+
+
+def compute_safest_path_astar(G: Any, origin: Tuple[float, float], target: Tuple[float, float],
+                              hazard_tree: Any = None, hazard_penalty: Optional[float] = None,
+                              weight: str = "length") -> List[Tuple[float, float]]:
+    """
+    Safest path via A* on the unmodified graph, testing hazards only on edges the search relaxes.
+
+    - hazard_tree: STRtree from build_hazard_tree (None = plain A* shortest path).
+    - hazard_penalty: None blocks edges whose midpoint lies in a hazard (same rule as
+      block_edges_by_hazards); a number multiplies their weight instead.
+    Returns list of (lat, lon) tuples; falls back to grid_route_fallback on error.
+    """
+    try:
+        if nx is None or not isinstance(G, nx.Graph):
+            return grid_route_fallback(origin, target)
+        src = _nearest_node_in_graph(G, origin)
+        dst = _nearest_node_in_graph(G, target)
+        heuristic = _astar_heuristic(G, dst, weight)
+        in_hazard = {}
+
+        def edge_cost(u, v, data):
+            if G.is_multigraph():
+                data = min(data.values(), key=lambda d: d.get(weight, 1.0))
+            w = data.get(weight, 1.0)
+            if hazard_tree is None:
+                return w
+            key = (u, v)
+            if key not in in_hazard:
+                geom = data.get("geometry")
+                if geom is not None and hasattr(geom, "centroid"):
+                    mid = geom.centroid
+                else:
+                    (u_lat, u_lon), (v_lat, v_lon) = _node_latlon(G, u), _node_latlon(G, v)
+                    mid = Point((u_lon + v_lon) / 2.0, (u_lat + v_lat) / 2.0)
+                in_hazard[key] = len(hazard_tree.query(mid, predicate="within")) > 0
+            if in_hazard[key]:
+                return None if hazard_penalty is None else w * hazard_penalty
+            return w
+
+        path = nx.astar_path(G, src, dst, heuristic=heuristic, weight=edge_cost)
+        coords = _path_coords(G, path)
+        return coords if coords else grid_route_fallback(origin, target)
+    except Exception as e:
+        logger.warning("compute_safest_path_astar error: %s", e)
+        return grid_route_fallback(origin, target)
+
+
 def grid_route_fallback(origin: Tuple[float, float], target: Tuple[float, float], steps: int = 30) -> List[Tuple[float, float]]:
     """Simple straight-line interpolation fallback route between origin and target."""
     try:
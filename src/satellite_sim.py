@@ -1,21 +1,16 @@
 """
 Satellite simulator that stages uplink events for offline alerting.
 Supports success and failure modes.
+
+send_async() waits with asyncio.sleep, so many simulated uplinks can run
+concurrently (see send_many); send() is the blocking wrapper around it.
 """
+import asyncio
 import time
 from datetime import datetime, timedelta
 import random
 
-def send(payload, delay_seconds=1.0, fail=False):
-    """
-    Simulate satellite uplink with staged events.
-    Returns list of events with UTC timestamps and payload.
-    
-    Args:
-        payload (dict/str): Data to uplink
-        delay_seconds (float): Base delay multiplier
-        fail (bool): If True, simulate a failure instead of success
-    """
+def _stages(delay_seconds, fail):
     stages_success = [
         ("queued", "Queued for uplink", delay_seconds * 0.2),
         ("uplink", "Uplink in progress", delay_seconds * 0.5),
@@ -28,18 +23,69 @@ def send(payload, delay_seconds=1.0, fail=False):
         ("failed", "Transmission error — uplink dropped", delay_seconds * 0.3),
     ]
     
-    stages = stages_failure if fail else stages_success
+    return stages_failure if fail else stages_success
+
+def _event(now, i, status, note, payload):
+    return {
+        "time": (now + timedelta(seconds=i)).isoformat(),
+        "status": status,
+        "note": note,
+        "payload": payload
+    }
+
+async def send_async(payload, delay_seconds=1.0, fail=False):
+    """
+    Coroutine version of send(); awaits each stage delay instead of blocking.
+    Same arguments and return value as send().
+    """
+    events = []
+    now = datetime.utcnow()
+    for i, (status, note, delay) in enumerate(_stages(delay_seconds, fail)):
+        await asyncio.sleep(delay)
+        events.append(_event(now, i, status, note, payload))
+    return events
+
+async def _gather(payloads, delay_seconds, fail):
+    return await asyncio.gather(*(send_async(p, delay_seconds, fail) for p in payloads))
+
+def _loop_running():
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+def send_many(payloads, delay_seconds=1.0, fail=False):
+    """
+    Simulate one uplink per payload concurrently.
+    Returns a list of event lists in payload order; total wait is one uplink, not one per payload.
+    """
+    payloads = list(payloads)
+    if not payloads:
+        return []
+    if _loop_running():
+        # Already inside a running event loop: fall back to sequential blocking sends
+        return [send(p, delay_seconds, fail) for p in payloads]
+    return list(asyncio.run(_gather(payloads, delay_seconds, fail)))
+
+def send(payload, delay_seconds=1.0, fail=False):
+    """
+    Simulate satellite uplink with staged events.
+    Returns list of events with UTC timestamps and payload.
     
+    Args:
+        payload (dict/str): Data to uplink
+        delay_seconds (float): Base delay multiplier
+        fail (bool): If True, simulate a failure instead of success
+    """
+    if not _loop_running():
+        return asyncio.run(send_async(payload, delay_seconds, fail))
+    # Called from inside a running event loop (await send_async there instead)
     events = []
     now = datetime.utcnow()
-    for i, (status, note, delay) in enumerate(stages):
+    for i, (status, note, delay) in enumerate(_stages(delay_seconds, fail)):
         time.sleep(delay)
-        events.append({
-            "time": (now + timedelta(seconds=i)).isoformat(),
-            "status": status,
-            "note": note,
-            "payload": payload
-        })
+        events.append(_event(now, i, status, note, payload))
     return events
 
 # Example usage:
@@ -47,3 +93,5 @@ def send(payload, delay_seconds=1.0, fail=False):
 # events = send({"msg":"alert"}, delay_seconds=1.0)
 # Failure path
 # events = send({"msg":"alert"}, delay_seconds=1.0, fail=True)
+# Several uplinks at once
+# batches = send_many([{"msg":"a"}, {"msg":"b"}], delay_seconds=1.0)
@@ -0,0 +1,54 @@
+"""
+Threshold config helpers shared by risk_crowd and risk_disaster.
+- freeze: read-only (MappingProxyType) views of nested dicts, safe to hand to every caller.
+- config_path / read_config: a .json next to the YAML config is preferred when present;
+  YAML goes through LibYAML's C parser when PyYAML was built with it.
+- load_thresholds: parsed configs cached per (path, mtime), so editing the file triggers a reparse.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+
+import yaml
+
+# LibYAML's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except Exception:
+    from yaml import SafeLoader as _SafeLoader
+
+def freeze(obj):
+    # Thresholds are shared by every caller: hand out read-only views
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    return obj
+
+def config_path(yaml_path):
+    # Optional JSON sibling (e.g. configs/thresholds.json) wins over the YAML
+    yaml_path = Path(yaml_path)
+    json_path = yaml_path.with_suffix(".json")
+    return json_path if json_path.exists() else yaml_path
+
+def read_config(path):
+    path = str(path)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f) if path.endswith(".json") else yaml.load(f, Loader=_SafeLoader)
+
+@lru_cache(maxsize=4)
+def _parse_thresholds(path, mtime):
+    # mtime only keys the cache: editing the file triggers a reparse
+    return freeze(read_config(path))
+
+def load_thresholds(yaml_path, defaults):
+    """
+    Read-only thresholds from yaml_path (or its .json sibling); defaults when neither exists.
+    Parse errors propagate.
+    """
+    path = config_path(yaml_path)
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return defaults
+    return _parse_thresholds(str(path), mtime)
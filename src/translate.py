@@ -5,15 +5,27 @@ Uses googletrans for demo purposes.
 Some versions of googletrans expose `Translator.translate` as an async
 coroutine; others are synchronous. This wrapper handles both so that
 callers can treat it as a simple blocking function.
+
+Successful translations are memoized per (text, dest) in-process and in a
+small SQLite table (data/cache/translate_cache.sqlite), so repeated alert
+strings skip the round-trip, across restarts too. Failures are never cached.
 """
 
 import asyncio
 import inspect
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
 
 from googletrans import Translator
 
 translator = Translator()
 
+CACHE_DB = Path("data/cache/translate_cache.sqlite")
+_DB = None
+_DB_LOCK = threading.Lock()
+
 
 def _ensure_result(result):
     """Resolve coroutine results if needed and return the final object."""
@@ -28,16 +40,90 @@ def _ensure_result(result):
     return result
 
 
+def _db():
+    """Shared connection to the on-disk cache (created on first use); None if it can't be opened."""
+    global _DB
+    if _DB is None:
+        try:
+            CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(CACHE_DB), check_same_thread=False)
+            conn.execute("CREATE TABLE IF NOT EXISTS tx (text TEXT, dest TEXT, out TEXT, PRIMARY KEY (text, dest))")
+            conn.commit()
+            _DB = conn
+        except Exception as e:
+            print("Translation cache unavailable:", e)
+            _DB = False
+    return _DB or None
+
+
+def _disk_get(text, dest):
+    conn = _db()
+    if conn is None:
+        return None
+    try:
+        with _DB_LOCK:
+            row = conn.execute("SELECT out FROM tx WHERE text = ? AND dest = ?", (text, dest)).fetchone()
+        return row[0] if row else None
+    except Exception:
+        return None
+
+
+def _disk_put(text, dest, out):
+    conn = _db()
+    if conn is None:
+        return
+    try:
+        with _DB_LOCK:
+            conn.execute("INSERT OR REPLACE INTO tx (text, dest, out) VALUES (?, ?, ?)", (text, dest, out))
+            conn.commit()
+    except Exception:
+        pass
+
+
+@lru_cache(maxsize=4096)
+def _translate_cached(text, dest):
+    """Translated text; raises on failure so neither cache keeps a fallback."""
+    out = _disk_get(text, dest)
+    if out is not None:
+        return out
+    raw = translator.translate(text, dest=dest)
+    result = _ensure_result(raw)
+    out = getattr(result, "text", None)
+    if not isinstance(out, str):
+        # Some implementations may return the original text directly
+        raise ValueError("no translated text in response")
+    _disk_put(text, dest, out)
+    return out
+
+
 def translate(text, dest="en"):
     """
     Translate text into the target language.
     Returns translated string, or original text if translation fails.
     """
     try:
-        raw = translator.translate(text, dest=dest)
-        result = _ensure_result(raw)
-        # Some implementations may return the original text directly
-        return getattr(result, "text", text if isinstance(result, str) else text)
+        return _translate_cached(text, dest)
     except Exception as e:
         print("Translation error:", e)
         return text
+
+
+# Marker placed between strings in a batched request; kept as-is by the translation service
+BATCH_SEP = "\n⟨∥⟩\n"
+_BATCH_MARK = BATCH_SEP.strip()
+
+
+def translate_many(texts, dest="en"):
+    """
+    Translate several strings with a single request (joined by BATCH_SEP, split back after).
+    Falls back to one request per string if the marker doesn't survive translation.
+    Raises on failure (unlike translate()), so callers never mistake the English input for a result.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    joined = _translate_cached(BATCH_SEP.join(texts), dest)
+    parts = [p.strip() for p in joined.split(_BATCH_MARK)]
+    if len(parts) == len(texts):
+        return parts
+    return [_translate_cached(t, dest) for t in texts]
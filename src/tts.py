@@ -6,10 +6,10 @@ Offline-first TTS helper: pyttsx3 primary, gTTS secondary, caching and text fall
 from pathlib import Path
 import hashlib
 import logging
+import threading
 import time
-import tempfile
-import shutil
 import os
+import tempfile
 
 try:
     import pyttsx3
@@ -21,6 +21,11 @@ try:
 except Exception:
     gTTS = None
 
+try:
+    from blake3 import blake3
+except Exception:
+    blake3 = None
+
 ALERTS_DIR = Path("data/alerts")
 ALERTS_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -33,41 +38,81 @@ if not logger.handlers:
 
 
 def _hash_text_lang(text: str, lang: str) -> str:
-    h = hashlib.sha256()
-    h.update(text.encode("utf-8"))
-    h.update(b"||")
-    h.update(lang.encode("utf-8"))
-    return h.hexdigest()[:16]
+    # One encode of the joined key: same bytes as hashing text, "||" and lang in turn
+    key = f"{text}||{lang}".encode("utf-8")
+    if blake3 is not None:
+        return blake3(key).hexdigest(length=8)
+    return hashlib.sha256(key).hexdigest()[:16]
 
 
 def _safe_mp3_path(hash_key: str, lang: str) -> Path:
     return ALERTS_DIR / f"tts_{lang}_{hash_key}.mp3"
 
 
+# One pyttsx3 engine for the process: init() sets up the platform driver (SAPI/NSSS/eSpeak), which
+# is slow, and engines are not thread-safe, so every use holds _ENGINE_LOCK
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+_DEFAULT_VOICE = None
+_VOICE_BY_LANG: dict = {}
+
+
+def _get_engine():
+    """The shared pyttsx3 engine, created on first use. Call with _ENGINE_LOCK held."""
+    global _ENGINE, _DEFAULT_VOICE
+    if _ENGINE is None:
+        _ENGINE = pyttsx3.init()
+        try:
+            _DEFAULT_VOICE = _ENGINE.getProperty("voice")
+        except Exception:
+            _DEFAULT_VOICE = None
+    return _ENGINE
+
+
+def _select_voice(engine, lang: str):
+    """Voice id matching lang (looked up once per language), or None to keep the current voice."""
+    if lang in _VOICE_BY_LANG:
+        return _VOICE_BY_LANG[lang]
+    selected = None
+    try:
+        voices = engine.getProperty("voices")
+        for v in voices:
+            try:
+                if hasattr(v, "languages") and v.languages and any(str(lang).lower() in str(l).lower() for l in v.languages):
+                    selected = v.id
+                    break
+            except Exception:
+                pass
+            if lang.lower() in str(getattr(v, "name", "")).lower() or lang.lower() in str(getattr(v, "id", "")).lower():
+                selected = v.id
+                break
+    except Exception:
+        pass
+    _VOICE_BY_LANG[lang] = selected
+    return selected
+
+
 def _try_pyttsx3(text: str, lang: str, out_path: Path) -> bool:
+    global _ENGINE
     if pyttsx3 is None:
         return False
     try:
-        engine = pyttsx3.init()
-        try:
-            voices = engine.getProperty("voices")
-            selected = None
-            for v in voices:
-                try:
-                    if hasattr(v, "languages") and v.languages and any(str(lang).lower() in str(l).lower() for l in v.languages):
-                        selected = v.id
-                        break
-                except Exception:
-                    pass
-                if lang.lower() in str(getattr(v, "name", "")).lower() or lang.lower() in str(getattr(v, "id", "")).lower():
-                    selected = v.id
-                    break
-            if selected:
-                engine.setProperty("voice", selected)
-        except Exception:
-            pass
-        engine.save_to_file(text, str(out_path))
-        engine.runAndWait()
+        with _ENGINE_LOCK:
+            engine = _get_engine()
+            try:
+                # Reset per call: the shared engine keeps whatever voice the last language chose
+                selected = _select_voice(engine, lang) or _DEFAULT_VOICE
+                if selected:
+                    engine.setProperty("voice", selected)
+            except Exception:
+                pass
+            try:
+                engine.save_to_file(text, str(out_path))
+                engine.runAndWait()
+            except Exception:
+                # Don't keep a broken driver around; the next call starts a fresh engine
+                _ENGINE = None
+                raise
         if out_path.exists() and out_path.stat().st_size > 0:
             logger.info("pyttsx3 generated audio: %s", out_path)
             return True
@@ -86,32 +131,16 @@ def _try_gtts(text: str, lang: str, out_path: Path, max_retries: int = 3, base_d
         try:
             attempt += 1
             logger.info("gTTS attempt %d/%d for lang=%s", attempt, max_retries, lang)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tf:
-                temp_path = Path(tf.name)
+            # Unique sibling .part file: the rename below stays on one drive and is atomic, and
+            # concurrent generate_tts calls for the same text never share a temp file.
+            # Closed before gTTS reopens it by name (Windows cannot open it twice)
+            with tempfile.NamedTemporaryFile(dir=out_path.parent, prefix=out_path.name + ".", suffix=".part",
+                                             delete=False) as tmp:
+                temp_path = Path(tmp.name)
             try:
                 tts = gTTS(text=text, lang=lang)
                 tts.save(str(temp_path))
-                
-                # Handle cross-drive moves on Windows (use copy + delete instead of replace)
-                try:
-                    # Try direct replace first (works on same drive)
-                    temp_path.replace(out_path)
-                except (OSError, PermissionError) as move_error:
-                    # Check if it's a cross-drive error (Windows error 17)
-                    if hasattr(move_error, 'winerror') and move_error.winerror == 17:
-                        # Cross-drive move: use copy + delete
-                        logger.info("Cross-drive move detected, using copy+delete")
-                        shutil.copy2(temp_path, out_path)
-                        temp_path.unlink()
-                    else:
-                        # Different error, try copy anyway
-                        logger.info("Move failed, trying copy+delete")
-                        shutil.copy2(temp_path, out_path)
-                        try:
-                            temp_path.unlink()
-                        except Exception:
-                            pass
-                
+                os.replace(temp_path, out_path)
                 logger.info("gTTS succeeded, wrote %s", out_path)
                 return True
             except Exception as e:
@@ -2,14 +2,41 @@
 """
 Map UX helpers for CrowdShield.
 
-- Robust folium rendering via streamlit-folium when available, otherwise HTML fallback.
+- Read-only maps are embedded as static HTML (no Streamlit round-trip per pan/zoom);
+  interactive maps (read_only=False) use streamlit-folium when available.
 - Tolerant GeoJSON/geometry handling and defensive route/marker drawing.
+- Shelter/report markers go into one FeatureGroup per call: a single GeoJSON point layer with
+  tooltip/popup read from feature properties (FastMarkerCluster for large sets).
+- create_base_map() adds only the requested base tiles (OpenStreetMap by default); folium.plugins
+  is imported on first use and the console log handler is attached on first map call.
+- prerender() turns a map into its HTML document once; render_map() can take that string
+  (pre_rendered=True) or cache renders under a caller-supplied key, so reruns skip folium.
 """
 
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import repeat
 from typing import Any, Iterable, List, Optional, Tuple
 import logging
+import math
+import threading
 
 import folium
+import numpy as np
+import pandas as pd
+
+# Optional dependency: Shapely 2 array functions for bulk GeoJSON conversion
+try:
+    import shapely
+    if not hasattr(shapely, "get_rings"):
+        shapely = None
+except Exception:
+    shapely = None
+
+try:
+    from . import geo  # Numba-compiled route kernels (plain NumPy without Numba)
+except Exception:
+    geo = None
 
 # Try to import streamlit-folium; fall back to streamlit.components.v1.html
 try:
@@ -17,37 +44,144 @@ try:
     ST_FOLIUM_AVAILABLE = True
 except Exception:
     ST_FOLIUM_AVAILABLE = False
-    try:
-        from streamlit.components.v1 import html as st_html  # type: ignore
-    except Exception:
-        st_html = None  # final fallback; render_map will handle absence
+
+# Plain HTML embedding: the fallback renderer, and the only one that can show pre-rendered HTML
+try:
+    from streamlit.components.v1 import html as st_html  # type: ignore
+except Exception:
+    st_html = None  # final fallback; render_map will handle absence
+
+# Rendered HTML per render_map(cache_key=...), least recently used evicted first
+RENDER_CACHE_MAX = 16
+_RENDER_CACHE: "OrderedDict[Any, str]" = OrderedDict()
+_RENDER_LOCK = threading.Lock()
 
 logger = logging.getLogger("crowdshield.ux")
 if not logger.handlers:
-    h = logging.StreamHandler()
-    h.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
-    logger.addHandler(h)
+    # Library default; re-imports (Streamlit reloads) find it and add nothing
+    logger.addHandler(logging.NullHandler())
 logger.setLevel(logging.INFO)
 
 
-def create_base_map(center_point: Tuple[float, float] = (9.931233, 76.267304), zoom_start: int = 12) -> folium.Map:
+def _ensure_logger() -> None:
+    """Attach the console handler on first use, unless the app configured one here or on the root logger."""
+    configured = any(not isinstance(h, logging.NullHandler) for h in logger.handlers)
+    if not configured and not logging.getLogger().handlers:
+        h = logging.StreamHandler()
+        h.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(h)
+
+
+@lru_cache(maxsize=None)
+def _fast_marker_cluster():
+    """folium.plugins.FastMarkerCluster, imported on first large point set (folium.plugins is slow to import); None if unavailable."""
+    try:
+        from folium.plugins import FastMarkerCluster
+        return FastMarkerCluster
+    except Exception:
+        return None
+
+
+# Hazard fill colour per risk level (unknown levels draw red)
+RISK_COLOR_MAP = {"low": "yellow", "medium": "orange", "high": "red", "critical": "darkred"}
+
+
+def _risk_hazard_style(feat):
+    """Style for one feature of the hazard FeatureCollection; its colour is a feature property."""
+    c = feat["properties"]["color"]
+    return {"fillColor": c, "color": c, "weight": 2, "fillOpacity": 0.3}
+
+
+def _plain_hazard_style(feat):
+    return {"fillColor": "#ff6666", "color": "#ff0000", "weight": 2, "fillOpacity": 0.3}
+
+
+def _feature_collection(features: List[dict]) -> dict:
+    return {"type": "FeatureCollection", "features": features}
+
+
+# From this many shelter/report points on, markers are built client-side by FastMarkerCluster from
+# one JSON array of [lat, lon, tooltip, popup_html] rows instead of one folium object each
+POINTS_CLUSTER_MIN = 500
+_POINT_MARKER_JS = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+        {radius: %d, color: "%s", fill: true, fillColor: "%s"});
+    marker.bindTooltip(row[2]);
+    marker.bindPopup(row[3], {maxWidth: 250});
+    return marker;
+}
+"""
+
+
+def _point_layer(m: Any, name: str) -> Tuple[Any, bool]:
+    """(layer to add markers to, whether it is new): m itself if it is a FeatureGroup, else a fresh one."""
+    if isinstance(m, folium.FeatureGroup):
+        return m, False
+    return folium.FeatureGroup(name=name), True
+
+
+def _point_features(rows: List[list]) -> List[dict]:
+    """GeoJSON Point features for [lat, lon, tooltip, popup_html] rows; rows with non-finite coords are dropped."""
+    return [{"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]},
+             "properties": {"tooltip": tooltip, "popup": popup_html}}
+            for lat, lon, tooltip, popup_html in rows if math.isfinite(lat) and math.isfinite(lon)]
+
+
+def _add_point_markers(m: Any, rows: List[list], name: str, radius: int, color: str) -> None:
     """
-    Create a folium Map with a couple of base layers and controls.
+    Circle markers for [lat, lon, tooltip, popup_html] rows, grouped in one layer added to m once.
+    Below POINTS_CLUSTER_MIN rows they are one GeoJson FeatureCollection whose tooltip/popup come
+    from feature properties; from POINTS_CLUSTER_MIN on, a single FastMarkerCluster instead.
     """
+    if not rows:
+        return
+    layer, is_new = _point_layer(m, name)
+    cluster = _fast_marker_cluster() if len(rows) >= POINTS_CLUSTER_MIN else None
+    if cluster is not None:
+        cluster(rows, callback=_POINT_MARKER_JS % (radius, color, color)).add_to(layer)
+    else:
+        features = _point_features(rows)
+        if not features:
+            return
+        folium.GeoJson(
+            _feature_collection(features),
+            name=name,
+            marker=folium.CircleMarker(radius=radius, color=color, fill=True, fill_color=color),
+            tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+            popup=folium.GeoJsonPopup(fields=["popup"], labels=False, max_width=250),
+        ).add_to(layer)
+    if is_new:
+        layer.add_to(m)
+
+
+# Base tile layers create_base_map can add by name: (folium tiles name or URL, attribution)
+BASE_TILES = {
+    "OpenStreetMap": ("OpenStreetMap", "© OpenStreetMap contributors"),
+    "CartoDB Positron": ("CartoDB positron", None),
+    "Stamen Terrain": ("https://stamen-tiles.a.ssl.fastly.net/terrain/{z}/{x}/{y}.png",
+                       "Map tiles by Stamen Design, © OpenStreetMap contributors"),
+}
+
+
+def create_base_map(center_point: Tuple[float, float] = (9.931233, 76.267304), zoom_start: int = 12,
+                    tiles: Tuple[str, ...] = ("OpenStreetMap",), layer_control: Optional[bool] = None) -> folium.Map:
+    """
+    Create a folium Map with the requested base tile layers (BASE_TILES names; the first is shown).
+    layer_control: add a LayerControl; default only when there is more than one base layer to pick
+    from. Pass True when overlay groups will be added that users should be able to toggle.
+    """
+    _ensure_logger()
     try:
-        m = folium.Map(location=center_point, zoom_start=zoom_start, tiles="OpenStreetMap", attr="© OpenStreetMap contributors")
-        # Add a couple of optional tile layers (wrapped in try/except to be tolerant)
-        try:
-            folium.TileLayer(tiles="https://stamen-tiles.a.ssl.fastly.net/terrain/{z}/{x}/{y}.png",
-                             name="Stamen Terrain",
-                             attr="Map tiles by Stamen Design, © OpenStreetMap contributors").add_to(m)
-        except Exception:
-            logger.debug("Stamen Terrain tiles not available")
-        try:
-            folium.TileLayer("CartoDB positron", name="CartoDB Positron").add_to(m)
-        except Exception:
-            logger.debug("CartoDB Positron tiles not available")
-        folium.LayerControl().add_to(m)
+        m = folium.Map(location=center_point, zoom_start=zoom_start, tiles=None)
+        for name in tiles:
+            url, attr = BASE_TILES.get(name, (name, None))
+            try:
+                folium.TileLayer(tiles=url, name=name if name in BASE_TILES else None, attr=attr).add_to(m)
+            except Exception:
+                logger.debug("%s tiles not available", name)
+        if layer_control if layer_control is not None else len(tiles) > 1:
+            folium.LayerControl().add_to(m)
         return m
     except Exception as e:
         logger.warning("Map creation error: %s", e)
@@ -70,65 +204,141 @@ def _normalize_geom_for_geojson(geom: Any):
     return None
 
 
+def _is_empty(x: Any) -> bool:
+    """True for None or a sized input with no items (lists, dicts, DataFrames, arrays); unsized inputs are not empty."""
+    if x is None:
+        return True
+    try:
+        return len(x) == 0
+    except TypeError:
+        return False
+
+
+def _to_float(v: Any) -> Optional[float]:
+    """float(v), or None when v is not a number, so point loops skip bad values with a plain None check."""
+    try:
+        return float(v)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _column(df: Any, name: str, default: Any = None):
+    """df[name] as a NumPy array, or [default] * len(df) when the column is missing (like row.get)."""
+    if name in getattr(df, "columns", ()):
+        return df[name].to_numpy()
+    return [default] * len(df)
+
+
+def _normalize_geoms_for_geojson(items: Iterable[Any]) -> List[Any]:
+    """
+    _normalize_geom_for_geojson for many items at once, aligned with the input.
+
+    Plain 2-D shapely Polygons are converted in bulk: one get_rings/get_coordinates pass over all
+    of them, then list slices per ring, instead of a __geo_interface__ tuple build per geometry.
+    Everything else goes through _normalize_geom_for_geojson.
+    """
+    items = list(items)
+    out: List[Any] = [None] * len(items)
+    fast = []
+    if shapely is not None:
+        try:
+            cand = [i for i, g in enumerate(items) if isinstance(g, shapely.Geometry)]
+            arr = np.empty(len(cand), dtype=object)
+            arr[:] = [items[i] for i in cand]
+            keep = (shapely.get_type_id(arr) == 3) & ~shapely.is_empty(arr) & ~shapely.has_z(arr)  # 3 = Polygon
+            fast = [i for i, k in zip(cand, keep.tolist()) if k]
+            if fast:
+                polys = arr[keep]
+                rings, owner = shapely.get_rings(polys, return_index=True)
+                sizes = shapely.get_num_coordinates(rings).tolist()
+                xy = shapely.get_coordinates(rings)
+                # (x, y) tuples like __geo_interface__; also cheaper for the GC than one list per point
+                coords = list(zip(xy[:, 0].tolist(), xy[:, 1].tolist()))
+                per_poly: List[list] = [[] for _ in fast]
+                start = 0
+                for k, n in zip(owner.tolist(), sizes):
+                    per_poly[k].append(coords[start:start + n])
+                    start += n
+                for i, poly_rings in zip(fast, per_poly):
+                    out[i] = {"type": "Polygon", "coordinates": poly_rings}
+        except Exception:
+            fast = []
+    converted = set(fast)
+    for i, g in enumerate(items):
+        if i not in converted:
+            out[i] = _normalize_geom_for_geojson(g)
+    return out
+
+
 def add_hazards_to_map(m: folium.Map, hazards: Any, i18n: Optional[dict] = None) -> None:
     """
     Add hazard polygons or points to the folium map.
     Accepts GeoDataFrame, DataFrame with geometry, list of shapely geometries, or geojson-like dicts.
+
+    All drawable hazards go into ONE folium.GeoJson FeatureCollection layer; label, risk and
+    colour ride along as feature properties for the shared style, tooltip and popup.
     """
-    if m is None or hazards is None:
+    if m is None or _is_empty(hazards):
         return
+    # Loop-invariant: resolve the layer label and bound lookups once per call, not per row
+    default_label = i18n.get("hazard") if i18n else "Hazard"
     try:
-        # If it's a GeoDataFrame or DataFrame-like with iterrows
+        # If it's a GeoDataFrame or DataFrame-like: read each column once, then zip over the arrays
         if hasattr(hazards, "iterrows"):
-            for _, row in hazards.iterrows():
+            geoms = _column(hazards, "geometry")
+            geoobjs = _normalize_geoms_for_geojson(geoms)
+            features = []
+            add_feature = features.append
+            color_for = RISK_COLOR_MAP.get
+            for name, risk_level, geom, geoobj in zip(_column(hazards, "name"), _column(hazards, "risk", "high"),
+                                                       geoms, geoobjs):
+                label = default_label if name is None or name is pd.NA or not name else name
+                color = color_for(str(risk_level).lower(), "red")
+                tooltip = f"{label} ({risk_level})"
+                if geoobj is not None:
+                    add_feature({"type": "Feature", "geometry": geoobj, "properties": {
+                        "name": str(label), "risk": str(risk_level), "color": color,
+                        "tooltip": tooltip}})
+                    continue
+                # If geometry not geojson-able, try centroid marker (invalid geometries can raise here)
                 try:
-                    label = row.get("name") or (i18n.get("hazard") if i18n else "Hazard")
-                    risk_level = row.get("risk", "high")
-                    color_map = {"low": "yellow", "medium": "orange", "high": "red", "critical": "darkred"}
-                    color = color_map.get(str(risk_level).lower(), "red")
-                    geom = row.get("geometry", None)
-                    geoobj = _normalize_geom_for_geojson(geom)
-                    if geoobj is not None:
-                        folium.GeoJson(
-                            geoobj,
-                            name=label,
-                            style_function=lambda feat, c=color: {"fillColor": c, "color": c, "weight": 2, "fillOpacity": 0.3},
-                            tooltip=f"{label} ({risk_level})",
-                            popup=folium.Popup(f"<b>{label}</b><br>Risk: {risk_level}", max_width=250)
-                        ).add_to(m)
-                        continue
-                    # If geometry not geojson-able, try centroid marker
-                    try:
-                        # shapely geometry centroid fallback
-                        c = getattr(geom, "centroid", None)
-                        if c is not None and hasattr(c, "x") and hasattr(c, "y"):
-                            folium.CircleMarker(location=(c.y, c.x), radius=6, color=color, fill=True, fill_color=color, fill_opacity=0.4, tooltip=f"{label} ({risk_level})").add_to(m)
-                            continue
-                    except Exception:
-                        pass
+                    # shapely geometry centroid fallback
+                    c = getattr(geom, "centroid", None)
+                    if c is not None and hasattr(c, "x") and hasattr(c, "y"):
+                        folium.CircleMarker(location=(c.y, c.x), radius=6, color=color, fill=True, fill_color=color, fill_opacity=0.4, tooltip=tooltip).add_to(m)
                 except Exception:
                     continue
+            if features:
+                folium.GeoJson(
+                    _feature_collection(features),
+                    name=default_label,
+                    style_function=_risk_hazard_style,
+                    tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+                    popup=folium.GeoJsonPopup(fields=["name", "risk"], aliases=["", "Risk"], max_width=250),
+                ).add_to(m)
             return
         # If hazards is an iterable of geometries or geojson dicts
         if isinstance(hazards, (list, tuple, set)):
-            for item in hazards:
+            items = list(hazards)
+            features = []
+            for item, geoobj in zip(items, _normalize_geoms_for_geojson(items)):
+                if geoobj is not None:
+                    features.append({"type": "Feature", "geometry": geoobj, "properties": {}})
+                    continue
                 try:
-                    label = (i18n.get("hazard") if i18n else "Hazard")
-                    geoobj = _normalize_geom_for_geojson(item)
-                    if geoobj is not None:
-                        folium.GeoJson(geoobj, name=label, style_function=lambda feat: {"fillColor": "#ff6666", "color": "#ff0000", "weight": 2, "fillOpacity": 0.3}).add_to(m)
-                        continue
-                    # shapely geometry fallback
+                    # shapely geometry fallback (invalid geometries can raise here)
                     c = getattr(item, "centroid", None)
                     if c is not None and hasattr(c, "x") and hasattr(c, "y"):
                         folium.CircleMarker(location=(c.y, c.x), radius=6, color="#ff0000", fill=True, fill_color="#ff0000", fill_opacity=0.4).add_to(m)
                 except Exception:
                     continue
+            if features:
+                folium.GeoJson(_feature_collection(features), name=default_label, style_function=_plain_hazard_style).add_to(m)
             return
         # Unknown type: try to treat as single geometry
         geoobj = _normalize_geom_for_geojson(hazards)
         if geoobj is not None:
-            folium.GeoJson(geoobj, name=(i18n.get("hazard") if i18n else "Hazard")).add_to(m)
+            folium.GeoJson(geoobj, name=default_label).add_to(m)
     except Exception as e:
         logger.warning("add_hazards_to_map error: %s", e)
 
@@ -137,79 +347,158 @@ def add_shelters_to_map(m: folium.Map, shelters: Any, i18n: Optional[dict] = Non
     """
     Add shelter markers from a DataFrame with lat/lon or a list of tuples.
     """
-    if m is None or shelters is None:
+    if m is None or _is_empty(shelters):
         return
     try:
         if hasattr(shelters, "iterrows"):
-            for _, r in shelters.iterrows():
-                try:
-                    name = str(r.get("name", "Shelter"))
-                    capacity = r.get("capacity", "Unknown")
-                    lat = r.get("lat", r.get("latitude", None))
-                    lon = r.get("lon", r.get("longitude", None))
-                    if lat is None or lon is None:
-                        continue
-                    lat = float(lat); lon = float(lon)
-                    popup_text = f"<b>{name}</b><br>Capacity: {capacity}"
-                    folium.CircleMarker(location=(lat, lon), radius=7, color="blue", fill=True, fill_color="blue", popup=folium.Popup(popup_text, max_width=250), tooltip=f"{name} ({capacity})").add_to(m)
-                except Exception:
-                    continue
+            cols = getattr(shelters, "columns", ())
+            lat_col = "lat" if "lat" in cols else "latitude"
+            lon_col = "lon" if "lon" in cols else "longitude"
+            if lat_col not in cols or lon_col not in cols:
+                return
+            # Whole-column coercion and string building; unparseable coords become NaN and are dropped
+            lats = pd.to_numeric(shelters[lat_col], errors="coerce")
+            lons = pd.to_numeric(shelters[lon_col], errors="coerce")
+            names = shelters["name"].map(str) if "name" in cols else pd.Series("Shelter", index=shelters.index)
+            caps = shelters["capacity"].map(str) if "capacity" in cols else pd.Series("Unknown", index=shelters.index)
+            tooltips = names + " (" + caps + ")"
+            popups = "<b>" + names + "</b><br>Capacity: " + caps
+            keep = (lats.notna() & lons.notna()).to_numpy()
+            rows = list(zip(lats.to_numpy()[keep].tolist(), lons.to_numpy()[keep].tolist(),
+                            tooltips[keep].tolist(), popups[keep].tolist()))
+            _add_point_markers(m, rows, "Shelters", 7, "blue")
             return
         # If list of tuples
         if isinstance(shelters, (list, tuple)):
+            features = []
             for s in shelters:
-                try:
-                    lat, lon = s[0], s[1]
-                    name = s[2] if len(s) > 2 else "Shelter"
-                    folium.Marker(location=(float(lat), float(lon)), icon=folium.Icon(color="green", icon="home"), tooltip=name).add_to(m)
-                except Exception:
+                if not isinstance(s, (list, tuple)) or len(s) < 2:
+                    continue
+                lat, lon = _to_float(s[0]), _to_float(s[1])
+                if lat is None or lon is None or not (math.isfinite(lat) and math.isfinite(lon)):
                     continue
+                name = s[2] if len(s) > 2 else "Shelter"
+                features.append({"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                                 "properties": {"tooltip": str(name)}})
+            if not features:
+                return
+            # One layer with one marker template: the home Icon is defined once in the map's JS
+            # instead of a folium.Icon (and its script) per shelter
+            layer, is_new = _point_layer(m, "Shelters")
+            folium.GeoJson(
+                _feature_collection(features),
+                name="Shelters",
+                marker=folium.Marker(icon=folium.Icon(color="green", icon="home")),
+                tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+            ).add_to(layer)
+            if is_new:
+                layer.add_to(m)
     except Exception as e:
         logger.warning("add_shelters_to_map error: %s", e)
 
 
+def _route_array(route: Any) -> Optional["np.ndarray"]:
+    """
+    route as a numeric (n, >=2) array: an ndarray as-is, or a list/tuple of equal-length numeric
+    points converted in one np.array call. None for anything else (mixed lengths, dicts,
+    unparseable or missing values), which the per-point loop handles.
+    """
+    if isinstance(route, np.ndarray):
+        arr = route
+    elif isinstance(route, (list, tuple)) and route and isinstance(route[0], (list, tuple)):
+        try:
+            arr = np.array(route, dtype=np.float64)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        # None converts to NaN here but is a skipped point in the loop; let the loop decide
+        if np.isnan(arr).any():
+            return None
+    else:
+        return None
+    return arr if arr.ndim == 2 and arr.shape[1] >= 2 else None
+
+
 def _normalize_route_coords(route: Iterable[Any]) -> List[Tuple[float, float]]:
     """
     Convert a route (various formats) into a list of (lat, lon) tuples.
-    Handles: (lat,lon), (lon,lat), dicts with lat/lon or x/y, and ORS-like coordinate dicts.
+    Handles: (lat,lon), (lon,lat), dicts with lat/lon or x/y, ORS-like coordinate dicts, and
+    numeric (n, 2) NumPy arrays.
     """
+    arr = _route_array(route) if geo is not None else None
+    if arr is not None:
+        # Numeric points (array, or a uniform list of pairs cast once): the lat/lon order check
+        # runs over the whole array instead of per point
+        try:
+            out = geo.latlon_order(arr)
+            return list(zip(out[:, 0].tolist(), out[:, 1].tolist()))
+        except Exception:
+            pass
     pts: List[Tuple[float, float]] = []
+    add_pt = pts.append
     for p in route:
-        try:
-            if isinstance(p, (list, tuple)) and len(p) >= 2:
-                a, b = float(p[0]), float(p[1])
-                # Heuristic: if first value is within latitude bounds, treat as (lat,lon)
-                if -90 <= a <= 90 and -180 <= b <= 180:
-                    pts.append((a, b))
-                else:
-                    pts.append((b, a))
+        if isinstance(p, (list, tuple)):
+            if len(p) < 2:
                 continue
-            if isinstance(p, dict):
-                if "lat" in p and "lon" in p:
-                    pts.append((float(p["lat"]), float(p["lon"])))
-                    continue
-                if "y" in p and "x" in p:
-                    pts.append((float(p["y"]), float(p["x"])))
-                    continue
-                if "coordinates" in p and isinstance(p["coordinates"], (list, tuple)) and len(p["coordinates"]) >= 2:
-                    lon, lat = p["coordinates"][0], p["coordinates"][1]
-                    pts.append((float(lat), float(lon)))
-                    continue
-        except Exception:
+            a, b = p[0], p[1]
+            # Plain floats (the common case) skip the conversion call
+            if type(a) is not float:
+                a = _to_float(a)
+            if type(b) is not float:
+                b = _to_float(b)
+            if a is None or b is None:
+                continue
+            # Heuristic: if first value is within latitude bounds, treat as (lat,lon)
+            if -90 <= a <= 90 and -180 <= b <= 180:
+                add_pt((a, b))
+            else:
+                add_pt((b, a))
             continue
+        if isinstance(p, dict):
+            if "lat" in p and "lon" in p:
+                lat, lon = _to_float(p["lat"]), _to_float(p["lon"])
+            elif "y" in p and "x" in p:
+                lat, lon = _to_float(p["y"]), _to_float(p["x"])
+            elif "coordinates" in p and isinstance(p["coordinates"], (list, tuple)) and len(p["coordinates"]) >= 2:
+                lon, lat = _to_float(p["coordinates"][0]), _to_float(p["coordinates"][1])
+            else:
+                continue
+            if lat is not None and lon is not None:
+                add_pt((lat, lon))
     return pts
 
 
+# Routes longer than this are Douglas-Peucker simplified before drawing; the tolerance (degrees,
+# about 11 m) is below what a street-level map shows, and start/end points are always kept
+ROUTE_SIMPLIFY_MIN_POINTS = 500
+ROUTE_SIMPLIFY_TOLERANCE = 1e-4
+
+
+def _simplify_route(pts: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """pts with points the line would not visibly miss removed (Shapely 2); pts as-is when short or not finite."""
+    if shapely is None or len(pts) <= ROUTE_SIMPLIFY_MIN_POINTS:
+        return pts
+    arr = np.array(pts, dtype=np.float64)
+    if not np.isfinite(arr).all():
+        return pts
+    line = shapely.simplify(shapely.linestrings(arr), ROUTE_SIMPLIFY_TOLERANCE, preserve_topology=False)
+    out = shapely.get_coordinates(line)
+    if len(out) < 2:
+        return pts
+    return list(zip(out[:, 0].tolist(), out[:, 1].tolist()))
+
+
 def add_route_to_map(m: folium.Map, route: Any, i18n: Optional[dict] = None) -> None:
     """
     Draw a route on the map. Accepts a list of points in various formats.
+    Long routes are simplified first (ROUTE_SIMPLIFY_MIN_POINTS / ROUTE_SIMPLIFY_TOLERANCE).
     """
-    if m is None or not route:
+    if m is None or _is_empty(route):
         return
     try:
         pts = _normalize_route_coords(route)
         if not pts or len(pts) < 2:
             return
+        pts = _simplify_route(pts)
         label = (i18n.get("route") if i18n else "Route")
         folium.PolyLine(locations=pts, color="green", weight=5, opacity=0.8, tooltip=label).add_to(m)
         folium.Marker(location=pts[0], icon=folium.Icon(color="green"), popup="Start").add_to(m)
@@ -218,22 +507,63 @@ def add_route_to_map(m: folium.Map, route: Any, i18n: Optional[dict] = None) ->
         logger.warning("add_route_to_map error: %s", e)
 
 
+# Report fields read by add_reports_to_map (the columns of the column-oriented input)
+REPORT_FIELDS = ("lat", "lon", "type", "severity", "note")
+
+
+def _report_rows_columnar(reports: Any) -> List[tuple]:
+    """
+    [lat, lon, tooltip, popup_html] rows from column-oriented reports: a DataFrame, or a dict of
+    equal-length arrays keyed by REPORT_FIELDS. Positions are coerced and filtered per column;
+    rows whose position is missing or not numeric are dropped.
+    """
+    if "lat" not in reports or "lon" not in reports:
+        return []
+    lats = pd.to_numeric(np.asarray(reports["lat"]), errors="coerce").astype(float, copy=False)
+    lons = pd.to_numeric(np.asarray(reports["lon"]), errors="coerce").astype(float, copy=False)
+    keep = np.isfinite(lats) & np.isfinite(lons)
+    everything = bool(keep.all())
+
+    def text(name: str, default: str):
+        if name not in reports:
+            return repeat(default)
+        values = np.asarray(reports[name])
+        return (values if everything else values[keep]).tolist()
+
+    lats, lons = (lats, lons) if everything else (lats[keep], lons[keep])
+    return [(lat, lon, f"{kind} ({severity})", f"<b>{kind}</b><br>Severity: {severity}<br>{note}")
+            for lat, lon, kind, severity, note in zip(lats.tolist(), lons.tolist(), text("type", "Incident"),
+                                                      text("severity", "?"), text("note", ""))]
+
+
 def add_reports_to_map(m: folium.Map, reports: Any, i18n: Optional[dict] = None) -> None:
     """
     Add crowd reports or incident markers to the map.
+    Accepts a list of report dicts, a DataFrame, or a dict of columns ({"lat": array, "lon": array,
+    "type": ..., "severity": ..., "note": ...}); the last two skip the per-report dict lookups.
     """
-    if m is None or not reports:
+    if m is None or _is_empty(reports):
         return
     try:
+        if hasattr(reports, "iterrows") or (isinstance(reports, dict) and np.ndim(reports.get("lat")) > 0):
+            _add_point_markers(m, _report_rows_columnar(reports), "Reports", 6, "red")
+            return
+        rows = []
+        add_row = rows.append
         for r in reports:
-            try:
-                lat = r.get("lat"); lon = r.get("lon")
-                if lat is None or lon is None:
-                    continue
-                popup_html = f"<b>{r.get('type','Incident')}</b><br>Severity: {r.get('severity','?')}<br>{r.get('note','')}"
-                folium.CircleMarker(location=(float(lat), float(lon)), radius=6, color="red", fill=True, fill_color="red", popup=folium.Popup(popup_html, max_width=250), tooltip=f"{r.get('type','Incident')} ({r.get('severity','?')})").add_to(m)
-            except Exception:
+            if not isinstance(r, dict):
+                continue
+            lat = r.get("lat"); lon = r.get("lon")
+            if type(lat) is not float:
+                lat = _to_float(lat)
+            if type(lon) is not float:
+                lon = _to_float(lon)
+            if lat is None or lon is None:
                 continue
+            kind = r.get("type", "Incident"); severity = r.get("severity", "?")
+            popup_html = f"<b>{kind}</b><br>Severity: {severity}<br>{r.get('note','')}"
+            add_row([lat, lon, f"{kind} ({severity})", popup_html])
+        _add_point_markers(m, rows, "Reports", 6, "red")
     except Exception as e:
         logger.warning("add_reports_to_map error: %s", e)
 
@@ -257,37 +587,89 @@ def add_origin_to_map(m: folium.Map, origin: Tuple[float, float], i18n: Optional
             pass
 
 
-def render_map(m: folium.Map, height: int = 500) -> None:
+def prerender(m: Any) -> str:
+    """
+    Full HTML document for a folium map, rendered once (strings pass through unchanged).
+
+    One render of the map inside a throwaway Figure, without _repr_html_'s escaped srcdoc
+    iframe wrapper; embed it with render_map(html, pre_rendered=True) or components.html.
+    """
+    if isinstance(m, str):
+        return m
+    # Rendering the same Figure twice repeats scripts (e.g. LayerControl's addTo calls), so
+    # always start from a fresh one and give the map its own parent back afterwards
+    parent = getattr(m, "_parent", None)
+    m._parent = None
+    m.add_to(folium.Figure())
+    try:
+        return m.get_root().render()
+    finally:
+        m._parent = parent
+
+
+def _render_html(m: Any, cache_key: Any) -> str:
+    """prerender(m), reused for a repeated cache_key (the caller's fingerprint of the map's inputs)."""
+    with _RENDER_LOCK:
+        html = _RENDER_CACHE.get(cache_key)
+        if html is not None:
+            _RENDER_CACHE.move_to_end(cache_key)
+            return html
+    html = prerender(m)
+    with _RENDER_LOCK:
+        _RENDER_CACHE[cache_key] = html
+        while len(_RENDER_CACHE) > RENDER_CACHE_MAX:
+            _RENDER_CACHE.popitem(last=False)
+    return html
+
+
+def render_map(m: Any, height: int = 500, pre_rendered: bool = False, cache_key: Any = None,
+               read_only: bool = True) -> None:
     """
-    Render the folium map in Streamlit. Prefer streamlit-folium if available, otherwise use HTML fallback.
+    Render the folium map in Streamlit.
+
+    read_only=True (default): embed static HTML. Pans/zooms stay in the browser instead of
+    rerunning the script the way st_folium does on every interaction.
+    read_only=False: use streamlit-folium's st_folium when available (HTML fallback otherwise).
+    pre_rendered=True: m is an HTML string from prerender() and is embedded as-is.
+    cache_key: hashable fingerprint of the map's content; the HTML rendered for a key is reused
+    on later calls with the same key (HTML path only, streamlit-folium re-renders itself).
+    Derive it from the map's inputs (as app.py's map_key does); maps are rebuilt on reruns, so
+    nothing about the folium objects themselves identifies the same content.
     """
+    _ensure_logger()
+    if pre_rendered or isinstance(m, str):
+        if st_html is None:
+            logger.warning("Pre-rendered map needs streamlit.components.v1.html, which is not importable.")
+            return
+        st_html(m, height=height)
+        return
     try:
-        if ST_FOLIUM_AVAILABLE:
+        if ST_FOLIUM_AVAILABLE and (not read_only or st_html is None):
             # streamlit-folium handles embedding and interaction
             st_folium(m, width=None, height=height)
             return
-        # Fallback: use HTML rendering via streamlit.components.v1.html if available
-        if 'st_html' in globals() and st_html is not None:
-            html_str = m._repr_html_()
+        # Static HTML via streamlit.components.v1.html (what folium_static does, plus the render cache)
+        if st_html is not None:
+            html_str = _render_html(m, cache_key) if cache_key is not None else prerender(m)
             st_html(html_str, height=height)
             return
         # Last resort: print a warning and do nothing (caller should handle)
         logger.warning("No rendering backend available (install streamlit-folium or ensure streamlit.components.v1.html is importable).")
     except Exception as e:
         logger.warning("render_map error: %s", e)
-        # Try HTML fallback once more
+        # Try HTML fallback once more (the plain document; components.html needs no srcdoc iframe)
         try:
-            if hasattr(m, "_repr_html_") and 'st_html' in globals() and st_html is not None:
-                st_html(m._repr_html_(), height=height)
+            if hasattr(m, "get_root") and st_html is not None:
+                st_html(prerender(m), height=height)
                 return
         except Exception as e2:
             logger.warning("render_map HTML fallback failed: %s", e2)
             # Final fallback: create a minimal map and attempt to render it
             try:
                 minimal = folium.Map(location=(9.931233, 76.267304), zoom_start=10)
-                if ST_FOLIUM_AVAILABLE:
+                if ST_FOLIUM_AVAILABLE and (not read_only or st_html is None):
                     st_folium(minimal, width=None, height=height)
-                elif 'st_html' in globals() and st_html is not None:
-                    st_html(minimal._repr_html_(), height=height)
+                elif st_html is not None:
+                    st_html(prerender(minimal), height=height)
             except Exception as e3:
                 logger.error("Final fallback map render failed: %s", e3)